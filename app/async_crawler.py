@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app.politeness import HostQueue
+
+
+class AsyncCrawler():
+    def __init__(self, webpage_parser, concurrency: int = 8) -> None:
+        '''
+        Crawl a website with a bounded pool of asyncio workers.
+
+        The workers share one frontier (queue of links to query) and the dedup index
+        of the webpage_parser (canonical urls already queued),
+        each page is fetched and parsed by webpage_parser.crawl_page in a thread pool
+        so the blocking HTTP requests run concurrently.
+        '''
+
+        if concurrency < 1:
+            raise ValueError(
+                f'concurrency is {concurrency}, expected to be at least 1')
+
+        self.webpage_parser = webpage_parser
+        self.concurrency: int = concurrency
+
+    def __str__(self) -> str:
+        return f'AsyncCrawler(concurrency={self.concurrency})'
+
+    def crawl(self, link: str) -> dict:
+        '''
+        Crawl starting from the given link and return the map_dict of the webpage_parser.
+        '''
+
+        return asyncio.run(self.crawl_async(link))
+
+    async def crawl_async(self, link: str) -> dict:
+        '''
+        Coroutine version of crawl, to be awaited from a running event loop.
+        '''
+
+        scheduler = self.webpage_parser.scheduler
+        # with a politeness scheduler the workers take the links of the hosts ready first
+        frontier: asyncio.Queue = asyncio.Queue() if scheduler is None else HostQueue(scheduler)
+        self.webpage_parser.dedup_index.add(link)
+        frontier.put_nowait(link)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            workers = [asyncio.create_task(self.__worker(frontier, executor))
+                       for _ in range(self.concurrency)]
+            frontier_done = asyncio.create_task(frontier.join())
+
+            # workers run forever, so a finished worker means it raised an exception
+            done, _ = await asyncio.wait([frontier_done, *workers],
+                                         return_when=asyncio.FIRST_COMPLETED)
+
+            frontier_done.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(frontier_done, *workers, return_exceptions=True)
+
+            for task in done:
+                if task is not frontier_done:
+                    task.result()
+
+        return self.webpage_parser.map_dict
+
+    async def __worker(self, frontier: asyncio.Queue, executor: ThreadPoolExecutor) -> None:
+        '''
+        Take links from the frontier, query them and add the new internal links back.
+        '''
+
+        loop = asyncio.get_running_loop()
+        while True:
+            link = await frontier.get()
+            if self.webpage_parser.profiler is not None:
+                self.webpage_parser.profiler.record_queue_depth(
+                    'frontier', frontier.qsize())
+            try:
+                clean_links = await loop.run_in_executor(
+                    executor, self.webpage_parser.crawl_page, link)
+                self.webpage_parser.record_page(
+                    self.webpage_parser.url_canonicalizer.canonicalize(link), clean_links)
+
+                # the links are queued as they were found, the canonical url is the key of the page
+                for internal_link in clean_links['internal_links']:
+                    if self.webpage_parser.dedup_index.add(internal_link) is not None:
+                        frontier.put_nowait(internal_link)
+            finally:
+                frontier.task_done()
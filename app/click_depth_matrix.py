@@ -0,0 +1,213 @@
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from app.compact_graph import CompactGraph
+
+
+# distance stored for the pairs that cannot be reached
+UNREACHABLE = np.iinfo(np.uint16).max
+# bytes of the rows processed at once by the queries, counted as 8 bytes per distance (the widest
+# temporary array, like the int64 copy of bincount), bounds the memory used on memory-mapped matrices
+BLOCK_BYTES = 64 * 2 ** 20
+
+# CSR edges of the BFS worker process, set by init_bfs_worker
+worker_edges = None
+
+
+def init_bfs_worker(offsets: np.ndarray, targets: np.ndarray) -> None:
+    '''
+    Keep the edges of the graph in the BFS worker process, they are sent once per worker.
+    '''
+
+    global worker_edges
+    worker_edges = (offsets.tolist(), targets.tolist(), len(offsets) - 1)
+
+
+def bfs_rows(source_ids: range) -> tuple:
+    '''
+    Run a BFS from each source in a worker process.
+
+    returns - (first source id, uint16 matrix with one row of distances per source)
+    '''
+
+    offsets, targets, node_count = worker_edges
+    rows = np.empty((len(source_ids), node_count), dtype=np.uint16)
+    for row, source_id in enumerate(source_ids):
+        distances = [UNREACHABLE] * node_count
+        distances[source_id] = 0
+        queue = deque([source_id])
+        while queue:
+            node_id = queue.popleft()
+            distance = distances[node_id] + 1
+            if distance >= UNREACHABLE:
+                # deeper pages are stored as unreachable
+                continue
+            for neighbor_id in targets[offsets[node_id]:offsets[node_id + 1]]:
+                if distances[neighbor_id] == UNREACHABLE:
+                    distances[neighbor_id] = distance
+                    queue.append(neighbor_id)
+        rows[row] = distances
+    return source_ids.start, rows
+
+
+class ClickDepthMatrix():
+    def __init__(self, compact_graph: CompactGraph, matrix: np.ndarray, temporary_path: str = None) -> None:
+        '''
+        Click distance between every pair of pages, matrix[source, target] is the number of
+        clicks from the source node id to the target node id or UNREACHABLE.
+        Use ClickDepthMatrix.build to compute it.
+        '''
+
+        node_count = compact_graph.node_count
+        if matrix.shape != (node_count, node_count):
+            raise ValueError(
+                f'The matrix shape is {matrix.shape}, expected {(node_count, node_count)}')
+
+        self.compact_graph: CompactGraph = compact_graph
+        self.matrix: np.ndarray = matrix
+        self.temporary_path: str = temporary_path
+
+    def __str__(self) -> str:
+        return f'ClickDepthMatrix(nodes={self.compact_graph.node_count}, memory_mapped={self.is_memory_mapped})'
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        return isinstance(self.matrix, np.memmap)
+
+    @classmethod
+    def build(cls, compact_graph: CompactGraph, workers: int = None, chunk_size: int = 64,
+              memmap_path: str = None, max_memory_bytes: int = 1024 * 1024 * 1024) -> 'ClickDepthMatrix':
+        '''
+        Run a BFS from every node, the sources are split in chunks of chunk_size nodes
+        over a pool of workers processes (in the calling process if workers is 1).
+
+        The matrix is memory-mapped to memmap_path when it is given, or to a temporary file
+        (removed by close) when it is bigger than max_memory_bytes.
+        '''
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        for name, value in [('workers', workers), ('chunk_size', chunk_size)]:
+            if value < 1:
+                raise ValueError(
+                    f'{name} is {value}, expected to be at least 1')
+
+        node_count = compact_graph.node_count
+        shape = (node_count, node_count)
+        temporary_path = None
+        if memmap_path is None and node_count * node_count * 2 > max_memory_bytes:
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                suffix='.click_depth')
+            os.close(file_descriptor)
+            memmap_path = temporary_path
+        if memmap_path is not None:
+            matrix = np.memmap(memmap_path, dtype=np.uint16,
+                               mode='w+', shape=shape)
+        else:
+            matrix = np.empty(shape, dtype=np.uint16)
+
+        chunks = [range(start, min(start + chunk_size, node_count))
+                  for start in range(0, node_count, chunk_size)]
+        if workers == 1:
+            init_bfs_worker(compact_graph.offsets, compact_graph.targets)
+            results = map(bfs_rows, chunks)
+            for start, rows in results:
+                matrix[start:start + len(rows)] = rows
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_bfs_worker,
+                                     initargs=(compact_graph.offsets, compact_graph.targets)) as executor:
+                for start, rows in executor.map(bfs_rows, chunks):
+                    matrix[start:start + len(rows)] = rows
+
+        if isinstance(matrix, np.memmap):
+            matrix.flush()
+        return cls(compact_graph=compact_graph, matrix=matrix, temporary_path=temporary_path)
+
+    def close(self) -> None:
+        '''
+        Release the memory-mapped file, the temporary file is removed.
+        '''
+
+        if self.is_memory_mapped:
+            self.matrix.flush()
+            self.matrix = np.asarray([], dtype=np.uint16)
+        if self.temporary_path is not None:
+            os.remove(self.temporary_path)
+            self.temporary_path = None
+
+    def __row_blocks(self):
+        node_count = self.compact_graph.node_count
+        rows_block_size = max(1, BLOCK_BYTES // (max(node_count, 1) * 8))
+        for start in range(0, node_count, rows_block_size):
+            yield start, np.asarray(self.matrix[start:start + rows_block_size])
+
+    def get_distance(self, source: str, target: str) -> int:
+        '''
+        Return the number of clicks from the source page to the target page, None if it cannot be reached.
+        '''
+
+        distance = int(self.matrix[self.compact_graph.node_id(source),
+                                   self.compact_graph.node_id(target)])
+        return None if distance == UNREACHABLE else distance
+
+    def get_histogram(self) -> dict:
+        '''
+        Return the number of (source, target) pairs of different pages for each distance,
+        the pairs that cannot be reached are counted under None.
+        '''
+
+        counts = np.zeros(UNREACHABLE + 1, dtype=np.int64)
+        for _, rows in self.__row_blocks():
+            counts += np.bincount(rows.ravel(), minlength=UNREACHABLE + 1)
+        # the distance of each page to itself
+        counts[0] -= self.compact_graph.node_count
+
+        histogram = {distance: count for distance, count in enumerate(counts[:UNREACHABLE].tolist())
+                     if count}
+        if counts[UNREACHABLE]:
+            histogram[None] = int(counts[UNREACHABLE])
+        return histogram
+
+    def get_farthest_pairs(self, k: int = 10) -> list:
+        '''
+        Return the k reachable (source, target, distance) pairs with the most clicks.
+        '''
+
+        if k < 1:
+            raise ValueError(f'k is {k}, expected to be at least 1')
+
+        node_count = self.compact_graph.node_count
+        best_distances = np.empty(0, dtype=np.uint16)
+        best_positions = np.empty(0, dtype=np.int64)
+        for start, rows in self.__row_blocks():
+            distances = rows.ravel()
+            # only the reachable pairs at least as far as the k-th best pair so far are kept
+            threshold = best_distances.min() if len(best_distances) >= k else 1
+            candidates = np.flatnonzero(
+                (distances >= threshold) & (distances != UNREACHABLE))
+            best_distances = np.concatenate(
+                (best_distances, distances[candidates]))
+            best_positions = np.concatenate(
+                (best_positions, candidates + start * node_count))
+            if len(best_distances) > k:
+                top = np.argpartition(-best_distances.astype(np.int64), k - 1)[:k]
+                best_distances, best_positions = best_distances[top], best_positions[top]
+
+        order = np.lexsort((best_positions, -best_distances.astype(np.int64)))
+        nodes = self.compact_graph.nodes
+        return [(nodes[position // node_count], nodes[position % node_count], distance)
+                for distance, position in zip(best_distances[order].tolist(), best_positions[order].tolist())
+                if distance > 0]
+
+    def get_eccentricities(self) -> dict:
+        '''
+        Return the number of clicks from each page to the most distant page it can reach.
+        '''
+
+        eccentricities = []
+        for _, rows in self.__row_blocks():
+            distances = np.where(rows == UNREACHABLE, np.uint16(0), rows)
+            eccentricities.extend(distances.max(axis=1).tolist())
+        return dict(zip(self.compact_graph.nodes, eccentricities))
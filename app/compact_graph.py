@@ -0,0 +1,127 @@
+import numpy as np
+from collections.abc import Mapping
+
+
+class CompactGraph():
+    def __init__(self, nodes: list, source_count: int, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray) -> None:
+        '''
+        Compact (CSR) representation of the adjacency list graph.
+
+        nodes        - interning table, the url of each node id
+        source_count - the first source_count nodes are the keys of the adjacency list,
+                       the others only appear as destinations
+        offsets      - the edges of node i are at positions offsets[i]:offsets[i + 1]
+        targets      - destination node id of each edge
+        weights      - weight of each edge
+        '''
+
+        if len(offsets) != len(nodes) + 1:
+            raise ValueError(
+                f'offsets has {len(offsets)} elements, expected {len(nodes) + 1}')
+        if len(targets) != len(weights) or len(targets) != offsets[-1]:
+            raise ValueError(
+                f'targets ({len(targets)}) and weights ({len(weights)}) must have offsets[-1]={offsets[-1]} elements')
+
+        self.nodes: list = nodes
+        self.node_ids: dict = {url: node_id for node_id, url in enumerate(nodes)}
+        self.source_count: int = source_count
+        self.offsets: np.ndarray = offsets
+        self.targets: np.ndarray = targets
+        self.weights: np.ndarray = weights
+
+    def __str__(self) -> str:
+        return f'CompactGraph(nodes={self.node_count}, edges={self.edge_count})'
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @classmethod
+    def from_adj_list_graph(cls, adj_list_graph: dict) -> 'CompactGraph':
+        '''
+        Build the compact graph from the dict of [source, destination, weight] edges.
+        The source of the edges is the key of the adjacency list.
+        '''
+
+        nodes = list(adj_list_graph)
+        node_ids = {url: node_id for node_id, url in enumerate(nodes)}
+        source_count = len(nodes)
+
+        offsets = np.zeros(source_count + 1, dtype=np.int64)
+        targets = []
+        weights = []
+        for node_id, edges in enumerate(adj_list_graph.values()):
+            for _, destination, weight in edges:
+                destination_id = node_ids.get(destination)
+                if destination_id is None:
+                    destination_id = node_ids[destination] = len(nodes)
+                    nodes.append(destination)
+                targets.append(destination_id)
+                weights.append(weight)
+            offsets[node_id + 1] = len(targets)
+
+        # the destination only nodes have no edges
+        offsets = np.concatenate((offsets, np.full(
+            len(nodes) - source_count, len(targets), dtype=np.int64)))
+        return cls(nodes=nodes, source_count=source_count, offsets=offsets,
+                   targets=np.array(targets, dtype=np.int32),
+                   weights=np.array(weights, dtype=np.int64))
+
+    def to_adj_list_graph(self) -> dict:
+        '''
+        Return the adjacency list graph as a plain dict of (source, destination, weight) tuples.
+        '''
+
+        return dict(self.view().items())
+
+    def view(self) -> 'AdjacencyView':
+        return AdjacencyView(self)
+
+    def node_id(self, url: str) -> int:
+        return self.node_ids[url]
+
+    def node_url(self, node_id: int) -> str:
+        return self.nodes[node_id]
+
+    def edges(self, node_id: int) -> list:
+        '''
+        Return the (source, destination, weight) edges of the node.
+        '''
+
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        source = self.nodes[node_id]
+        return [(source, self.nodes[target], weight)
+                for target, weight in zip(self.targets[start:end].tolist(), self.weights[start:end].tolist())]
+
+    def memory_bytes(self) -> int:
+        '''
+        Size of the CSR arrays (the url strings are not included).
+        '''
+
+        return self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes
+
+
+class AdjacencyView(Mapping):
+    def __init__(self, compact_graph: CompactGraph) -> None:
+        '''
+        Read only dict-style view of a CompactGraph, view[url] returns the
+        (source, destination, weight) edges of the url like the adjacency list dict.
+        '''
+
+        self.compact_graph: CompactGraph = compact_graph
+
+    def __getitem__(self, url: str) -> list:
+        node_id = self.compact_graph.node_ids.get(url)
+        if node_id is None or node_id >= self.compact_graph.source_count:
+            raise KeyError(url)
+        return self.compact_graph.edges(node_id)
+
+    def __iter__(self):
+        return iter(self.compact_graph.nodes[:self.compact_graph.source_count])
+
+    def __len__(self) -> int:
+        return self.compact_graph.source_count
@@ -5,6 +5,7 @@ from typing import Callable, Counter, Optional
 from app.webpage_parser import WebpageParser
 from app.file_manager import FileManager
 from app.graph import Graph
+from app.local_server import SyntheticSite, LocalServer
 
 
 @pytest.fixture
@@ -19,6 +20,13 @@ def web_parser_without_root() -> WebpageParser:
     return WebpageParser('', FileManager())
 
 
+@pytest.fixture
+def local_server() -> LocalServer:
+    '''Returns a running local server with a synthetic website'''
+    with LocalServer(SyntheticSite(page_count=30, fan_out=3)) as server:
+        yield server
+
+
 @pytest.fixture
 def root_link() -> str:
     return 'https://www.globalapptesting.com'
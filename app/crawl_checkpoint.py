@@ -0,0 +1,84 @@
+import os
+import time
+from app.file_manager import FileManager
+
+
+# key of the frontier snapshots in the checkpoint log, it cannot clash with a page url
+FRONTIER_KEY = '#frontier'
+
+
+class CrawlCheckpoint():
+    def __init__(self, file_manager: FileManager, file_name: str = 'crawl_checkpoint', interval: float = 10.0, append: bool = False) -> None:
+        '''
+        Append-only checkpoint log (JSON Lines) of a running crawl.
+
+        Every crawled page is appended as soon as it is recorded, with the time it was crawled,
+        and a snapshot of the frontier (links queued but not crawled yet) is appended at most
+        every interval seconds. The visited set is not written, it is rebuilt from the crawled
+        pages and the frontier when the crawl is resumed.
+        '''
+
+        if interval < 0:
+            raise ValueError(
+                f'interval is {interval}, expected to be at least 0')
+
+        self.file_manager: FileManager = file_manager
+        self.file_name: str = file_name
+        self.interval: float = interval
+        self.writer = file_manager.open_jsonl_writer(
+            file_name=file_name, append=append)
+        self.last_snapshot_time: float = time.monotonic()
+        self.snapshots_count: int = 0
+
+    def __str__(self) -> str:
+        return f'CrawlCheckpoint(file_name={self.file_name}.jsonl, pages={self.writer.records_count - self.snapshots_count})'
+
+    @staticmethod
+    def exists(file_name: str = 'crawl_checkpoint') -> bool:
+        return os.path.exists(f'{file_name}.jsonl')
+
+    def record_page(self, link: str, page: dict, crawled_at: float = None) -> None:
+        self.writer.write(link, {'page': page, 'crawled_at': crawled_at})
+
+    def remove_page(self, link: str) -> None:
+        self.writer.remove(link)
+
+    def save_frontier(self, frontier, force: bool = False) -> bool:
+        '''
+        Append a snapshot of the frontier if the last one is older than interval seconds
+        (or force is True), returns True if a snapshot was written.
+        '''
+
+        now = time.monotonic()
+        if not force and now - self.last_snapshot_time < self.interval:
+            return False
+
+        self.writer.write(FRONTIER_KEY, {'frontier': list(frontier), 'time': time.time()})
+        self.last_snapshot_time = now
+        self.snapshots_count += 1
+        return True
+
+    def close(self) -> None:
+        self.writer.close()
+
+    @staticmethod
+    def load(file_manager: FileManager, file_name: str = 'crawl_checkpoint') -> tuple:
+        '''
+        Read the checkpoint log and return (map_dict, frontier, crawled_at),
+        the frontier is the last snapshot (an empty list if there is none).
+        '''
+
+        map_dict = {}
+        crawled_at = {}
+        frontier = []
+        for key, value in file_manager.iter_jsonl(file_name=file_name):
+            if key == FRONTIER_KEY:
+                frontier = value['frontier']
+            elif value is None:
+                map_dict.pop(key, None)
+                crawled_at.pop(key, None)
+            else:
+                map_dict[key] = value['page']
+                if value['crawled_at'] is not None:
+                    crawled_at[key] = value['crawled_at']
+        return map_dict, frontier, crawled_at
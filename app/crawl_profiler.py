@@ -0,0 +1,290 @@
+import json
+import math
+import time
+import cProfile
+import pstats
+import tracemalloc
+from threading import Lock
+
+
+# the crawl stages in the order of the summary
+STAGES = ('wait', 'ttfb', 'download', 'parse', 'classify', 'store', 'write')
+CAPTURES = (None, 'cprofile', 'tracemalloc')
+PERCENTILES = (50, 90, 99)
+
+# histogram buckets grow by 2 ** (1 / 4) (19%) from 1 microsecond, the last one is above 17 minutes
+MIN_SECONDS = 1e-6
+BUCKETS_PER_DOUBLING = 4
+BUCKET_COUNT = 120
+
+# number of functions / allocation sites in the capture summary
+TOP_ENTRIES = 20
+
+
+def get_bucket_bound(index: int) -> float:
+    '''
+    Return the upper bound (in seconds) of the histogram bucket.
+    '''
+
+    return MIN_SECONDS * 2 ** ((index + 1) / BUCKETS_PER_DOUBLING)
+
+
+def mark_headers_received(response, *args, **kwargs) -> None:
+    '''
+    Response hook of the requests session, called when the response headers are received,
+    before the body is downloaded.
+    '''
+
+    response.headers_received_at = time.perf_counter()
+
+
+class Histogram():
+    def __init__(self) -> None:
+        '''
+        Durations counted in logarithmic buckets, the percentiles are the upper bounds
+        of their buckets (at most 19% above the exact value) and the memory does not grow
+        with the number of recorded durations.
+        '''
+
+        self.buckets: list = [0] * BUCKET_COUNT
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        index = 0
+        if seconds > MIN_SECONDS:
+            index = min(BUCKET_COUNT - 1,
+                        int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING))
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def get_percentile(self, percentile: float) -> float:
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percentile / 100)
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(get_bucket_bound(index), self.maximum)
+
+    def get_summary(self) -> dict:
+        '''
+        Return the count, total and the mean / percentiles / maximum in milliseconds.
+        '''
+
+        summary = {'count': self.count, 'total_seconds': round(self.total, 6),
+                   'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None}
+        for percentile in PERCENTILES:
+            value = self.get_percentile(percentile)
+            summary[f'p{percentile}_ms'] = round(
+                value * 1000, 3) if value is not None else None
+        summary['max_ms'] = round(self.maximum * 1000, 3)
+        return summary
+
+
+class StageTimer():
+    def __init__(self, profiler: 'CrawlProfiler', stage: str) -> None:
+        self.profiler = profiler
+        self.stage: str = stage
+        self.start: float = 0.0
+
+    def __enter__(self) -> 'StageTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.record(self.stage, time.perf_counter() - self.start)
+
+
+class CrawlProfiler():
+    def __init__(self, capture: str = None) -> None:
+        '''
+        Instrumentation of a crawl, updated by the webpage parser as it crawls:
+            - a duration histogram per stage: wait (for a politeness slot and the request
+              preparation of the requests session), time to first byte (including
+              the DNS lookup and the connection of new connections), body download, parse
+              (link extraction), classify, store (record_page) and write (JSON output)
+            - the response time percentiles of each host
+            - pages / bytes counters and their rates between start and stop
+            - the depths of the crawl queues, sampled each time a link is taken
+
+        The pages parsed in worker processes (PipelineCrawler) are not timed by the parse
+        and classify stages.
+
+        capture - None, 'cprofile' to profile the functions called by the thread running
+                  the crawl, or 'tracemalloc' to trace the memory allocations, between start and stop
+        '''
+
+        if capture not in CAPTURES:
+            raise ValueError(
+                f'capture is {capture}, expected to be one of {CAPTURES}')
+
+        self.capture: str = capture
+        self.stages: dict = {stage: Histogram() for stage in STAGES}
+        self.hosts: dict = {}
+        self.host_failures: dict = {}
+        # name -> [samples, sum of the depths, maximum depth]
+        self.queue_depths: dict = {}
+        self.pages: int = 0
+        self.bytes: int = 0
+        self.started_at: float = None
+        self.stopped_at: float = None
+        self.profile: cProfile.Profile = None
+        self.capture_summary = None
+        self.lock = Lock()
+
+    def __str__(self) -> str:
+        return f'CrawlProfiler(capture={self.capture}, pages={self.pages})'
+
+    def start(self) -> None:
+        '''
+        Start the clock of the rates and the capture.
+        '''
+
+        self.started_at = time.perf_counter()
+        self.stopped_at = None
+        if self.capture == 'cprofile':
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.capture == 'tracemalloc':
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        '''
+        Stop the clock of the rates and the capture, and summarize the capture.
+        '''
+
+        self.stopped_at = time.perf_counter()
+        if self.capture == 'cprofile' and self.profile is not None:
+            self.profile.disable()
+            self.capture_summary = self.__summarize_profile()
+            self.profile = None
+        elif self.capture == 'tracemalloc' and tracemalloc.is_tracing():
+            self.capture_summary = self.__summarize_allocations()
+            tracemalloc.stop()
+
+    def stage(self, stage: str) -> StageTimer:
+        '''
+        Return a context manager recording the duration of its block in the stage histogram.
+        '''
+
+        return StageTimer(self, stage)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.stages[stage].add(seconds)
+
+    def record_response(self, host: str, response, sent_at: float) -> None:
+        '''
+        Record the wait / time to first byte / download durations of the response
+        of the request sent at sent_at (perf_counter) and the size of its body.
+        '''
+
+        received_at = time.perf_counter()
+        headers_received_at = getattr(
+            response, 'headers_received_at', received_at)
+        ttfb = response.elapsed.total_seconds()
+        download = received_at - headers_received_at
+        size = len(response.content)
+        with self.lock:
+            # the time spent before the request was sent
+            self.stages['wait'].add(
+                max(0.0, headers_received_at - ttfb - sent_at))
+            self.stages['ttfb'].add(ttfb)
+            self.stages['download'].add(download)
+            if host not in self.hosts:
+                self.hosts[host] = Histogram()
+            self.hosts[host].add(ttfb + download)
+            self.bytes += size
+
+    def record_failure(self, host: str) -> None:
+        with self.lock:
+            self.host_failures[host] = self.host_failures.get(host, 0) + 1
+
+    def record_page(self) -> None:
+        with self.lock:
+            self.pages += 1
+
+    def record_queue_depth(self, queue: str, depth: int) -> None:
+        with self.lock:
+            samples = self.queue_depths.setdefault(queue, [0, 0, 0])
+            samples[0] += 1
+            samples[1] += depth
+            samples[2] = max(samples[2], depth)
+
+    def get_elapsed(self) -> float:
+        '''
+        Return the seconds between start and stop (or now if the profiler was not stopped).
+        '''
+
+        if self.started_at is None:
+            return None
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def get_summary(self) -> dict:
+        '''
+        Return the summary of the crawl like:
+        {'elapsed_seconds': 2.5, 'pages': 100, 'bytes': 250000,
+         'pages_per_second': 40.0, 'bytes_per_second': 100000.0,
+         'stages': {'ttfb': {'count': 100, 'total_seconds': 1.2, 'mean_ms': 12.0,
+                             'p50_ms': 10.2, 'p90_ms': 20.5, 'p99_ms': 35.1, 'max_ms': 40.0}, ...},
+         'hosts': {'www.globalapptesting.com': {'count': 100, ..., 'failures': 0}},
+         'queue_depths': {'frontier': {'samples': 100, 'mean': 12.5, 'max': 30}},
+         'capture': None}
+        '''
+
+        elapsed = self.get_elapsed()
+        with self.lock:
+            summary = {'elapsed_seconds': round(elapsed, 6) if elapsed is not None else None,
+                       'pages': self.pages, 'bytes': self.bytes,
+                       'pages_per_second': self.pages / elapsed if elapsed else None,
+                       'bytes_per_second': self.bytes / elapsed if elapsed else None,
+                       'stages': {stage: histogram.get_summary() for stage, histogram in self.stages.items()},
+                       'hosts': {}, 'queue_depths': {},
+                       'capture': self.capture_summary}
+            for host in sorted(self.hosts.keys() | self.host_failures.keys()):
+                histogram = self.hosts.get(host, Histogram())
+                summary['hosts'][host] = {**histogram.get_summary(),
+                                          'failures': self.host_failures.get(host, 0)}
+            for queue, (samples, depths, maximum) in self.queue_depths.items():
+                summary['queue_depths'][queue] = {'samples': samples,
+                                                  'mean': depths / samples, 'max': maximum}
+        return summary
+
+    def export(self, file_name: str = 'crawl_profile') -> None:
+        '''
+        Write the summary to file_name.json.
+        '''
+
+        with open(f'{file_name}.json', mode='w', encoding='utf8') as fhandle:
+            json.dump(self.get_summary(), fhandle, indent=4)
+
+    def __summarize_profile(self) -> dict:
+        '''
+        Return the functions with the highest cumulative time.
+        '''
+
+        stats = pstats.Stats(self.profile).stats
+        functions = sorted(stats.items(), key=lambda item: item[1][3],
+                           reverse=True)[:TOP_ENTRIES]
+        return {'type': 'cprofile',
+                'functions': [{'function': f'{file_name}:{line}({function})', 'calls': calls,
+                               'total_seconds': round(total, 6), 'cumulative_seconds': round(cumulative, 6)}
+                              for (file_name, line, function), (_, calls, total, cumulative, _) in functions]}
+
+    def __summarize_allocations(self) -> dict:
+        '''
+        Return the current / peak traced memory and the lines that allocated the most memory.
+        '''
+
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics('lineno')[:TOP_ENTRIES]
+        return {'type': 'tracemalloc', 'current_bytes': current, 'peak_bytes': peak,
+                'allocations': [{'line': f'{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}',
+                                 'bytes': statistic.size, 'count': statistic.count}
+                                for statistic in statistics]}
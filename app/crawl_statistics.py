@@ -0,0 +1,313 @@
+import json
+from bisect import bisect_left, insort
+from threading import Lock
+from collections import Counter
+from app.link_classifier import LINK_CATEGORIES
+
+
+SIZE_PERCENTILES = (50, 90, 99)
+
+# the values of the text report start at this column
+LABEL_WIDTH = 43
+
+
+class CrawlStatistics():
+    def __init__(self) -> None:
+        '''
+        Statistics of the crawled pages updated as each page is added or removed, so they can be
+        read during a live crawl without scanning the map_dict again:
+            - number of pages, HTTP status histogram and link totals by category
+            - total and sorted page sizes, for the averages and the size percentiles
+            - incoming edges of each graph node, grouped by count for the min / max extremes
+
+        A page added again replaces its previous values.
+        '''
+
+        # link -> (http_status, page_size_bytes, link counts by category, node, destinations)
+        self.pages: dict = {}
+        self.http_statuses: Counter = Counter()
+        self.link_totals: dict = dict.fromkeys(LINK_CATEGORIES, 0)
+        self.total_page_size_bytes: int = 0
+        self.page_sizes: list = []
+        self.incoming_edges: dict = {}
+        self.source_pages: Counter = Counter()
+        # incoming edge count -> the nodes with that count, in insertion order
+        self.nodes_by_incoming_edges: dict = {}
+        self.has_edges: bool = False
+        self.lock = Lock()
+
+    def __str__(self) -> str:
+        return f'CrawlStatistics(pages={len(self.pages)})'
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    @classmethod
+    def from_map_dict(cls, map_dict: dict, get_graph_edges=None, get_node=None) -> 'CrawlStatistics':
+        '''
+        Build the statistics of the map_dict in one pass, get_graph_edges(link) returns the edges
+        of a page and get_node(link) its graph node (the degree extremes need both).
+        '''
+
+        statistics = cls()
+        for link, page in map_dict.items():
+            statistics.add_page(link, page,
+                                get_graph_edges(link) if get_graph_edges is not None else None,
+                                get_node(link) if get_node is not None else None)
+        return statistics
+
+    def __move_node(self, node: str, source_delta: int, incoming_delta: int) -> None:
+        '''
+        Update the counts of the node and move it to the group of its new incoming edge count,
+        a node without page and without incoming edge is not in the graph.
+        '''
+
+        count = self.incoming_edges.get(node)
+        if count is not None:
+            group = self.nodes_by_incoming_edges[count]
+            del group[node]
+            if not group:
+                del self.nodes_by_incoming_edges[count]
+
+        self.source_pages[node] += source_delta
+        count = (count or 0) + incoming_delta
+        if self.source_pages[node] <= 0 and count <= 0:
+            del self.source_pages[node]
+            self.incoming_edges.pop(node, None)
+            return
+        self.incoming_edges[node] = count
+        self.nodes_by_incoming_edges.setdefault(count, {})[node] = None
+
+    def __remove(self, link: str) -> None:
+        http_status, page_size_bytes, link_counts, node, destinations = self.pages.pop(
+            link)
+        self.http_statuses[http_status] -= 1
+        if not self.http_statuses[http_status]:
+            del self.http_statuses[http_status]
+        for category, count in zip(LINK_CATEGORIES, link_counts):
+            self.link_totals[category] -= count
+        self.total_page_size_bytes -= page_size_bytes
+        del self.page_sizes[bisect_left(self.page_sizes, page_size_bytes)]
+        if node is not None:
+            self.__move_node(node, -1, 0)
+            for destination in destinations:
+                self.__move_node(destination, 0, -1)
+
+    def add_page(self, link: str, page: dict, edges: list = None, node: str = None) -> None:
+        '''
+        Add the page of the map_dict, with its (source, destination, weight) graph edges
+        and its graph node (the source of the edges, or the link).
+        '''
+
+        link_counts = tuple(len(page.get(category, ()))
+                            for category in LINK_CATEGORIES)
+        page_size_bytes = page.get('page_size_bytes', 0)
+        destinations = ()
+        if edges is not None:
+            node = node or (edges[0][0] if edges else link)
+            destinations = tuple(destination for _, destination, _ in edges)
+
+        with self.lock:
+            if link in self.pages:
+                self.__remove(link)
+            self.pages[link] = (page['HTTP_STATUS'], page_size_bytes, link_counts,
+                                node if edges is not None else None, destinations)
+            self.http_statuses[page['HTTP_STATUS']] += 1
+            for category, count in zip(LINK_CATEGORIES, link_counts):
+                self.link_totals[category] += count
+            self.total_page_size_bytes += page_size_bytes
+            insort(self.page_sizes, page_size_bytes)
+            if edges is not None:
+                self.has_edges = True
+                self.__move_node(node, 1, 0)
+                for destination in destinations:
+                    self.__move_node(destination, 0, 1)
+
+    def remove_page(self, link: str) -> None:
+        with self.lock:
+            if link in self.pages:
+                self.__remove(link)
+
+    def get_totals(self) -> dict:
+        '''
+        Return the totals in the format of CrawlStore.get_statistics:
+        {'total_webpages': 361, 'http_statuses': {200: 360, 404: 1},
+         'total_internal_links': 17409, ..., 'total_page_size_bytes': 43005432}
+        '''
+
+        with self.lock:
+            totals = {'total_webpages': len(self.pages),
+                      'http_statuses': dict(self.http_statuses)}
+            for category, total in self.link_totals.items():
+                totals[f'total_{category}'] = total
+            totals['total_page_size_bytes'] = self.total_page_size_bytes
+        return totals
+
+    def get_size_percentiles(self, percentiles: tuple = SIZE_PERCENTILES) -> dict:
+        '''
+        Return the page size (bytes) of each percentile, like {50: 91201, 90: 120455, 99: 180000}.
+        '''
+
+        with self.lock:
+            if not self.page_sizes:
+                return {}
+            return {percentile: self.page_sizes[min(len(self.page_sizes) - 1,
+                                                    len(self.page_sizes) * percentile // 100)]
+                    for percentile in percentiles}
+
+    def get_nodes_with_min_max_links(self) -> dict:
+        '''
+        Returns the node(s) with minimum and maximum number of incoming links,
+        in the format of Graph.get_nodes_with_min_max_links.
+        '''
+
+        with self.lock:
+            if not self.nodes_by_incoming_edges:
+                raise ValueError('The statistics have no graph edges')
+            min_count = min(self.nodes_by_incoming_edges)
+            max_count = max(self.nodes_by_incoming_edges)
+            return {
+                'minimum_incoming_links': {'links': list(self.nodes_by_incoming_edges[min_count]),
+                                           'incoming_links_count': min_count},
+                'maximum_incoming_links': {'links': list(self.nodes_by_incoming_edges[max_count]),
+                                           'incoming_links_count': max_count}
+            }
+
+
+class StatisticsReport():
+    def __init__(self, root_link: str, totals: dict, size_percentiles: dict = None,
+                 incoming_links: dict = None, root_eccentricity: int = None, longest_path: int = None) -> None:
+        '''
+        Structured webpage statistics, rendered as the text of get_webpage_statistics or as JSON.
+
+        totals           - in the format of CrawlStatistics.get_totals
+        size_percentiles - page size of each percentile
+        incoming_links   - in the format of Graph.get_nodes_with_min_max_links
+
+        The optional sections (link_statuses, duplicates_saved, cache_statistics,
+        response_times, slow_pages) are set by the caller when they are available.
+        '''
+
+        if not totals['total_webpages']:
+            raise ValueError('The statistics have no page')
+
+        self.root_link: str = root_link
+        self.totals: dict = totals
+        self.size_percentiles: dict = size_percentiles or {}
+        self.incoming_links: dict = incoming_links
+        self.root_eccentricity: int = root_eccentricity
+        self.longest_path: int = longest_path
+        # url -> HTTP_STATUS of the links of incoming_links
+        self.link_statuses: dict = {}
+        self.duplicates_saved: int = None
+        self.cache_statistics: dict = None
+        self.response_times: list = None
+        self.slow_pages: list = None
+
+    def __str__(self) -> str:
+        return f'StatisticsReport(root_link={self.root_link}, pages={self.totals["total_webpages"]})'
+
+    def get_averages(self) -> dict:
+        total_webpages = self.totals['total_webpages']
+        return {'internal_links_per_page': self.totals['total_internal_links'] // total_webpages,
+                'external_links_per_page': self.totals['total_external_links'] // total_webpages,
+                'page_size_bytes': self.totals['total_page_size_bytes'] // total_webpages}
+
+    def get_response_time_percentiles(self) -> dict:
+        '''
+        Return the p50, p95 and max response times (seconds), None without response times.
+        '''
+
+        if not self.response_times:
+            return None
+        response_times = sorted(self.response_times)
+        return {'p50': response_times[len(response_times) // 2],
+                'p95': response_times[int(len(response_times) * 0.95)],
+                'max': response_times[-1]}
+
+    def to_dict(self) -> dict:
+        # the JSON keys are strings, the failure statuses are strings already
+        report = {'root_link': self.root_link,
+                  **{key: value for key, value in self.totals.items() if key != 'http_statuses'},
+                  'http_statuses': {str(status): count for status, count in self.totals['http_statuses'].items()},
+                  'averages': self.get_averages(),
+                  'page_size_percentiles': {str(percentile): size for percentile, size in self.size_percentiles.items()},
+                  'root_eccentricity': self.root_eccentricity,
+                  'longest_path': self.longest_path,
+                  'incoming_links': self.incoming_links,
+                  'duplicates_saved': self.duplicates_saved,
+                  'cache_statistics': self.cache_statistics,
+                  'response_times': self.get_response_time_percentiles(),
+                  'slow_pages': self.slow_pages}
+        return report
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def render_text(self) -> str:
+        totals = self.totals
+        averages = self.get_averages()
+
+        def line(label: str, value) -> str:
+            return f'{label:<{LABEL_WIDTH}}{value}\n'
+
+        statistic_info = '\n' + line('General information about', self.root_link)
+        statistic_info += '\n' + line('Total web pages found (unique links):', totals['total_webpages'])
+
+        for http_status, count in totals['http_statuses'].items():
+            statistic_info += line(f'HTTP {http_status}:', count)
+
+        # the pages that could not be fetched have a failure status instead of a HTTP status code
+        failed_pages = {http_status: count for http_status, count in totals['http_statuses'].items()
+                        if isinstance(http_status, str)}
+        if failed_pages:
+            statistic_info += '\n' + line('Pages not fetched:', sum(failed_pages.values()))
+            for http_status, count in failed_pages.items():
+                statistic_info += f'    {http_status + ":":<39}{count}\n'
+
+        statistic_info += '\n' + line('Total internal links (non-unique links):', totals['total_internal_links'])
+        statistic_info += line('Distance between the most distant pages:', self.root_eccentricity)
+        statistic_info += line('Longest path (cycles condensed):', self.longest_path) + '\n'
+
+        statistic_info += line('Total external links:', totals['total_external_links'])
+        statistic_info += line('Total dead links:', totals['total_dead_links'])
+        statistic_info += line('Total phone links:', totals['total_phone_links'])
+        statistic_info += line('Total email links:', totals['total_email_links'])
+        statistic_info += line('Total file links:', totals['total_file_links']) + '\n'
+        statistic_info += line('Average number of internal links per page:', averages['internal_links_per_page'])
+        statistic_info += line('Average number of external links per page:', averages['external_links_per_page'])
+        statistic_info += line('Average size (in bytes) per page:', averages['page_size_bytes'])
+        if self.size_percentiles:
+            labels = ' / '.join(f'p{percentile}' for percentile in self.size_percentiles)
+            statistic_info += line(f'Page size {labels} (bytes):',
+                                   ' / '.join(str(size) for size in self.size_percentiles.values()))
+
+        if self.incoming_links is not None:
+            minimum_incoming_links = self.incoming_links['minimum_incoming_links']
+            maximum_incoming_links = self.incoming_links['maximum_incoming_links']
+
+            statistic_info += f'\n\nMinimum incoming links for {len(minimum_incoming_links["links"])} pages:       {minimum_incoming_links["incoming_links_count"]}\n\n'
+            for link in minimum_incoming_links['links']:
+                statistic_info += f'>>  HTTP: {self.link_statuses.get(link)}   {link}\n'
+
+            statistic_info += f'\nMaximum incoming links for {len(maximum_incoming_links["links"])} pages:         {maximum_incoming_links["incoming_links_count"]}\n\n'
+            for link in maximum_incoming_links['links']:
+                statistic_info += f'>>  HTTP: {self.link_statuses.get(link)}   {link}\n'
+
+        if self.duplicates_saved is not None:
+            statistic_info += '\n' + line('Duplicate fetches saved (canonical urls):', self.duplicates_saved)
+
+        if self.cache_statistics is not None:
+            statistic_info += '\n' + line('HTTP cache hits:', self.cache_statistics['hits'])
+            statistic_info += line('HTTP cache misses:', self.cache_statistics['misses'])
+            statistic_info += line('HTTP cache bytes saved:', self.cache_statistics['bytes_saved'])
+
+        response_times = self.get_response_time_percentiles()
+        if response_times is not None:
+            statistic_info += '\n' + line('Response time p50 / p95 / max (seconds):',
+                                          f'{response_times["p50"]:.3f} / {response_times["p95"]:.3f} / {response_times["max"]:.3f}')
+            statistic_info += '\nSlowest pages:\n\n'
+            for link, seconds in self.slow_pages or []:
+                statistic_info += f'>>  {seconds:.3f} s   {link}\n'
+
+        return statistic_info
@@ -0,0 +1,278 @@
+import sqlite3
+from threading import Lock
+from collections import Counter
+from app.link_classifier import LINK_CATEGORIES
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url             TEXT PRIMARY KEY,
+    http_status     INTEGER,
+    page_size_bytes INTEGER,
+    crawled_at      REAL
+);
+CREATE TABLE IF NOT EXISTS links (
+    page     TEXT NOT NULL,
+    category TEXT NOT NULL,
+    url      TEXT NOT NULL,
+    count    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    weight INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_http_status ON pages (http_status);
+CREATE INDEX IF NOT EXISTS links_page ON links (page);
+CREATE INDEX IF NOT EXISTS edges_source ON edges (source);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target);
+'''
+
+
+class CrawlStore():
+    def __init__(self, database_path: str = 'crawl.sqlite', batch_size: int = 500) -> None:
+        '''
+        Embedded SQLite storage of the crawled pages, their links by category and the graph edges:
+            pages - url, HTTP status, page size and crawl time of each page
+            links - the links of each page by category with their number of occurrences
+            edges - (source, target, weight) edges of the graph, with canonical urls
+
+        The pages are buffered and written batch_size at a time in one transaction,
+        call flush (or close) to write the remaining ones before querying.
+        ':memory:' keeps the database in memory.
+        '''
+
+        if batch_size < 1:
+            raise ValueError(
+                f'batch_size is {batch_size}, expected to be at least 1')
+
+        self.database_path: str = database_path
+        self.batch_size: int = batch_size
+        self.pending_pages: dict = {}
+        self.lock = Lock()
+        # the crawl workers can record pages from other threads, the lock serializes them
+        self.connection = sqlite3.connect(
+            database_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        # the url indexes are updated in random order, a bigger page cache avoids re-reading them
+        self.connection.execute('PRAGMA cache_size = -65536')
+        self.connection.executescript(SCHEMA)
+
+    def __str__(self) -> str:
+        return f'CrawlStore(database_path={self.database_path}, pages={self.count_pages()})'
+
+    def __enter__(self) -> 'CrawlStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.flush()
+        with self.lock:
+            self.connection.close()
+
+    def add_page(self, link: str, page: dict, edges: list = None, crawled_at: float = None) -> None:
+        '''
+        Buffer the page, its links and its graph edges, they replace the stored ones of the link.
+        '''
+
+        with self.lock:
+            self.pending_pages[link] = (page, edges or [], crawled_at)
+            if len(self.pending_pages) < self.batch_size:
+                return
+        self.flush()
+
+    def remove_page(self, link: str) -> None:
+        self.flush()
+        with self.lock, self.connection:
+            self.__delete_pages([(link,)])
+
+    def flush(self) -> None:
+        '''
+        Write the buffered pages in one transaction.
+        '''
+
+        with self.lock:
+            if not self.pending_pages:
+                return
+            pending_pages, self.pending_pages = self.pending_pages, {}
+
+            pages, links, edges = [], [], []
+            for link, (page, page_edges, crawled_at) in pending_pages.items():
+                pages.append((link, page.get('HTTP_STATUS'),
+                             page.get('page_size_bytes'), crawled_at))
+                for category in LINK_CATEGORIES:
+                    links.extend((link, category, url, count)
+                                 for url, count in page.get(category, {}).items())
+                edges.extend(page_edges)
+
+            with self.connection:
+                self.__delete_pages([(link,) for link in pending_pages])
+                self.connection.executemany(
+                    'INSERT INTO pages VALUES (?, ?, ?, ?)', pages)
+                self.connection.executemany(
+                    'INSERT INTO links VALUES (?, ?, ?, ?)', links)
+                self.connection.executemany(
+                    'INSERT INTO edges VALUES (?, ?, ?)', edges)
+
+    def __delete_pages(self, links: list) -> None:
+        self.connection.executemany('DELETE FROM pages WHERE url = ?', links)
+        self.connection.executemany('DELETE FROM links WHERE page = ?', links)
+        self.connection.executemany(
+            'DELETE FROM edges WHERE source = ?', links)
+
+    def write_map_dict(self, map_dict: dict, get_graph_edges=None) -> None:
+        '''
+        Bulk write the pages of map_dict, get_graph_edges(link) returns the edges of a page.
+        '''
+
+        for link, page in map_dict.items():
+            edges = get_graph_edges(link) if get_graph_edges is not None else None
+            self.add_page(link, page, edges)
+        self.flush()
+
+    def write_adj_list_graph(self, adj_list_graph: dict) -> None:
+        '''
+        Replace the stored edges with the edges of the adjacency list.
+        '''
+
+        self.flush()
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM edges')
+            for edges in adj_list_graph.values():
+                self.connection.executemany(
+                    'INSERT INTO edges VALUES (?, ?, ?)', [tuple(edge) for edge in edges])
+
+    def __query(self, sql: str, parameters: tuple = ()) -> list:
+        self.flush()
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def count_pages(self) -> int:
+        return self.__query('SELECT COUNT(*) FROM pages')[0][0]
+
+    def get_page(self, link: str) -> dict:
+        '''
+        Return the page in the map_dict format, None if it is not stored.
+        '''
+
+        rows = self.__query(
+            'SELECT http_status, page_size_bytes FROM pages WHERE url = ?', (link,))
+        if not rows:
+            return None
+
+        page = {category: Counter() for category in LINK_CATEGORIES}
+        for category, url, count in self.__query('SELECT category, url, count FROM links WHERE page = ? ORDER BY rowid', (link,)):
+            page[category][url] = count
+        page['HTTP_STATUS'], page['page_size_bytes'] = rows[0]
+        if page['page_size_bytes'] is None:
+            del page['page_size_bytes']
+        return page
+
+    def load_map_dict(self) -> dict:
+        '''
+        Return every stored page in the map_dict format, in the order they were written.
+        '''
+
+        map_dict = {}
+        for url, http_status, page_size_bytes in self.__query('SELECT url, http_status, page_size_bytes FROM pages ORDER BY rowid'):
+            map_dict[url] = {category: Counter()
+                             for category in LINK_CATEGORIES}
+            map_dict[url]['HTTP_STATUS'] = http_status
+            if page_size_bytes is not None:
+                map_dict[url]['page_size_bytes'] = page_size_bytes
+        for page, category, url, count in self.__query('SELECT page, category, url, count FROM links ORDER BY rowid'):
+            map_dict[page][category][url] = count
+        return map_dict
+
+    def load_adj_list_graph(self) -> dict:
+        '''
+        Return the stored edges as an adjacency list, the pages without edges have an empty list.
+        '''
+
+        adj_list_graph = {}
+        for source, target, weight in self.__query('SELECT source, target, weight FROM edges ORDER BY rowid'):
+            adj_list_graph.setdefault(source, []).append(
+                (source, target, weight))
+        for (url,) in self.__query('SELECT url FROM pages WHERE url NOT IN (SELECT source FROM edges) ORDER BY rowid'):
+            adj_list_graph[url] = []
+        return adj_list_graph
+
+    def get_status_counts(self) -> dict:
+        '''
+        Return the number of pages of each HTTP status, in the order the statuses were first seen.
+        '''
+
+        return dict(self.__query('SELECT http_status, COUNT(*) FROM pages GROUP BY http_status ORDER BY MIN(rowid)'))
+
+    def get_link_totals(self) -> dict:
+        '''
+        Return the number of different links of each category summed over the pages.
+        '''
+
+        totals = dict.fromkeys(LINK_CATEGORIES, 0)
+        totals.update(self.__query(
+            'SELECT category, COUNT(*) FROM links GROUP BY category'))
+        return totals
+
+    def get_statistics(self) -> dict:
+        '''
+        Return the totals of get_webpage_statistics:
+        {'total_webpages': 361, 'http_statuses': {200: 360, 404: 1},
+         'total_internal_links': 17409, ..., 'total_page_size_bytes': 43005432}
+        '''
+
+        statistics = {'total_webpages': self.count_pages(),
+                      'http_statuses': self.get_status_counts()}
+        for category, total in self.get_link_totals().items():
+            statistics[f'total_{category}'] = total
+        statistics['total_page_size_bytes'] = self.__query(
+            'SELECT COALESCE(SUM(page_size_bytes), 0) FROM pages')[0][0]
+        return statistics
+
+    def count_incoming_edges(self) -> dict:
+        '''
+        Count the incoming edges (backlinks) of each node, like Graph.count_incoming_edges.
+        '''
+
+        # the grouped counts are read from the target index, the other nodes have no incoming edge
+        incoming_edges = {url: 0 for (url,) in self.__query('SELECT url FROM pages')}
+        incoming_edges.update((url, 0) for (url,) in self.__query(
+            'SELECT DISTINCT source FROM edges'))
+        incoming_edges.update(self.__query(
+            'SELECT target, COUNT(*) FROM edges GROUP BY target'))
+        return incoming_edges
+
+    def get_nodes_with_min_max_links(self) -> dict:
+        '''
+        Returns the node(s) with minimum and maximum number of incoming links,
+        in the format of Graph.get_nodes_with_min_max_links.
+        '''
+
+        incoming_links = self.count_incoming_edges()
+        if not incoming_links:
+            raise ValueError('The crawl store is empty')
+        min_count = min(incoming_links.values())
+        max_count = max(incoming_links.values())
+        return {
+            'minimum_incoming_links': {'links': [url for url, count in incoming_links.items() if count == min_count],
+                                       'incoming_links_count': min_count},
+            'maximum_incoming_links': {'links': [url for url, count in incoming_links.items() if count == max_count],
+                                       'incoming_links_count': max_count}
+        }
+
+    def get_pages_by_status(self, http_status: int, min_backlinks: int = 0) -> list:
+        '''
+        Return the (url, backlinks) of the pages with the HTTP status that have at least
+        min_backlinks incoming edges, the pages with most backlinks first.
+        '''
+
+        return self.__query('''
+            SELECT pages.url, COUNT(edges.source) AS backlinks FROM pages
+                LEFT JOIN edges ON edges.target = pages.url
+            WHERE pages.http_status = ?
+            GROUP BY pages.url
+            HAVING backlinks >= ?
+            ORDER BY backlinks DESC, pages.url''', (http_status, min_backlinks))
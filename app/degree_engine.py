@@ -0,0 +1,83 @@
+import numpy as np
+from app.compact_graph import CompactGraph
+
+
+DEGREE_KINDS = ('in_degree', 'out_degree',
+                'weighted_in_degree', 'weighted_out_degree')
+
+
+class DegreeEngine():
+    def __init__(self, compact_graph: CompactGraph) -> None:
+        '''
+        Degrees of every node of a compact graph, computed once with NumPy:
+            in_degree           - number of incoming edges (backlinks)
+            out_degree          - number of outgoing edges
+            weighted_in_degree  - sum of the weights of the incoming edges
+            weighted_out_degree - sum of the weights of the outgoing edges
+
+        The arrays are indexed by node id, the engine must be rebuilt when the graph changes.
+        '''
+
+        node_count = compact_graph.node_count
+        sources = np.repeat(np.arange(node_count, dtype=np.int32),
+                            np.diff(compact_graph.offsets))
+
+        self.compact_graph: CompactGraph = compact_graph
+        self.in_degree: np.ndarray = np.bincount(
+            compact_graph.targets, minlength=node_count)
+        self.out_degree: np.ndarray = np.diff(compact_graph.offsets)
+        self.weighted_in_degree: np.ndarray = np.bincount(
+            compact_graph.targets, weights=compact_graph.weights, minlength=node_count).astype(np.int64)
+        self.weighted_out_degree: np.ndarray = np.bincount(
+            sources, weights=compact_graph.weights, minlength=node_count).astype(np.int64)
+
+    def __str__(self) -> str:
+        return f'DegreeEngine(nodes={self.compact_graph.node_count})'
+
+    def get_degrees(self, kind: str = 'in_degree') -> np.ndarray:
+        if kind not in DEGREE_KINDS:
+            raise ValueError(
+                f'kind is {kind}, expected to be one of {DEGREE_KINDS}')
+        return getattr(self, kind)
+
+    def as_dict(self, kind: str = 'in_degree') -> dict:
+        '''
+        Return the degrees keyed by the url of the nodes.
+        '''
+
+        return dict(zip(self.compact_graph.nodes, self.get_degrees(kind).tolist()))
+
+    def top_k(self, k: int = None, kind: str = 'in_degree') -> list:
+        '''
+        Return the k nodes with the highest degree as (url, degree) tuples,
+        all the nodes ranked if k is None. Ties keep the order of the node ids.
+        '''
+
+        degrees = self.get_degrees(kind)
+        return self.__ranking(np.argsort(-degrees, kind='stable'), degrees, k)
+
+    def bottom_k(self, k: int = None, kind: str = 'in_degree') -> list:
+        '''
+        Return the k nodes with the lowest degree as (url, degree) tuples,
+        all the nodes ranked if k is None. Ties keep the order of the node ids.
+        '''
+
+        degrees = self.get_degrees(kind)
+        return self.__ranking(np.argsort(degrees, kind='stable'), degrees, k)
+
+    def nodes_with_degree(self, degree: int, kind: str = 'in_degree') -> list:
+        '''
+        Return the urls of the nodes with the given degree, in node id order.
+        '''
+
+        node_ids = np.flatnonzero(self.get_degrees(kind) == degree)
+        return [self.compact_graph.nodes[node_id] for node_id in node_ids.tolist()]
+
+    def __ranking(self, order: np.ndarray, degrees: np.ndarray, k: int) -> list:
+        if k is not None:
+            if k < 0:
+                raise ValueError(f'k is {k}, expected to be at least 0')
+            order = order[:k]
+        nodes = self.compact_graph.nodes
+        return [(nodes[node_id], degree)
+                for node_id, degree in zip(order.tolist(), degrees[order].tolist())]
@@ -0,0 +1,198 @@
+import time
+import socket
+import random
+from threading import Lock
+from requests import exceptions
+
+
+# HTTP_STATUS of the pages that could not be fetched
+TIMEOUT_STATUS = 'TIMEOUT'
+DNS_STATUS = 'DNS_ERROR'
+TLS_STATUS = 'TLS_ERROR'
+CONNECTION_STATUS = 'CONNECTION_ERROR'
+CIRCUIT_OPEN_STATUS = 'CIRCUIT_OPEN'
+REQUEST_ERROR_STATUS = 'REQUEST_ERROR'
+FAILURE_STATUSES = (TIMEOUT_STATUS, DNS_STATUS, TLS_STATUS, CONNECTION_STATUS,
+                    CIRCUIT_OPEN_STATUS, REQUEST_ERROR_STATUS)
+# failures that can pass on a new attempt, a DNS or TLS error fails the same way again
+RETRIED_STATUSES = (TIMEOUT_STATUS, CONNECTION_STATUS)
+
+
+class FetchFailed(Exception):
+    def __init__(self, url: str, status: str, elapsed: float = None) -> None:
+        '''
+        The page could not be fetched, status is recorded as its HTTP_STATUS.
+        elapsed - seconds spent on the requests, None if no request was sent
+        '''
+
+        super().__init__(f'{status}: {url}')
+        self.url: str = url
+        self.status: str = status
+        self.elapsed: float = elapsed
+
+
+def classify_exception(exc: Exception) -> str:
+    '''
+    Return the failure status of a requests exception.
+    '''
+
+    if isinstance(exc, exceptions.Timeout):
+        return TIMEOUT_STATUS
+    if isinstance(exc, exceptions.SSLError):
+        return TLS_STATUS
+    if isinstance(exc, exceptions.ConnectionError):
+        # the name resolution error is wrapped by urllib3 (reason) and requests (args)
+        cause, seen = exc, set()
+        while cause is not None and id(cause) not in seen:
+            seen.add(id(cause))
+            if isinstance(cause, socket.gaierror) or type(cause).__name__ == 'NameResolutionError':
+                return DNS_STATUS
+            wrapped = cause.args[0] if cause.args and isinstance(
+                cause.args[0], Exception) else None
+            cause = getattr(cause, 'reason', None) or cause.__cause__ or cause.__context__ or wrapped
+        return CONNECTION_STATUS
+    return REQUEST_ERROR_STATUS
+
+
+class CircuitBreaker():
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        '''
+        Stop querying a host after failure_threshold consecutive failures (open), let one
+        request through after reset_timeout seconds (half open) and close on its success.
+        '''
+
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float = None
+        self.trial_running: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial_running or now - self.opened_at < self.reset_timeout:
+            return False
+        # half open, a single trial request
+        self.trial_running = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.trial_running or self.failures >= self.failure_threshold:
+            self.opened_at = now
+        self.trial_running = False
+
+    def release_trial(self) -> None:
+        '''
+        The trial request ended without telling whether the host is up, the next request is a new trial.
+        '''
+
+        self.trial_running = False
+
+
+class FetchPolicy():
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 15.0, max_retries: int = 2,
+                 backoff: float = 0.5, max_backoff: float = 10.0, failure_threshold: int = 10,
+                 reset_timeout: float = 30.0) -> None:
+        '''
+        Bound the time spent on each page:
+            - connect_timeout / read_timeout seconds for each request
+            - the timeouts and connection errors are retried max_retries times, after a random
+              (full jitter) wait of up to backoff * 2 ** attempt seconds (at most max_backoff)
+            - a circuit breaker per host, after failure_threshold consecutive failed pages (every
+              retry failed) the pages of the host fail at once (CIRCUIT_OPEN) for reset_timeout seconds
+
+        A page that cannot be fetched raises FetchFailed with its failure status.
+        '''
+
+        for name, value in [('connect_timeout', connect_timeout), ('read_timeout', read_timeout),
+                            ('failure_threshold', failure_threshold)]:
+            if value <= 0:
+                raise ValueError(
+                    f'{name} is {value}, expected to be greater than 0')
+        if max_retries < 0:
+            raise ValueError(
+                f'max_retries is {max_retries}, expected to be at least 0')
+
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.circuit_breakers: dict = {}
+        self.retries: int = 0
+        self.lock = Lock()
+        self.random = random.Random()
+
+    def __str__(self) -> str:
+        return f'FetchPolicy(timeout={self.timeout}, max_retries={self.max_retries})'
+
+    @property
+    def timeout(self) -> tuple:
+        '''The timeout argument of requests'''
+        return (self.connect_timeout, self.read_timeout)
+
+    def __circuit_breaker(self, host: str) -> CircuitBreaker:
+        circuit_breaker = self.circuit_breakers.get(host)
+        if circuit_breaker is None:
+            circuit_breaker = self.circuit_breakers[host] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout)
+        return circuit_breaker
+
+    def get_backoff(self, attempt: int) -> float:
+        return self.random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def fetch(self, host: str, url: str, send):
+        '''
+        Call send(timeout) and return its response, retrying the failures that can pass.
+        '''
+
+        start = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            with self.lock:
+                allowed = self.__circuit_breaker(host).allow(time.monotonic())
+            if not allowed:
+                raise FetchFailed(url, CIRCUIT_OPEN_STATUS,
+                                  time.monotonic() - start if attempt else None)
+
+            try:
+                response = send(self.timeout)
+            except exceptions.RequestException as exc:
+                status = classify_exception(exc)
+                if status not in RETRIED_STATUSES or attempt == self.max_retries:
+                    with self.lock:
+                        self.__circuit_breaker(host).record_failure(
+                            time.monotonic())
+                    raise FetchFailed(url, status, time.monotonic() - start) from exc
+                with self.lock:
+                    self.retries += 1
+                time.sleep(self.get_backoff(attempt))
+                continue
+            except BaseException:
+                # not a transport failure (like a robots.txt refusal), the host is not judged
+                with self.lock:
+                    self.__circuit_breaker(host).release_trial()
+                raise
+
+            with self.lock:
+                self.__circuit_breaker(host).record_success()
+            return response
+
+    def get_open_circuits(self) -> list:
+        '''
+        Return the hosts whose circuit breaker is open.
+        '''
+
+        with self.lock:
+            return [host for host, circuit_breaker in self.circuit_breakers.items() if circuit_breaker.is_open]
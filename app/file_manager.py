@@ -1,4 +1,13 @@
+import os
 import json
+from threading import Lock
+from app.compact_graph import CompactGraph
+from app.graph_codec import GRAPH_EXTENSION, COMPRESSED_GRAPH_EXTENSION, write_compact_graph, read_compact_graph
+
+
+# file extensions supported by FileManager.save / load
+FILE_EXTENSIONS = ('.json', '.jsonl', GRAPH_EXTENSION,
+                   COMPRESSED_GRAPH_EXTENSION)
 
 
 class FileManager():
@@ -29,3 +38,148 @@ class FileManager():
             except Exception as exc:
                 print(
                     f'Exception occured when trying to read from the json file with name={file_name}: {exc}')
+
+    def open_jsonl_writer(self, file_name: str, append: bool = False) -> 'JsonLinesWriter':
+        '''
+        Open a JSON Lines file to write the pages one by one as they are crawled.
+        '''
+        return JsonLinesWriter(file_name=file_name, append=append)
+
+    def write_to_jsonl(self, file_name: str = 'file', data: dict = {}) -> None:
+        '''
+        Write the data to a JSON Lines file, one line per key.
+        '''
+        if not data:
+            raise ValueError('The data is empty')
+
+        with self.open_jsonl_writer(file_name=file_name) as writer:
+            for key, value in data.items():
+                writer.write(key, value)
+
+    def iter_jsonl(self, file_name: str):
+        '''
+        Yield the (key, value) records of a JSON Lines file, value is None for removed keys.
+        A truncated last line (the writer process crashed) is skipped.
+        '''
+        with open(f'{file_name}.jsonl', mode='r', encoding='utf8') as fhandle:
+            for line_number, line in enumerate(fhandle, start=1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    if line.endswith('\n'):
+                        raise ValueError(
+                            f'Invalid line {line_number} in {file_name}.jsonl: {exc}') from exc
+                    print(
+                        f'Skipping the truncated last line of {file_name}.jsonl')
+                    return
+                yield record['key'], record.get('value')
+
+    def load_from_jsonl(self, file_name: str) -> dict:
+        '''
+        Load the dictionary from a JSON Lines file, the last record of a key wins.
+        '''
+        data = {}
+        for key, value in self.iter_jsonl(file_name=file_name):
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        return data
+
+    def convert_json_to_jsonl(self, file_name: str) -> None:
+        '''
+        Convert the file_name.json file to file_name.jsonl.
+        '''
+        self.write_to_jsonl(file_name=file_name,
+                            data=self.load_from_json(file_name=file_name))
+
+    def save(self, file_path: str, data) -> None:
+        '''
+        Write the data with the codec chosen from the file extension:
+            .json   - json file (dict)
+            .jsonl  - JSON Lines file, one line per key (dict)
+            .graph  - binary graph (adjacency list dict or CompactGraph)
+            .graphz - zlib compressed binary graph
+        '''
+        file_name, extension = self.__split_extension(file_path)
+        if extension in (GRAPH_EXTENSION, COMPRESSED_GRAPH_EXTENSION):
+            if not isinstance(data, CompactGraph):
+                if not data:
+                    raise ValueError('The data is empty')
+                data = CompactGraph.from_adj_list_graph(data)
+            write_compact_graph(file_path, data,
+                                compress=extension == COMPRESSED_GRAPH_EXTENSION)
+            return
+
+        if isinstance(data, CompactGraph):
+            data = data.to_adj_list_graph()
+        if extension == '.json':
+            self.write_to_file(file_name=file_name, data=data)
+        else:
+            self.write_to_jsonl(file_name=file_name, data=data)
+
+    def load(self, file_path: str):
+        '''
+        Load the data with the codec chosen from the file extension (see save),
+        the binary graph files are loaded as CompactGraph.
+        '''
+        file_name, extension = self.__split_extension(file_path)
+        if extension in (GRAPH_EXTENSION, COMPRESSED_GRAPH_EXTENSION):
+            return read_compact_graph(file_path)
+        if extension == '.json':
+            return self.load_from_json(file_name=file_name)
+        return self.load_from_jsonl(file_name=file_name)
+
+    def convert(self, source_path: str, destination_path: str) -> None:
+        '''
+        Convert a file to the format of the destination extension, for example
+        adj_list_graph.json to adj_list_graph.graph and back.
+        '''
+        self.save(destination_path, self.load(source_path))
+
+    @staticmethod
+    def __split_extension(file_path: str) -> tuple:
+        file_name, extension = os.path.splitext(file_path)
+        if extension not in FILE_EXTENSIONS:
+            raise ValueError(
+                f'The file extension is {extension}, expected to be one of {FILE_EXTENSIONS}')
+        return file_name, extension
+
+
+class JsonLinesWriter():
+    def __init__(self, file_name: str, append: bool = False) -> None:
+        '''
+        Append-only JSON Lines writer, each record is written and flushed as one line:
+            {"key": "https://www.globalapptesting.com/", "value": {"internal_links": {...}, ...}}
+        a removed key is written with a null value. It can be shared by threads.
+        '''
+
+        self.file_name: str = file_name
+        self.fhandle = open(f'{file_name}.jsonl', mode='a' if append else 'w',
+                            encoding='utf8')
+        self.lock = Lock()
+        self.records_count: int = 0
+
+    def __str__(self) -> str:
+        return f'JsonLinesWriter(file_name={self.file_name}.jsonl, records={self.records_count})'
+
+    def __enter__(self) -> 'JsonLinesWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, key: str, value: dict) -> None:
+        line = json.dumps({'key': key, 'value': value}) + '\n'
+        with self.lock:
+            self.fhandle.write(line)
+            self.fhandle.flush()
+            self.records_count += 1
+
+    def remove(self, key: str) -> None:
+        self.write(key, None)
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.fhandle.closed:
+                self.fhandle.close()
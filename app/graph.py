@@ -1,6 +1,11 @@
-import sys
 import heapq
 from app.file_manager import FileManager
+from app.compact_graph import CompactGraph
+from app.degree_engine import DegreeEngine
+from app.path_engine import PathEngine
+from app.shortest_paths import ShortestPaths
+from app.click_depth_matrix import ClickDepthMatrix
+from app.crawl_store import CrawlStore
 
 
 class Graph:
@@ -9,33 +14,123 @@ class Graph:
         self.file_manager = file_manager
         self.visited: dict = {}
         self.node_dependencies: dict = {}
+        self.compact_graph: CompactGraph = None
+        self.compact_graph_source = None
+        self.degree_engine: DegreeEngine = None
+        self.path_engine: PathEngine = None
+        self.shortest_paths: ShortestPaths = None
+
+    @classmethod
+    def from_compact_graph(cls, compact_graph: CompactGraph, file_manager: FileManager) -> 'Graph':
+        '''
+        Create a Graph that keeps only the compact representation,
+        adj_list_graph is a read only dict-style view of it.
+        '''
+
+        graph = cls(adj_list_graph=compact_graph.view(),
+                    file_manager=file_manager)
+        graph.compact_graph = compact_graph
+        graph.compact_graph_source = graph.adj_list_graph
+        return graph
+
+    @classmethod
+    def from_crawl_store(cls, crawl_store: CrawlStore, file_manager: FileManager) -> 'Graph':
+        '''
+        Create a Graph from the edges of the crawl store.
+        '''
+
+        return cls(adj_list_graph=crawl_store.load_adj_list_graph(), file_manager=file_manager)
+
+    def write_adj_list_graph_to_crawl_store(self, crawl_store: CrawlStore) -> None:
+        '''
+        Replace the edges of the crawl store with the edges of the graph.
+        '''
+
+        if not self.adj_list_graph:
+            raise ValueError('The adj_list_graph is empty')
+        crawl_store.write_adj_list_graph(self.adj_list_graph)
 
     def get_adj_list_graph(self) -> dict:
         return self.adj_list_graph
 
-    def get_nodes_with_min_max_links(self):
+    def get_compact_graph(self) -> CompactGraph:
         '''
-        Returns a list of node(s) with minimum and maximum number of links.
+        Return the compact (CSR) representation of adj_list_graph used by the graph algorithms.
+        It is built once and rebuilt when adj_list_graph is replaced or invalidate_cache is called.
+        '''
+
+        if not self.adj_list_graph:
+            raise ValueError('The adj_list_graph is empty')
+
+        if self.compact_graph is None or self.compact_graph_source is not self.adj_list_graph \
+                or self.compact_graph.source_count != len(self.adj_list_graph):
+            self.compact_graph = CompactGraph.from_adj_list_graph(
+                self.adj_list_graph)
+            self.compact_graph_source = self.adj_list_graph
+        return self.compact_graph
+
+    def invalidate_cache(self) -> None:
+        '''
+        Drop the cached compact graph, must be called after adj_list_graph is changed in place.
         '''
 
-        incoming_links_counter = self.count_incoming_edges()
+        self.compact_graph = None
+        self.compact_graph_source = None
+        self.degree_engine = None
+        self.path_engine = None
+        self.shortest_paths = None
 
-        min = sys.maxsize
-        max = 0
-        for key_link, incoming_count in incoming_links_counter.items():
-            if min > incoming_count:
-                min = incoming_count
-            if max < incoming_count:
-                max = incoming_count
+    def get_degree_engine(self) -> DegreeEngine:
+        '''
+        Return the in / out / weighted degrees of the nodes, cached until the compact graph is rebuilt.
+        '''
 
-        min_links = []
-        max_links = []
+        compact_graph = self.get_compact_graph()
+        if self.degree_engine is None or self.degree_engine.compact_graph is not compact_graph:
+            self.degree_engine = DegreeEngine(compact_graph)
+        return self.degree_engine
 
-        for key_link, incoming_count in incoming_links_counter.items():
-            if min == incoming_count:
-                min_links.append(key_link)
-            elif max == incoming_count:
-                max_links.append(key_link)
+    def get_path_engine(self) -> PathEngine:
+        '''
+        Return the longest path / eccentricity engine, cached until the compact graph is rebuilt.
+        '''
+
+        compact_graph = self.get_compact_graph()
+        if self.path_engine is None or self.path_engine.compact_graph is not compact_graph:
+            self.path_engine = PathEngine(compact_graph)
+        return self.path_engine
+
+    def get_shortest_paths(self) -> ShortestPaths:
+        '''
+        Return the shortest path engine, its distance tables are cached until the compact graph is rebuilt.
+        '''
+
+        compact_graph = self.get_compact_graph()
+        if self.shortest_paths is None or self.shortest_paths.compact_graph is not compact_graph:
+            self.shortest_paths = ShortestPaths(compact_graph)
+        return self.shortest_paths
+
+    def build_click_depth_matrix(self, workers: int = None, memmap_path: str = None) -> ClickDepthMatrix:
+        '''
+        Compute the click distance between every pair of pages, the BFS runs are split
+        over a pool of workers processes. See ClickDepthMatrix.build.
+        '''
+
+        return ClickDepthMatrix.build(self.get_compact_graph(), workers=workers,
+                                      memmap_path=memmap_path)
+
+    def get_nodes_with_min_max_links(self):
+        '''
+        Returns a list of node(s) with minimum and maximum number of links.
+        '''
+
+        degree_engine = self.get_degree_engine()
+        min = int(degree_engine.in_degree.min())
+        max = int(degree_engine.in_degree.max())
+
+        # a node is in both lists when every node has the same number of incoming links
+        min_links = degree_engine.nodes_with_degree(min)
+        max_links = degree_engine.nodes_with_degree(max)
 
         return {
             'minimum_incoming_links': {'links': min_links, 'incoming_links_count': min},
@@ -47,17 +142,7 @@ class Graph:
         Count the number of incoming (inbound or backlinks) edges for each node.
         '''
 
-        if not self.adj_list_graph:
-            raise ValueError('The adj_list_graph is empty')
-
-        incoming_links_counter = dict.fromkeys(self.adj_list_graph, 0)
-
-        for _, value_list in self.adj_list_graph.items():
-            for (_, destination, _) in value_list:
-                incoming_links_counter[destination] = incoming_links_counter.get(
-                    destination, 0) + 1
-
-        return incoming_links_counter
+        return self.get_degree_engine().as_dict('in_degree')
 
     def load_adj_list_graph_from_json(self, file_name: str) -> dict:
         '''
@@ -67,6 +152,27 @@ class Graph:
             file_name=file_name)
         return self.adj_list_graph
 
+    def load_graph(self, file_path: str) -> dict:
+        '''
+        Load the graph from a .json or binary .graph / .graphz file, the binary files are
+        loaded as compact graph and adj_list_graph is a read only dict-style view of it.
+        '''
+        data = self.file_manager.load(file_path)
+        self.invalidate_cache()
+        if isinstance(data, CompactGraph):
+            self.compact_graph = data
+            self.adj_list_graph = data.view()
+            self.compact_graph_source = self.adj_list_graph
+        else:
+            self.adj_list_graph = data
+        return self.adj_list_graph
+
+    def write_graph(self, file_path: str) -> None:
+        '''
+        Write the graph to a .json or binary .graph / .graphz file.
+        '''
+        self.file_manager.save(file_path, self.get_compact_graph())
+
     def write_adj_list_graph_to_json_file(self, file_name: str = 'adj_list_graph') -> None:
         '''
         Write / Dump the adj_list_graph dict into json file.
@@ -79,65 +185,82 @@ class Graph:
 
     def dijsktra(self, start_node: str, target_node: str):
         '''Shortest path, iterative version - dijsktra algorithm'''
-        if not self.adj_list_graph:
-            raise ValueError('The adj_list_graph is empty')
+        compact_graph = self.get_compact_graph()
+        offsets = compact_graph.offsets.tolist()
+        targets = compact_graph.targets.tolist()
+        nodes = compact_graph.nodes
 
-        node_dependencies = {start_node: 0}
-        parent = {start_node: None}
-        priority_queue = [(0, start_node)]
+        start_id = compact_graph.node_id(start_node)
+        target_id = compact_graph.node_ids.get(target_node)
+        distances = {start_id: 0}
+        parent_ids = {start_id: None}
+        priority_queue = [(0, start_id)]
         visited = set()
         while priority_queue:
-            distance, current_node = heapq.heappop(priority_queue)
-            if current_node in visited:
+            distance, current_id = heapq.heappop(priority_queue)
+            if current_id in visited:
                 continue
-            if current_node == target_node:
+            if current_id == target_id:
                 break
-            visited.add(current_node)
-            for _, neighbor_node, _ in self.adj_list_graph[current_node]:
-                if neighbor_node not in node_dependencies or node_dependencies[neighbor_node] > distance + 1:
-                    node_dependencies[neighbor_node] = distance + 1
-                    parent[neighbor_node] = current_node
+            visited.add(current_id)
+            for neighbor_id in targets[offsets[current_id]:offsets[current_id + 1]]:
+                if neighbor_id not in distances or distances[neighbor_id] > distance + 1:
+                    distances[neighbor_id] = distance + 1
+                    parent_ids[neighbor_id] = current_id
                     heapq.heappush(
-                        priority_queue, (node_dependencies[neighbor_node], neighbor_node))
+                        priority_queue, (distances[neighbor_id], neighbor_id))
 
+        parent = {nodes[node_id]: None if parent_id is None else nodes[parent_id]
+                  for node_id, parent_id in parent_ids.items()}
+        node_dependencies = {nodes[node_id]: distance
+                             for node_id, distance in distances.items()}
         return parent, node_dependencies
 
     def get_longest_path(self) -> int:
-        '''Get the longest path in the graph using Depth First Search algorithm, recursive version'''
+        '''
+        Get the longest path in the graph, the strongly connected components (cycles) are
+        condensed first so the longest path is computed on a DAG in topological order.
+        '''
 
-        if not self.adj_list_graph:
-            raise ValueError('The adj_list_graph is empty')
+        path_engine = self.get_path_engine()
+        longest_paths = path_engine.get_longest_paths().tolist()
 
-        self.visited = dict.fromkeys(self.adj_list_graph, False)
-        # node connections
-        self.node_dependencies = dict.fromkeys(self.adj_list_graph, 0)
+        compact_graph = path_engine.compact_graph
+        self.visited = dict.fromkeys(compact_graph.nodes, True)
+        # longest path starting from each node
+        self.node_dependencies = dict(zip(compact_graph.nodes, longest_paths))
 
-        # Iterate over each node
-        for current_node in self.adj_list_graph.keys():
-            # call dfs if it was not visited yet
-            if not self.visited[current_node]:
-                self.__dfs(current_node=current_node)
+        return max(longest_paths)
 
-        longest_path = 0
-        # find the longest path
-        for dependency in self.node_dependencies.values():
-            longest_path = max(dependency, longest_path)
-        return longest_path
+    def get_eccentricity(self, start_node: str) -> int:
+        '''
+        Get the distance (number of clicks) from the start node to the most distant page,
+        from the root link it is the eccentricity based diameter of the website.
+        '''
 
-    def __dfs(self, current_node: str) -> None:
-        '''Depth First Search - recursive version'''
+        distances = self.get_distances(start_node)
+        return max(distance for distance in distances.values() if distance is not None)
 
-        # recursion base case
-        if self.visited[current_node]:
-            return
+    def get_distances(self, start_node: str, target_nodes: list = None, weighted: bool = False) -> dict:
+        '''
+        Get the distance (number of clicks, or sum of the edge weights if weighted) from the
+        start node to each target node, all the nodes if target_nodes is None.
+        The distances of the start node are computed once and cached.
+        '''
 
-        self.visited[current_node] = True
+        return self.get_shortest_paths().get_distances(start_node, target_nodes, weighted)
 
-        # recurrently check each neighbor
-        for _, neighbor_node, _ in self.adj_list_graph[current_node]:
-            if not self.visited[neighbor_node]:
-                self.__dfs(current_node=neighbor_node)
+    def get_shortest_path(self, start_node: str, target_node: str, weighted: bool = False, bidirectional: bool = False) -> list:
+        '''
+        Get the pages of the shortest path from the start node to the target node,
+        an empty list if the target cannot be reached. The bidirectional search does not
+        build the distance table of the start node, it is faster for one-off unweighted queries.
+        '''
 
-            # get the maximum value - the longest path between current and neighbor node
-            self.node_dependencies[current_node] = max(self.node_dependencies[current_node],
-                                                       self.node_dependencies[neighbor_node] + 1)
+        shortest_paths = self.get_shortest_paths()
+        if bidirectional:
+            if weighted:
+                raise ValueError(
+                    'The bidirectional search supports only unweighted paths')
+            return shortest_paths.get_path_bidirectional(start_node, target_node)
+        return shortest_paths.get_path(start_node, target_node, weighted)
@@ -0,0 +1,104 @@
+import zlib
+import struct
+import numpy as np
+from app.compact_graph import CompactGraph
+
+
+GRAPH_EXTENSION = '.graph'
+COMPRESSED_GRAPH_EXTENSION = '.graphz'
+
+MAGIC = b'CGRAPH\x00\x01'
+# magic, compressed flag, node_count, source_count, edge_count, string table size
+HEADER = struct.Struct('<8sQQQQQ')
+# the sections start at multiples of 8 bytes so they can be memory-mapped
+ALIGNMENT = 8
+
+
+def padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def encode_compact_graph(compact_graph: CompactGraph, compress: bool = False) -> bytes:
+    '''
+    Encode the compact graph in the binary columnar format:
+
+        header
+        string_offsets  int64[node_count + 1]  - the url of node i is strings[string_offsets[i]:string_offsets[i + 1]]
+        offsets         int64[node_count + 1]  - CSR offsets of the edges
+        targets         int32[edge_count]
+        weights         int32[edge_count]
+        strings         utf8 bytes of the urls
+
+    The sections after the header are zlib compressed if compress is True.
+    '''
+
+    encoded_urls = [url.encode('utf8') for url in compact_graph.nodes]
+    string_offsets = np.zeros(len(encoded_urls) + 1, dtype=np.int64)
+    np.cumsum([len(url) for url in encoded_urls], out=string_offsets[1:])
+    strings = b''.join(encoded_urls)
+
+    sections = [string_offsets.tobytes(),
+                np.asarray(compact_graph.offsets, dtype=np.int64).tobytes(),
+                np.asarray(compact_graph.targets, dtype=np.int32).tobytes(),
+                np.asarray(compact_graph.weights, dtype=np.int32).tobytes(),
+                strings]
+    payload = b''.join(section + b'\x00' * padding(len(section))
+                       for section in sections)
+    if compress:
+        payload = zlib.compress(payload)
+
+    header = HEADER.pack(MAGIC, int(compress), compact_graph.node_count,
+                         compact_graph.source_count, compact_graph.edge_count, len(strings))
+    return header + payload
+
+
+def decode_compact_graph(buffer, base_offset: int = 0) -> CompactGraph:
+    '''
+    Decode a compact graph from a bytes-like object (bytes, mmap or numpy memmap),
+    the arrays of an uncompressed buffer are views on it (no copy).
+    '''
+
+    magic, compressed, node_count, source_count, edge_count, strings_size = HEADER.unpack_from(
+        buffer, base_offset)
+    if magic != MAGIC:
+        raise ValueError('The data is not in the binary graph format')
+
+    position = base_offset + HEADER.size
+    if compressed:
+        buffer = zlib.decompress(bytes(buffer[position:]))
+        position = 0
+
+    def read_array(dtype, count: int) -> np.ndarray:
+        nonlocal position
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=position)
+        position += array.nbytes + padding(array.nbytes)
+        return array
+
+    string_offsets = read_array(np.int64, node_count + 1).tolist()
+    offsets = read_array(np.int64, node_count + 1)
+    targets = read_array(np.int32, edge_count)
+    weights = read_array(np.int32, edge_count)
+    strings = bytes(buffer[position:position + strings_size])
+    nodes = [strings[start:end].decode('utf8')
+             for start, end in zip(string_offsets, string_offsets[1:])]
+
+    return CompactGraph(nodes=nodes, source_count=source_count, offsets=offsets,
+                        targets=targets, weights=weights)
+
+
+def write_compact_graph(file_path: str, compact_graph: CompactGraph, compress: bool = False) -> None:
+    with open(file_path, mode='wb') as fhandle:
+        fhandle.write(encode_compact_graph(compact_graph, compress=compress))
+
+
+def read_compact_graph(file_path: str, mmap: bool = True) -> CompactGraph:
+    '''
+    Read a compact graph file, an uncompressed file is memory-mapped (the arrays are
+    read from the disk on demand) unless mmap is False.
+    '''
+
+    if mmap:
+        buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+    else:
+        buffer = np.fromfile(file_path, dtype=np.uint8)
+    return decode_compact_graph(buffer)
@@ -0,0 +1,281 @@
+import json
+from urllib.parse import urlsplit
+import numpy as np
+from app.compact_graph import CompactGraph
+from app.graph_layout import GraphLayout
+
+
+LEVELS_OF_DETAIL = ('page', 'path_prefix', 'community')
+
+NODE_FIELDS = ['id', 'label', 'pages', 'backlinks', 'errors', 'status']
+# the node fields of a laid out graph
+POSITION_FIELDS = ['x', 'y']
+EDGE_FIELDS = ['source', 'target', 'weight']
+
+VIS_NETWORK_URL = 'https://unpkg.com/vis-network@9.1.2/standalone/umd/vis-network.min.js'
+
+HTML_HEAD = f'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="{VIS_NETWORK_URL}"></script>
+<style>html, body, #graph {{ width: 100%; height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="graph"></div>
+<script>
+const graph = '''
+
+HTML_TAIL = ''';
+const field = name => graph.node_fields.indexOf(name);
+const nodes = graph.nodes.map(node => ({
+    id: node[field('id')],
+    label: node[field('status')] === null ? `${node[field('pages')]} pages` : `${node[field('status')]}`,
+    title: `${node[field('label')]}\\npages: ${node[field('pages')]}\\nbacklinks: ${node[field('backlinks')]}\\nerrors: ${node[field('errors')]}`,
+    value: node[field('backlinks')],
+    color: node[field('errors')] > 0 ? '#e06666' : '#6fa8dc',
+    ...(field('x') >= 0 ? {x: node[field('x')], y: node[field('y')]} : {}),
+}));
+const edges = graph.edges.map(([from, to, weight]) => ({from, to, value: weight, arrows: 'to'}));
+// the precomputed positions are drawn as they are, without the physics simulation
+const physics = field('x') >= 0 ? false : {stabilization: {iterations: 200}, barnesHut: {gravitationalConstant: -20000}};
+new vis.Network(document.getElementById('graph'), {nodes, edges}, {physics, edges: {smooth: false}});
+</script>
+</body>
+</html>
+'''
+
+
+def get_path_prefix(url: str, depth: int = 1) -> str:
+    '''
+    Return the url cut after depth path segments, like https://host/blog for https://host/blog/post?page=2.
+    '''
+
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment][:depth]
+    return f'{parts.scheme}://{parts.netloc}/' + '/'.join(segments)
+
+
+def detect_communities(compact_graph: CompactGraph, iterations: int = 20) -> np.ndarray:
+    '''
+    Label propagation on the undirected graph: every node takes the most frequent label of its
+    neighbours (and its own, the smallest label on ties) until the labels stop changing.
+
+    Return the community of each node id, numbered in the order of their first node.
+    '''
+
+    node_count = compact_graph.node_count
+    node_ids = np.arange(node_count, dtype=np.int64)
+    sources = np.repeat(node_ids, np.diff(compact_graph.offsets))
+    targets = np.asarray(compact_graph.targets, dtype=np.int64)
+    # both directions of every edge, and a self loop so a node keeps its label on ties
+    nodes = np.concatenate((sources, targets, node_ids))
+    neighbours = np.concatenate((targets, sources, node_ids))
+
+    labels = node_ids
+    for _ in range(iterations):
+        # one sorted key per (node, neighbour label) pair, the runs of a key are the label frequencies
+        keys = np.sort(nodes * node_count + labels[neighbours])
+        run_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        run_lengths = np.diff(np.append(run_starts, len(keys)))
+        run_nodes, run_labels = np.divmod(keys[run_starts], node_count)
+        # the most frequent label of each node, the smallest one on ties
+        scores = run_lengths * node_count + (node_count - 1 - run_labels)
+        node_starts = np.flatnonzero(np.concatenate(([True], run_nodes[1:] != run_nodes[:-1])))
+        best_scores = np.maximum.reduceat(scores, node_starts)
+        new_labels = node_count - 1 - best_scores % node_count
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    _, first_nodes, communities = np.unique(
+        labels, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first_nodes))[communities]
+
+
+class GraphExporter():
+    def __init__(self, compact_graph: CompactGraph, statuses: dict = None, level_of_detail: str = 'page',
+                 prefix_depth: int = 1, max_nodes: int = 2000, max_edges: int = 10000,
+                 layout: GraphLayout = None, chunk_size: int = 10000) -> None:
+        '''
+        Export the graph for visualization as compact JSON, streamed straight from the CSR arrays:
+
+            {"level_of_detail": "page", "total_nodes": 361, "total_edges": 17409, ...,
+             "node_fields": ["id", "label", "pages", "backlinks", "errors", "status"],
+             "nodes": [[0, "https://www.globalapptesting.com", 1, 359, 0, 200], ...],
+             "edge_fields": ["source", "target", "weight"],
+             "edges": [[0, 1, 2], ...]}
+
+        statuses        - HTTP_STATUS of the urls, the pages with another status than 200 are errors
+        level_of_detail - page: one node per page
+                          path_prefix: one node per url prefix of prefix_depth path segments
+                          community: one node per community of linked pages (label propagation)
+        max_nodes       - the largest max_nodes nodes (most pages, then most backlinks) are kept,
+                          the first node (the root link) always is; None keeps every node
+        max_edges       - the heaviest max_edges edges are kept, None keeps every edge
+        layout          - the x and y of the exported nodes are computed (or read from the
+                          layout cache) and added to the node fields
+
+        The edges of the collapsed pages are summed, the edges inside a node are left out.
+        '''
+
+        if level_of_detail not in LEVELS_OF_DETAIL:
+            raise ValueError(
+                f'level_of_detail is {level_of_detail}, expected to be one of {LEVELS_OF_DETAIL}')
+        for name, value in [('prefix_depth', prefix_depth), ('max_nodes', max_nodes),
+                            ('max_edges', max_edges), ('chunk_size', chunk_size)]:
+            if value is not None and value < 1:
+                raise ValueError(f'{name} is {value}, expected to be at least 1')
+
+        self.compact_graph: CompactGraph = compact_graph
+        self.statuses: dict = statuses or {}
+        self.level_of_detail: str = level_of_detail
+        self.prefix_depth: int = prefix_depth
+        self.max_nodes: int = max_nodes
+        self.max_edges: int = max_edges
+        self.layout: GraphLayout = layout
+        self.chunk_size: int = chunk_size
+
+    def __str__(self) -> str:
+        return f'GraphExporter(level_of_detail={self.level_of_detail}, max_nodes={self.max_nodes})'
+
+    def __get_groups(self, in_degree: np.ndarray) -> tuple:
+        '''
+        Return the group of each node id and the label of each group.
+        '''
+
+        nodes = self.compact_graph.nodes
+        if self.level_of_detail == 'page':
+            return np.arange(len(nodes), dtype=np.int64), nodes
+
+        if self.level_of_detail == 'path_prefix':
+            group_ids = {}
+            groups = np.fromiter((group_ids.setdefault(get_path_prefix(url, self.prefix_depth), len(group_ids))
+                                  for url in nodes), dtype=np.int64, count=len(nodes))
+            return groups, list(group_ids)
+
+        groups = detect_communities(self.compact_graph)
+        # a community is labeled with its page with most backlinks
+        order = np.lexsort((-in_degree, groups))
+        first_of_group = np.concatenate(
+            ([True], groups[order][1:] != groups[order][:-1]))
+        return groups, [nodes[node_id] for node_id in order[first_of_group].tolist()]
+
+    def __build(self) -> tuple:
+        compact_graph = self.compact_graph
+        node_count = compact_graph.node_count
+        sources = np.repeat(np.arange(node_count, dtype=np.int64),
+                            np.diff(compact_graph.offsets))
+        targets = np.asarray(compact_graph.targets, dtype=np.int64)
+        weights = np.asarray(compact_graph.weights, dtype=np.int64)
+        in_degree = np.bincount(targets, minlength=node_count)
+
+        groups, labels = self.__get_groups(in_degree)
+        group_count = len(labels)
+        pages = np.bincount(groups, minlength=group_count)
+        backlinks = np.bincount(groups, weights=in_degree,
+                                minlength=group_count).astype(np.int64)
+        node_statuses = [self.statuses.get(url) for url in compact_graph.nodes]
+        is_error = np.fromiter((status is not None and status != 200 for status in node_statuses),
+                               dtype=bool, count=node_count)
+        errors = np.bincount(groups, weights=is_error,
+                             minlength=group_count).astype(np.int64)
+
+        # the edges between the groups, with the weights summed
+        source_groups, target_groups = groups[sources], groups[targets]
+        between = source_groups != target_groups
+        keys, inverse = np.unique(source_groups[between] * group_count + target_groups[between],
+                                  return_inverse=True)
+        edge_weights = np.bincount(inverse.ravel(), weights=weights[between],
+                                   minlength=len(keys)).astype(np.int64)
+        edge_sources, edge_targets = keys // group_count, keys % group_count
+        total_edges = len(keys)
+
+        kept = np.ones(group_count, dtype=bool)
+        if self.max_nodes is not None and group_count > self.max_nodes:
+            ranking = np.lexsort((-backlinks, -pages))
+            kept[:] = False
+            kept[ranking[:self.max_nodes]] = True
+            if node_count and not kept[groups[0]]:
+                kept[ranking[self.max_nodes - 1]] = False
+                kept[groups[0]] = True
+        kept_edges = kept[edge_sources] & kept[edge_targets]
+        edge_sources, edge_targets, edge_weights = edge_sources[kept_edges], edge_targets[kept_edges], \
+            edge_weights[kept_edges]
+        if self.max_edges is not None and len(edge_weights) > self.max_edges:
+            heaviest = np.sort(np.argpartition(-edge_weights,
+                               self.max_edges - 1)[:self.max_edges])
+            edge_sources, edge_targets, edge_weights = edge_sources[heaviest], edge_targets[heaviest], \
+                edge_weights[heaviest]
+
+        # the kept groups are renumbered 0..n-1 in their order
+        new_ids = np.cumsum(kept) - 1
+        kept_groups = np.flatnonzero(kept)
+        if self.level_of_detail == 'page':
+            group_statuses = [node_statuses[group] for group in kept_groups.tolist()]
+        else:
+            group_statuses = [None] * len(kept_groups)
+
+        meta = {'level_of_detail': self.level_of_detail, 'total_pages': node_count,
+                'total_nodes': group_count, 'total_edges': total_edges,
+                'exported_nodes': len(kept_groups), 'exported_edges': len(edge_weights)}
+        kept_labels = [labels[group] for group in kept_groups.tolist()]
+        node_columns = (np.arange(len(kept_groups)), kept_labels, pages[kept_groups],
+                        backlinks[kept_groups], errors[kept_groups], group_statuses)
+        edge_columns = (new_ids[edge_sources], new_ids[edge_targets], edge_weights)
+        if self.layout is not None:
+            meta['layout'] = self.layout.kind
+            positions = np.round(self.layout.get_positions(
+                kept_labels, edge_columns[0], edge_columns[1]), 1)
+            node_columns += (positions[:, 0], positions[:, 1])
+        return meta, node_columns, edge_columns
+
+    def __write_rows(self, fhandle, columns: tuple, escape: bool) -> None:
+        first = True
+        for start in range(0, len(columns[0]), self.chunk_size):
+            chunk = [column[start:start + self.chunk_size] for column in columns]
+            rows = list(zip(*[column.tolist() if isinstance(column, np.ndarray) else column
+                              for column in chunk]))
+            text = json.dumps(rows, separators=(',', ':'))[1:-1]
+            if escape:
+                # a url cannot end the script element of the html page
+                text = text.replace('</', '<\\/')
+            if not first:
+                fhandle.write(',')
+            fhandle.write(text)
+            first = False
+
+    def write(self, fhandle, escape: bool = False) -> dict:
+        '''
+        Write the JSON graph to the text file handle, return its meta data (totals and exported counts).
+        '''
+
+        meta, node_columns, edge_columns = self.__build()
+
+        fhandle.write(json.dumps(meta)[:-1])
+        node_fields = NODE_FIELDS + POSITION_FIELDS if self.layout is not None else NODE_FIELDS
+        fhandle.write(f', "node_fields": {json.dumps(node_fields)}, "nodes": [')
+        self.__write_rows(fhandle, node_columns, escape)
+        fhandle.write(f'], "edge_fields": {json.dumps(EDGE_FIELDS)}, "edges": [')
+        self.__write_rows(fhandle, edge_columns, escape)
+        fhandle.write(']}')
+        return meta
+
+    def export(self, file_path: str) -> dict:
+        '''
+        Write the JSON graph file.
+        '''
+
+        with open(file_path, mode='w', encoding='utf8') as fhandle:
+            return self.write(fhandle)
+
+    def export_html(self, file_path: str) -> dict:
+        '''
+        Write a html page drawing the graph with vis-network, the JSON graph is embedded in the page.
+        '''
+
+        with open(file_path, mode='w', encoding='utf8') as fhandle:
+            fhandle.write(HTML_HEAD)
+            meta = self.write(fhandle, escape=True)
+            fhandle.write(HTML_TAIL)
+        return meta
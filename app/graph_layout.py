@@ -0,0 +1,162 @@
+import os
+import hashlib
+import numpy as np
+from app.compact_graph import CompactGraph
+from app.shortest_paths import ShortestPaths
+
+
+LAYOUT_KINDS = ('force', 'hierarchy')
+
+# pixels between the nodes of the drawn layout
+NODE_SPACING = 150.0
+LAYER_SPACING = 250.0
+# rows of the repulsion matrix computed at once, bounds the memory to ROW_CHUNK * n pairs
+ROW_CHUNK = 512
+
+
+def build_compact_graph(node_count: int, sources: np.ndarray, targets: np.ndarray) -> CompactGraph:
+    '''
+    Return the compact graph of the node ids 0..node_count-1 and the (source, target) edges.
+    '''
+
+    sources = np.asarray(sources, dtype=np.int64)
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return CompactGraph(nodes=[str(node_id) for node_id in range(node_count)], source_count=node_count,
+                        offsets=offsets, targets=np.asarray(targets, dtype=np.int32)[order],
+                        weights=np.ones(len(order), dtype=np.int64))
+
+
+def force_layout(node_count: int, sources: np.ndarray, targets: np.ndarray, iterations: int = 50,
+                 seed: int = 0) -> np.ndarray:
+    '''
+    Fruchterman-Reingold layout with NumPy: the nodes repel each other, the edges pull their
+    nodes together and the moves are limited by a temperature that cools down linearly.
+    The repulsion is computed between every pair of nodes (O(n^2) per iteration).
+
+    Return the (x, y) position of each node id.
+    '''
+
+    random = np.random.default_rng(seed)
+    positions = random.uniform(-1, 1, (node_count, 2)) * np.sqrt(node_count)
+    if node_count < 2:
+        return positions * NODE_SPACING
+
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    # the ideal distance between the nodes is 1 on an area of node_count
+    temperature = np.sqrt(node_count) / 10
+    for iteration in range(iterations):
+        displacements = np.zeros_like(positions)
+        for start in range(0, node_count, ROW_CHUNK):
+            deltas = positions[start:start + ROW_CHUNK, None, :] - positions[None, :, :]
+            squared_distances = np.maximum(np.einsum('ijk,ijk->ij', deltas, deltas), 1e-4)
+            displacements[start:start + ROW_CHUNK] = np.einsum(
+                'ijk,ij->ik', deltas, 1 / squared_distances)
+
+        deltas = positions[sources] - positions[targets]
+        forces = deltas * np.linalg.norm(deltas, axis=1)[:, None]
+        for axis in range(2):
+            displacements[:, axis] += np.bincount(targets, weights=forces[:, axis], minlength=node_count) - \
+                np.bincount(sources, weights=forces[:, axis], minlength=node_count)
+
+        lengths = np.maximum(np.linalg.norm(displacements, axis=1), 1e-9)
+        step = temperature * (1 - iteration / iterations)
+        positions += displacements * (np.minimum(lengths, step) / lengths)[:, None]
+
+    return (positions - positions.mean(axis=0)) * NODE_SPACING
+
+
+def hierarchy_layout(node_count: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    '''
+    Layered layout by click depth from node 0 (the root link): a row per depth, the nodes of
+    a row ordered by the position of their parent so the subtrees stay together.
+    The nodes that cannot be reached from the root are on the last row.
+
+    Return the (x, y) position of each node id.
+    '''
+
+    positions = np.zeros((node_count, 2))
+    if node_count == 0:
+        return positions
+
+    distances, parents = ShortestPaths(build_compact_graph(
+        node_count, sources, targets)).get_table(0)
+    distances[distances < 0] = distances.max() + 1
+    for depth in range(int(distances.max()) + 1):
+        layer = np.flatnonzero(distances == depth)
+        parent_x = np.where(parents[layer] >= 0,
+                            positions[parents[layer], 0], 0.0)
+        layer = layer[np.lexsort((layer, parent_x))]
+        positions[layer, 0] = (np.arange(len(layer)) -
+                               (len(layer) - 1) / 2) * NODE_SPACING
+        positions[layer, 1] = depth * LAYER_SPACING
+    return positions
+
+
+class GraphLayout():
+    def __init__(self, kind: str = 'force', iterations: int = 50, seed: int = 0,
+                 cache_directory: str = '.layout_cache') -> None:
+        '''
+        Offline layout of the drawn graph, so the browser does not run the physics simulation:
+            force     - force-directed (Fruchterman-Reingold), for the capped graphs
+            hierarchy - a row per click depth from the root link, linear in the graph size
+
+        The positions are cached in cache_directory, in a file named after the hash of
+        the graph and of the layout settings; None disables the cache.
+        '''
+
+        if kind not in LAYOUT_KINDS:
+            raise ValueError(
+                f'kind is {kind}, expected to be one of {LAYOUT_KINDS}')
+        if iterations < 1:
+            raise ValueError(
+                f'iterations is {iterations}, expected to be at least 1')
+
+        self.kind: str = kind
+        self.iterations: int = iterations
+        self.seed: int = seed
+        self.cache_directory: str = cache_directory
+
+    def __str__(self) -> str:
+        return f'GraphLayout(kind={self.kind}, cache_directory={self.cache_directory})'
+
+    def get_hash(self, labels: list, sources: np.ndarray, targets: np.ndarray) -> str:
+        '''
+        Return the hash of the graph (node labels and edges) and of the layout settings.
+        '''
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f'{self.kind} {self.iterations} {self.seed}\n'.encode('utf8'))
+        digest.update('\n'.join(labels).encode('utf8'))
+        digest.update(np.asarray(sources, dtype=np.int64).tobytes())
+        digest.update(np.asarray(targets, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def compute(self, node_count: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        if self.kind == 'force':
+            return force_layout(node_count, sources, targets, self.iterations, self.seed)
+        return hierarchy_layout(node_count, sources, targets)
+
+    def get_positions(self, labels: list, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        '''
+        Return the (x, y) position of each node, from the cache if the graph was laid out before.
+        '''
+
+        if self.cache_directory is None:
+            return self.compute(len(labels), sources, targets)
+
+        cache_path = os.path.join(self.cache_directory,
+                                  f'{self.get_hash(labels, sources, targets)}.npy')
+        if os.path.exists(cache_path):
+            return np.load(cache_path)
+
+        positions = self.compute(len(labels), sources, targets)
+        os.makedirs(self.cache_directory, exist_ok=True)
+        # written under a temporary name, a concurrent reader never sees a partial file
+        temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary_path, mode='wb') as fhandle:
+            np.save(fhandle, positions)
+        os.replace(temporary_path, cache_path)
+        return positions
@@ -1,14 +1,21 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-from pyvis.network import Network
-from collections import Counter
+import webbrowser
+from pathlib import Path
 from app.webpage_parser import WebpageParser
 from app.graph import Graph
+from app.graph_export import GraphExporter
+from app.graph_layout import GraphLayout
+from app.crawl_statistics import CrawlStatistics, StatisticsReport
 
 
-def show_graph(graph: Graph, parser: WebpageParser, root_link: str) -> None:
+def show_graph(graph: Graph, parser: WebpageParser, root_link: str, level_of_detail: str = 'page',
+               max_nodes: int = 2000, max_edges: int = 10000, layout: str = 'force',
+               open_browser: bool = True) -> str:
     '''
-    Generate a html page with representation of the graph.
+    Generate a html page with representation of the graph and return its path.
+
+    The graph is collapsed to the level_of_detail (page, path_prefix or community) and capped
+    to max_nodes nodes and max_edges edges, see GraphExporter. The node positions are computed
+    offline with the layout (force or hierarchy) and cached in .layout_cache, see GraphLayout.
     '''
     if not isinstance(parser, WebpageParser):
         raise ValueError(
@@ -21,27 +28,68 @@ def show_graph(graph: Graph, parser: WebpageParser, root_link: str) -> None:
             f'The graph_dict type is {type(graph_dict)}, expected to be of type dict')
 
     # VISUALISATION
-    plt.rcParams.update({'font.size': 5})
-    G = nx.Graph()
-    nt = Network(height='1000px', width='100%', directed=True)
-
-    nx_graph = nx.Graph()
-    nx_graph.add_node(root_link)
-    for key_root, value_edges in graph_dict.items():
-        edges_len = len(value_edges) if len(value_edges) > 20 else 20
-        nx_graph.add_node(key_root, label=f'{parser.get_link_status_code(link=key_root)}',
-                          title=f'{parser.get_link_info_formatted_string(key_root)}',
-                          size=2.1 * edges_len, width=20, group=key_root)
+    statuses = {link: page.get('HTTP_STATUS')
+                for link, page in parser.get_map_dict().items()}
+    exporter = GraphExporter(graph.get_compact_graph(), statuses=statuses, level_of_detail=level_of_detail,
+                             max_nodes=max_nodes, max_edges=max_edges, layout=GraphLayout(kind=layout))
+    file_path = f'{root_link.split(".")[1]}_map.html'
+    exporter.export_html(file_path)
+    if open_browser:
+        webbrowser.open(Path(file_path).resolve().as_uri())
+    return file_path
+
+
+def get_webpage_report(root_link: str, webpage_parser: WebpageParser, graph: Graph) -> StatisticsReport:
+    '''
+    Return the webpage statistics as a StatisticsReport, see get_webpage_statistics.
 
-        nx_graph.add_weighted_edges_from([(src, dest, weight*5)
-                                          for (src, dest, weight) in value_edges], arrowStrikethrough=True)
+    The totals, the size percentiles and the incoming links extremes are read from the statistics
+    the parser updates while it crawls, from the crawl store if the parser has one, or else
+    computed in one pass over the map_dict.
+    '''
 
-    nx.draw_shell(G, with_labels=False, font_size=4, font_weight='bold')
-    nt.from_nx(nx_graph)
-    nt.show_buttons(filter_=['nodes', 'edges', 'physics'])
-    nt.barnes_hut(gravity=-20000000, central_gravity=0, spring_length=4000,
-                  spring_strength=0.001, damping=0.75, overlap=0.75)
-    nt.show(f'{root_link.split(".")[1]}_map.html')
+    map_dict = webpage_parser.get_map_dict()
+    statistics = webpage_parser.statistics
+    size_percentiles = None
+    incoming_links = None
+    if len(statistics) == len(map_dict):
+        # the statistics of the crawl are up to date
+        totals = statistics.get_totals()
+        size_percentiles = statistics.get_size_percentiles()
+        if statistics.has_edges:
+            incoming_links = statistics.get_nodes_with_min_max_links()
+    elif webpage_parser.crawl_store is not None:
+        # the totals are computed by the database
+        totals = webpage_parser.crawl_store.get_statistics()
+    else:
+        statistics = CrawlStatistics.from_map_dict(map_dict)
+        totals = statistics.get_totals()
+        size_percentiles = statistics.get_size_percentiles()
+    if incoming_links is None:
+        incoming_links = graph.get_nodes_with_min_max_links()
+
+    # the keys of the graph are canonical urls, older graphs may use the root link as it is
+    root_node = webpage_parser.url_canonicalizer.canonicalize(root_link)
+    if root_node not in graph.get_compact_graph().node_ids:
+        root_node = root_link
+
+    report = StatisticsReport(root_link, totals, size_percentiles=size_percentiles,
+                              incoming_links=incoming_links,
+                              root_eccentricity=graph.get_eccentricity(root_node),
+                              longest_path=graph.get_longest_path())
+    for extreme in incoming_links.values():
+        for link in extreme['links']:
+            report.link_statuses[link] = webpage_parser.get_link_status_code(link)
+
+    if webpage_parser.dedup_index:
+        report.duplicates_saved = webpage_parser.dedup_index.get_dedup_statistics()[
+            'duplicates_saved']
+    if webpage_parser.response_cache is not None:
+        report.cache_statistics = webpage_parser.response_cache.get_cache_statistics()
+    if webpage_parser.response_times:
+        report.response_times = list(webpage_parser.response_times.values())
+        report.slow_pages = webpage_parser.get_slow_pages(k=5)
+    return report
 
 
 def get_webpage_statistics(root_link: str, webpage_parser: WebpageParser, graph: Graph) -> str:
@@ -56,76 +104,19 @@ def get_webpage_statistics(root_link: str, webpage_parser: WebpageParser, graph:
         - total numner of image links
         - average number of internal links per page
         - average number of external links per page
-        - average size (in bytes) per page
+        - average size (in bytes) per page and the page size percentiles
         - minimum incoming links count and list of pages
         - maximum incoming links count and list of pages
-        - distance between the most distant subpages (longest path)
+        - distance between the most distant subpages (eccentricity of the root link)
+        - longest path between the groups of pages that link to each other (cycles condensed)
+        - duplicate fetches saved by the url canonicalization (if the parser crawled the website)
+        - pages not fetched by failure (timeout, DNS, TLS, connection errors, ...)
+        - HTTP cache hits, misses and bytes saved (if the parser has a response cache)
+        - response time percentiles and the slowest pages (if the parser crawled the website)
+
+    get_webpage_report returns the same statistics as a structured object with a JSON renderer.
     '''
 
-    map_dict = webpage_parser.get_map_dict()
-
-    if not map_dict:
+    if not webpage_parser.get_map_dict():
         return 'The map_dict is empty'
-
-    total_webpages = len(map_dict.keys())
-
-    total_internal_links = 0
-    total_external_links = 0
-    total_dead_links = 0
-    total_phone_links = 0
-    total_email_links = 0
-    total_file_links = 0
-    total_page_size_bytes = 0
-    http_statuses = []
-    for _, value_dict in map_dict.items():
-
-        http_statuses.append(value_dict['HTTP_STATUS'])
-
-        total_internal_links += len(value_dict['internal_links'])
-        total_external_links += len(value_dict['external_links'])
-        total_dead_links += len(value_dict['dead_links'])
-        total_phone_links += len(value_dict['phone_links'])
-        total_email_links += len(value_dict['email_links'])
-        total_file_links += len(value_dict['file_links'])
-        total_page_size_bytes += value_dict['page_size_bytes']
-
-    longest_path = graph.get_longest_path()
-    average_internal_links_per_page = total_internal_links // total_webpages
-    average_external_links_per_page = total_external_links // total_webpages
-    average_page_size_bytes = total_page_size_bytes // total_webpages
-
-    statistic_info = f'\nGeneral information about                  {root_link}\n'
-    statistic_info += f'\nTotal web pages found (unique links):      {total_webpages}\n'
-
-    http_counter = Counter(http_statuses)
-    for http_status, count in http_counter.items():
-        statistic_info += f'HTTP {http_status}:                                  {count}\n'
-
-    statistic_info += f'\nTotal internal links (non-unique links):   {total_internal_links}\n'
-    statistic_info += f'Distance between the most distant pages:   {longest_path}\n\n'
-
-    statistic_info += f'Total external links:                      {total_external_links}\n'
-    statistic_info += f'Total dead links:                          {total_dead_links}\n'
-    statistic_info += f'Total phone links:                         {total_phone_links}\n'
-    statistic_info += f'Total email links:                         {total_email_links}\n'
-    statistic_info += f'Total file links:                          {total_file_links}\n\n'
-    statistic_info += f'Average number of internal links per page: {average_internal_links_per_page}\n'
-    statistic_info += f'Average number of external links per page: {average_external_links_per_page}\n'
-    statistic_info += f'Average size (in bytes) per page:          {average_page_size_bytes}\n'
-
-    incoming_links_dict = graph.get_nodes_with_min_max_links()
-    minimum_incoming_links = incoming_links_dict['minimum_incoming_links']
-    min_links_len = len(minimum_incoming_links["links"])
-
-    maximum_incoming_links = incoming_links_dict['maximum_incoming_links']
-    max_links_len = len(maximum_incoming_links["links"])
-
-    statistic_info += f'\n\nMinimum incoming links for {min_links_len} pages:       {minimum_incoming_links["incoming_links_count"]}\n\n'
-    for link in incoming_links_dict['minimum_incoming_links']['links']:
-        statistic_info += f'>>  HTTP: {webpage_parser.get_link_status_code(link)}   {link}\n'
-
-    statistic_info += f'\nMaximum incoming links for {max_links_len} pages:         {maximum_incoming_links["incoming_links_count"]}\n\n'
-    for link in incoming_links_dict['maximum_incoming_links']['links']:
-        statistic_info += f'>>  HTTP: {webpage_parser.get_link_status_code(link)}   {link}\n'
-
-    return statistic_info
+    return get_webpage_report(root_link, webpage_parser, graph).render_text()
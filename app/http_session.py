@@ -0,0 +1,29 @@
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+
+def build_session(pool_connections: int = 10, pool_maxsize: int = 10) -> Session:
+    '''
+    Build a requests Session with pooled keep-alive connections.
+
+    pool_connections - number of hosts whose connection pools are kept open
+    pool_maxsize     - maximum number of open connections per host, the requests
+                       above this limit wait for a free connection
+
+    The Accept-Encoding header advertises every encoding urllib3 can decode,
+    gzip and deflate always and brotli when the brotli package is installed,
+    so the compressed responses are decoded transparently.
+    '''
+
+    if pool_connections < 1 or pool_maxsize < 1:
+        raise ValueError(
+            f'pool_connections={pool_connections} and pool_maxsize={pool_maxsize}, expected to be at least 1')
+
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(make_headers(keep_alive=True, accept_encoding=True))
+    return session
@@ -0,0 +1,219 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from app.fetch_policy import FAILURE_STATUSES
+from app.politeness import DISALLOWED_STATUS
+
+
+REFRESH_STRATEGIES = ('staleness', 'priority')
+
+
+class IncrementalCrawler():
+    def __init__(self, webpage_parser, graph=None, concurrency: int = 1) -> None:
+        '''
+        Refresh an existing map_dict instead of crawling the website from scratch.
+
+        The frontier is seeded with the pages already in map_dict, the refreshed pages
+        are diffed with their previous internal links, the new pages are crawled and the
+        pages that are not reachable from the root anymore are dropped. The map_dict and
+        the adjacency lists (of the webpage_parser and of the graph) are patched in place.
+        '''
+
+        if concurrency < 1:
+            raise ValueError(
+                f'concurrency is {concurrency}, expected to be at least 1')
+
+        self.webpage_parser = webpage_parser
+        self.graph = graph
+        self.concurrency: int = concurrency
+
+    def __str__(self) -> str:
+        return f'IncrementalCrawler(concurrency={self.concurrency})'
+
+    def select_pages(self, max_pages: int = None, strategy: str = 'staleness', stale_after: float = 0.0) -> list:
+        '''
+        Return the pages of map_dict to refresh, ordered by:
+            staleness - the pages crawled longest time ago first (never timestamped pages first)
+            priority  - the pages with most incoming internal links first
+
+        stale_after - skip the pages crawled less than stale_after seconds ago
+        max_pages   - refresh at most max_pages pages
+        '''
+
+        if strategy not in REFRESH_STRATEGIES:
+            raise ValueError(
+                f'strategy is {strategy}, expected to be one of {REFRESH_STRATEGIES}')
+
+        map_dict = self.webpage_parser.map_dict
+        crawled_at = self.webpage_parser.crawled_at
+        now = time.time()
+        pages = [link for link in map_dict
+                 if now - crawled_at.get(link, 0.0) >= stale_after]
+
+        if strategy == 'staleness':
+            pages.sort(key=lambda link: crawled_at.get(link, 0.0))
+        else:
+            canonicalize = self.webpage_parser.url_canonicalizer.canonicalize
+            pages_by_canonical_link = self.__pages_by_canonical_link()
+            incoming_links = dict.fromkeys(map_dict, 0)
+            for value_dict in map_dict.values():
+                for destination_link in value_dict['internal_links']:
+                    page = pages_by_canonical_link.get(
+                        canonicalize(destination_link))
+                    if page is not None:
+                        incoming_links[page] += 1
+            pages.sort(key=lambda link: incoming_links[link], reverse=True)
+
+        if max_pages is not None:
+            pages = pages[:max_pages]
+        return pages
+
+    def refresh(self, max_pages: int = None, strategy: str = 'staleness', stale_after: float = 0.0) -> dict:
+        '''
+        Refresh the selected pages, crawl the newly found pages and drop the unreachable ones.
+        The pages that cannot be fetched keep their previous links and are not counted as refreshed.
+
+        Returns a report like:
+        {'refreshed': 12,
+         'changed':   ['https://www.globalapptesting.com/product'],
+         'added':     ['https://www.globalapptesting.com/new-page'],
+         'removed':   ['https://www.globalapptesting.com/old-page']}
+        '''
+
+        map_dict = self.webpage_parser.map_dict
+        canonicalize = self.webpage_parser.url_canonicalizer.canonicalize
+        report = {'refreshed': 0, 'changed': [], 'added': [], 'removed': []}
+        links_removed = False
+
+        # (map_dict key, url to query) pairs
+        page_urls = self.__page_urls()
+        batch = [(link, page_urls.get(link, link))
+                 for link in self.select_pages(max_pages=max_pages, strategy=strategy, stale_after=stale_after)]
+        queued = set(self.__pages_by_canonical_link())
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while batch:
+                if self.webpage_parser.profiler is not None:
+                    self.webpage_parser.profiler.record_queue_depth(
+                        'frontier', len(batch))
+                next_batch = []
+                urls = [url for _, url in batch]
+                for (link, _), clean_links in zip(batch, executor.map(self.webpage_parser.crawl_page, urls)):
+                    previous_links = map_dict.get(link)
+                    if previous_links is not None and self.__is_failed(clean_links):
+                        # keep the last known links of a page that could not be fetched this time
+                        continue
+                    report['refreshed'] += 1
+                    self.webpage_parser.record_page(link, clean_links)
+
+                    if previous_links is None:
+                        report['added'].append(link)
+                    elif previous_links != clean_links:
+                        report['changed'].append(link)
+                        links_removed = links_removed or bool(
+                            set(previous_links['internal_links']) - set(clean_links['internal_links']))
+                    else:
+                        continue
+
+                    self.__patch_adj_lists(link)
+                    for internal_link in clean_links['internal_links']:
+                        canonical_link = canonicalize(internal_link)
+                        if canonical_link not in queued:
+                            queued.add(canonical_link)
+                            next_batch.append((canonical_link, internal_link))
+                batch = next_batch
+
+        if links_removed:
+            for link in self.__unreachable_pages():
+                self.webpage_parser.remove_page(link)
+                report['removed'].append(link)
+                self.__patch_adj_lists(link)
+
+        return report
+
+    @staticmethod
+    def __is_failed(clean_links: dict) -> bool:
+        '''
+        Return True if the page could not be fetched (failure of the request or disallowed by robots.txt).
+        '''
+
+        status = clean_links['HTTP_STATUS']
+        return status in FAILURE_STATUSES or status == DISALLOWED_STATUS
+
+    def __unreachable_pages(self) -> list:
+        '''
+        Return the pages of map_dict that cannot be reached from the root link.
+        '''
+
+        map_dict = self.webpage_parser.map_dict
+        canonicalize = self.webpage_parser.url_canonicalizer.canonicalize
+        pages_by_canonical_link = self.__pages_by_canonical_link()
+        root_link = pages_by_canonical_link.get(
+            canonicalize(self.webpage_parser.root_link))
+        if root_link is None:
+            return []
+
+        reachable = {root_link}
+        queue = deque([root_link])
+        while queue:
+            link = queue.popleft()
+            for internal_link in map_dict[link]['internal_links']:
+                page = pages_by_canonical_link.get(canonicalize(internal_link))
+                if page is not None and page not in reachable:
+                    reachable.add(page)
+                    queue.append(page)
+
+        return [link for link in map_dict if link not in reachable]
+
+    def __page_urls(self) -> dict:
+        '''
+        Map each page of map_dict to the url to query: the root link or a link to the page
+        as it was found, the canonical url may not be served (e.g. without its trailing slash).
+        '''
+
+        map_dict = self.webpage_parser.map_dict
+        canonicalize = self.webpage_parser.url_canonicalizer.canonicalize
+        pages_by_canonical_link = self.__pages_by_canonical_link()
+        page_urls = {}
+        for value_dict in map_dict.values():
+            for internal_link in value_dict['internal_links']:
+                page = pages_by_canonical_link.get(canonicalize(internal_link))
+                if page is not None:
+                    page_urls.setdefault(page, internal_link)
+
+        root_link = pages_by_canonical_link.get(
+            canonicalize(self.webpage_parser.root_link))
+        if root_link is not None:
+            page_urls[root_link] = self.webpage_parser.root_link
+        return page_urls
+
+    def __pages_by_canonical_link(self) -> dict:
+        '''
+        Map the canonical url of each page to its key in map_dict.
+        '''
+
+        canonicalize = self.webpage_parser.url_canonicalizer.canonicalize
+        return {canonicalize(link): link for link in self.webpage_parser.map_dict}
+
+    def __patch_adj_lists(self, link: str) -> None:
+        '''
+        Update (or delete) the edges of the link in every adjacency list that was built.
+        '''
+
+        adj_lists = [self.webpage_parser.adj_list_graph]
+        if self.graph is not None and self.graph.adj_list_graph is not self.webpage_parser.adj_list_graph:
+            adj_lists.append(self.graph.adj_list_graph)
+
+        for adj_list_graph in adj_lists:
+            if not adj_list_graph:
+                continue
+            canonical_link = self.webpage_parser.url_canonicalizer.canonicalize(
+                link)
+            if link in self.webpage_parser.map_dict:
+                adj_list_graph[canonical_link] = self.webpage_parser.get_graph_edges(
+                    link)
+            else:
+                adj_list_graph.pop(canonical_link, None)
+
+        if self.graph is not None:
+            # the compact graph was built from the old edges
+            self.graph.invalidate_cache()
@@ -0,0 +1,226 @@
+import os
+import json
+import struct
+import hashlib
+from threading import Lock
+from collections import OrderedDict
+from collections.abc import Mapping
+import numpy as np
+
+
+INDEX_EXTENSION = '.idx'
+
+MAGIC = b'MAPIDX\x00\x01'
+# magic, data file size, data file mtime (ns), record count, key string table size
+HEADER = struct.Struct('<8sQQQQ')
+# the sections start at multiples of 8 bytes so they can be memory-mapped
+ALIGNMENT = 8
+
+# every JsonLinesWriter line starts with the key and ends with the value
+RECORD_PREFIX = b'{"key": '
+REMOVED_RECORD_SUFFIX = b'"value": null}\n'
+
+
+def padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def hash_key(key: bytes) -> int:
+    '''Stable 64 bit hash of the utf8 key, Python hash() is salted per process'''
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+def read_record_key(line: bytes) -> str:
+    if line.startswith(RECORD_PREFIX):
+        key, _ = json.decoder.scanstring(
+            line.decode('utf8'), len(RECORD_PREFIX) + 1)
+        return key
+    return json.loads(line)['key']
+
+
+def build_index(file_name: str) -> None:
+    '''
+    Scan file_name.jsonl and write the index of its live records to file_name.jsonl.idx:
+
+        header
+        record_offsets  int64[count]      - start of the last line of each key, in first seen order
+        record_lengths  int64[count]
+        hashes          uint64[count]     - sorted hashes of the keys
+        hash_order      int64[count]      - the record position of each sorted hash
+        key_offsets     int64[count + 1]  - the key of record i is keys[key_offsets[i]:key_offsets[i + 1]]
+        keys            utf8 bytes of the keys
+
+    Only the keys are parsed, the values are decoded by LazyMapStore when they are accessed.
+    '''
+
+    data_path = f'{file_name}.jsonl'
+    records = {}
+    offset = 0
+    with open(data_path, mode='rb') as fhandle:
+        for line in fhandle:
+            if not line.endswith(b'\n'):
+                # truncated last line, the writer process crashed
+                break
+            key = read_record_key(line)
+            if line.endswith(REMOVED_RECORD_SUFFIX):
+                records.pop(key, None)
+            else:
+                # a rewritten key keeps its first position, like a dict
+                records[key] = (offset, len(line))
+            offset += len(line)
+
+    count = len(records)
+    encoded_keys = [key.encode('utf8') for key in records]
+    key_offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum([len(key) for key in encoded_keys], out=key_offsets[1:])
+    keys = b''.join(encoded_keys)
+    record_offsets = np.fromiter((offset for offset, _ in records.values()),
+                                 dtype=np.int64, count=count)
+    record_lengths = np.fromiter((length for _, length in records.values()),
+                                 dtype=np.int64, count=count)
+    hashes = np.fromiter((hash_key(key) for key in encoded_keys),
+                         dtype=np.uint64, count=count)
+    hash_order = np.argsort(hashes, kind='stable').astype(np.int64)
+    del records, encoded_keys
+
+    stat = os.stat(data_path)
+    sections = [record_offsets.tobytes(), record_lengths.tobytes(), hashes[hash_order].tobytes(),
+                hash_order.tobytes(), key_offsets.tobytes(), keys]
+    with open(f'{data_path}{INDEX_EXTENSION}', mode='wb') as fhandle:
+        fhandle.write(HEADER.pack(MAGIC, stat.st_size,
+                      stat.st_mtime_ns, count, len(keys)))
+        for section in sections:
+            fhandle.write(section)
+            fhandle.write(b'\x00' * padding(len(section)))
+
+
+class LazyMapStore(Mapping):
+    def __init__(self, file_name: str, cache_size: int = 1024) -> None:
+        '''
+        Read only map_dict backed by the file_name.jsonl file written by JsonLinesWriter.
+
+        The offset index of the file (file_name.jsonl.idx, built on the first open and
+        rebuilt when the file changes) is memory-mapped, a page is read and decoded only when
+        it is accessed and the last cache_size decoded pages are kept in a LRU cache.
+        '''
+
+        if cache_size < 0:
+            raise ValueError(
+                f'cache_size is {cache_size}, expected to be at least 0')
+
+        self.file_name: str = file_name
+        self.cache_size: int = cache_size
+        self.cache: OrderedDict = OrderedDict()
+
+        if not self.__index_is_fresh():
+            build_index(file_name)
+        self.index = np.memmap(f'{file_name}.jsonl{INDEX_EXTENSION}',
+                               dtype=np.uint8, mode='r')
+        _, _, _, count, keys_size = HEADER.unpack_from(self.index)
+        self.count: int = count
+
+        position = HEADER.size
+
+        def read_array(dtype, length: int) -> np.ndarray:
+            nonlocal position
+            array = np.frombuffer(self.index, dtype=dtype,
+                                  count=length, offset=position)
+            position += array.nbytes + padding(array.nbytes)
+            return array
+
+        self.record_offsets: np.ndarray = read_array(np.int64, count)
+        self.record_lengths: np.ndarray = read_array(np.int64, count)
+        self.hashes: np.ndarray = read_array(np.uint64, count)
+        self.hash_order: np.ndarray = read_array(np.int64, count)
+        self.key_offsets: np.ndarray = read_array(np.int64, count + 1)
+        self.keys_position: int = position
+        self.keys_size: int = keys_size
+
+        # the records are read with seek and read (os.pread is not available on Windows), a memory
+        # map of the data file would keep the pages around each record resident (fault-around)
+        # and grow the RSS with the file
+        self.data_file = open(f'{file_name}.jsonl', mode='rb', buffering=0)
+        self.data_file_lock = Lock()
+
+    def __str__(self) -> str:
+        return f'LazyMapStore(file_name={self.file_name}.jsonl, pages={self.count}, cached={len(self.cache)})'
+
+    def __index_is_fresh(self) -> bool:
+        index_path = f'{self.file_name}.jsonl{INDEX_EXTENSION}'
+        if not os.path.exists(index_path):
+            return False
+        with open(index_path, mode='rb') as fhandle:
+            header = fhandle.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return False
+        magic, data_size, data_mtime, _, _ = HEADER.unpack(header)
+        stat = os.stat(f'{self.file_name}.jsonl')
+        return magic == MAGIC and data_size == stat.st_size and data_mtime == stat.st_mtime_ns
+
+    def close(self) -> None:
+        if self.data_file is not None:
+            self.data_file.close()
+            self.data_file = None
+        self.cache.clear()
+
+    def __enter__(self) -> 'LazyMapStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __key_bytes(self, position: int) -> bytes:
+        start = self.keys_position + int(self.key_offsets[position])
+        end = self.keys_position + int(self.key_offsets[position + 1])
+        return self.index[start:end].tobytes()
+
+    def __position(self, key: str) -> int:
+        '''
+        Return the record position of the key, -1 if it is not in the store.
+        '''
+
+        if not isinstance(key, str):
+            return -1
+        encoded_key = key.encode('utf8')
+        key_hash = np.uint64(hash_key(encoded_key))
+        position = int(np.searchsorted(self.hashes, key_hash))
+        # different keys can have the same 64 bit hash, compare the keys
+        while position < self.count and self.hashes[position] == key_hash:
+            record_position = int(self.hash_order[position])
+            if self.__key_bytes(record_position) == encoded_key:
+                return record_position
+            position += 1
+        return -1
+
+    def __getitem__(self, key: str) -> dict:
+        value = self.cache.get(key)
+        if value is not None:
+            self.cache.move_to_end(key)
+            return value
+
+        position = self.__position(key)
+        if position == -1:
+            raise KeyError(key)
+        with self.data_file_lock:
+            self.data_file.seek(int(self.record_offsets[position]))
+            line = self.data_file.read(int(self.record_lengths[position]))
+        value = json.loads(line)['value']
+
+        if self.cache_size:
+            self.cache[key] = value
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.cache or self.__position(key) != -1
+
+    def __iter__(self):
+        key_offsets = self.key_offsets
+        for position in range(self.count):
+            start = self.keys_position + int(key_offsets[position])
+            end = self.keys_position + int(key_offsets[position + 1])
+            yield self.index[start:end].tobytes().decode('utf8')
+
+    def __len__(self) -> int:
+        return self.count
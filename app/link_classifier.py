@@ -0,0 +1,133 @@
+from collections import Counter
+from urllib.parse import urlsplit, urljoin
+
+
+DEFAULT_FILE_EXTENSIONS = ('.png', '.jpeg', '.gif', '.pdf', '.svg', '.mp4',
+                           '.doc', '.docx', '.txt', '.ppt', '.pptx')
+
+LINK_CATEGORIES = ('internal_links', 'external_links', 'dead_links',
+                   'phone_links', 'email_links', 'file_links')
+
+# category of the links by their url scheme, None means the link is skipped
+SCHEME_CATEGORIES = {'tel': 'phone_links',
+                     'callto': 'phone_links',
+                     'mailto': 'email_links',
+                     'javascript': None,
+                     'data': None}
+
+WEB_SCHEMES = frozenset(('http', 'https', ''))
+
+# maximum number of memoized hrefs, the menus and footers repeat the same hrefs on every page
+MAX_MEMOIZED_HREFS = 100_000
+
+
+class LinkClassifier():
+    def __init__(self, root_link: str, file_extensions: tuple = DEFAULT_FILE_EXTENSIONS) -> None:
+        '''
+        Classify href values into internal, external, dead, phone, email and file links.
+
+        The root link is parsed once, the hrefs are parsed with urllib.parse and
+        looked up in the scheme / host / extension tables instead of substring checks.
+        '''
+
+        if not root_link:
+            raise ValueError(
+                f'The root was not provided: root_link={root_link}')
+
+        root = urlsplit(root_link)
+        self.root_link: str = root_link[:-1] if root_link.endswith('/') else root_link
+        self.root_scheme: str = root.scheme.lower()
+        self.root_host: str = self.strip_www(root.netloc.lower())
+        self.file_extensions: tuple = tuple(extension.lower()
+                                            for extension in file_extensions)
+        self.memo: dict = {}
+
+    def __str__(self) -> str:
+        return f'LinkClassifier(root_link={self.root_link})'
+
+    @staticmethod
+    def strip_www(host: str) -> str:
+        return host[4:] if host.startswith('www.') else host
+
+    def classify_href(self, href: str, page_link: str = None) -> tuple:
+        '''
+        Return the (category, link) of the href, or (None, None) if the href is skipped.
+        The internal links with absolute path are completed with the root link, the
+        relative links (like 'pricing' or '../product') are resolved against page_link,
+        the page the href was found on (the root link if it is not given).
+        '''
+
+        category, link, relative = self.__classify_href(href)
+        if relative:
+            link = self.resolve_relative_link(link, page_link)
+        return (category, link)
+
+    def resolve_relative_link(self, href: str, page_link: str = None) -> str:
+        return urljoin(page_link or self.root_link + '/', href)
+
+    def __classify_href(self, href: str) -> tuple:
+        '''
+        Return the (category, link, relative) of the href, the link of a relative href
+        depends on the page and is resolved by the caller.
+        '''
+
+        if not href:
+            return (None, None, False)
+
+        try:
+            parts = urlsplit(href)
+        except ValueError:
+            # malformed url, e.g. an invalid IPv6 host
+            return ('external_links', href, False)
+        scheme = parts.scheme.lower()
+
+        if scheme in SCHEME_CATEGORIES:
+            return (SCHEME_CATEGORIES[scheme], href if SCHEME_CATEGORIES[scheme] else None, False)
+        if parts.path.lower().endswith(self.file_extensions):
+            return ('file_links', href, False)
+        if scheme not in WEB_SCHEMES:
+            return ('external_links', href, False)
+
+        if not parts.netloc:
+            if not parts.path and not parts.query:
+                # '#' or '#section', the link does not lead to another page
+                return ('dead_links', href, False)
+            if href.startswith('/'):
+                return ('internal_links', self.root_link + href, False)
+            return ('internal_links', href, True)
+
+        if self.strip_www(parts.netloc.lower()) == self.root_host:
+            if not scheme:
+                # protocol relative link: //www.globalapptesting.com/product
+                return ('internal_links', f'{self.root_scheme}:{href}', False)
+            return ('internal_links', href, False)
+        return ('external_links', href, False)
+
+    def classify(self, hrefs: list, page_link: str = None) -> dict:
+        '''
+        Classify a batch of hrefs found on page_link and return a dictionary of Counters:
+
+        {'internal_links':  Counter({'https://www.globalapptesting.com/product': 7}),
+         'external_links':  Counter({'https://testathon.co/': 2}),
+         'dead_links':      Counter({'#': 1}),
+         'phone_links':     Counter(),
+         'email_links':     Counter(),
+         'file_links':      Counter()}
+        '''
+
+        memo = self.memo
+        if len(memo) > MAX_MEMOIZED_HREFS:
+            memo.clear()
+
+        counters = {category: Counter() for category in LINK_CATEGORIES}
+        for href in hrefs:
+            classified = memo.get(href)
+            if classified is None:
+                classified = memo[href] = self.__classify_href(href)
+            category, link, relative = classified
+            if relative:
+                link = self.resolve_relative_link(link, page_link)
+            if category is not None:
+                counter = counters[category]
+                counter[link] = counter.get(link, 0) + 1
+        return counters
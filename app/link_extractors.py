@@ -0,0 +1,120 @@
+import re
+from html import unescape
+from bs4 import BeautifulSoup
+
+
+# comments and the raw text of script / style elements can contain '<a' that are not links
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<(script|style)(?=[\s/>])(?:[^>"\']|"[^"]*"|\'[^\']*\')*>.*?(?:</\1\s*>|\Z)'
+    r'|<a(?=[\s/>])((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE | re.DOTALL)
+
+ATTRIBUTE_PATTERN = re.compile(
+    r'([^\s/>"\'=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+
+
+def read_web_page(web_page) -> str:
+    '''
+    Return the html text of the web page given as str, bytes or file object.
+    '''
+
+    if hasattr(web_page, 'read'):
+        web_page = web_page.read()
+    if isinstance(web_page, bytes):
+        web_page = web_page.decode('utf8', errors='replace')
+    return web_page
+
+
+class StreamingLinkExtractor():
+    '''
+    Tokenize the html and emit the href values of <a> tags, without building a DOM.
+    '''
+
+    name = 'streaming'
+
+    def iter_hrefs(self, web_page):
+        '''
+        Yield the href value of each <a> tag in document order.
+        '''
+
+        for match in TOKEN_PATTERN.finditer(read_web_page(web_page)):
+            attributes = match.group(2)
+            if attributes is None or 'href' not in attributes.lower():
+                continue
+
+            href = None
+            # the last duplicated attribute wins, like in BeautifulSoup
+            for name, double_quoted, single_quoted, unquoted in ATTRIBUTE_PATTERN.findall(attributes):
+                if name.lower() == 'href':
+                    href = double_quoted or single_quoted or unquoted
+            if href is not None:
+                yield unescape(href)
+
+    def extract(self, web_page) -> list:
+        return list(self.iter_hrefs(web_page))
+
+
+class LxmlLinkExtractor():
+    '''
+    Collect the href values with the event based (target) lxml html parser,
+    no tree is built. Requires the optional lxml package.
+    '''
+
+    name = 'lxml'
+
+    class Target():
+        def __init__(self) -> None:
+            self.hrefs: list = []
+
+        def start(self, tag: str, attrib: dict) -> None:
+            if tag == 'a' and 'href' in attrib:
+                self.hrefs.append(attrib['href'])
+
+        def close(self) -> list:
+            return self.hrefs
+
+    def __init__(self) -> None:
+        try:
+            from lxml import etree
+        except ImportError as exc:
+            raise ImportError(
+                'The lxml link extractor requires the lxml package: pip install lxml') from exc
+        self.etree = etree
+
+    def extract(self, web_page) -> list:
+        web_page = read_web_page(web_page)
+        if not web_page:
+            return []
+        parser = self.etree.HTMLParser(target=self.Target())
+        return self.etree.fromstring(web_page, parser)
+
+
+class BeautifulSoupLinkExtractor():
+    '''
+    Reference implementation, builds the whole BeautifulSoup tree.
+    '''
+
+    name = 'beautifulsoup'
+
+    def __init__(self, parser: str = 'html.parser') -> None:
+        self.parser: str = parser
+
+    def extract(self, web_page) -> list:
+        soup: BeautifulSoup = BeautifulSoup(web_page, self.parser)
+        return [link.get('href') for link in soup.find_all('a') if link.get('href') is not None]
+
+
+LINK_EXTRACTORS = {extractor.name: extractor for extractor in (
+    StreamingLinkExtractor, LxmlLinkExtractor, BeautifulSoupLinkExtractor)}
+
+
+def get_link_extractor(name: str = 'streaming'):
+    '''
+    Return a link extractor by name: streaming, lxml or beautifulsoup.
+    '''
+
+    if name not in LINK_EXTRACTORS:
+        raise ValueError(
+            f'Unknown link extractor {name}, expected one of {list(LINK_EXTRACTORS)}')
+    return LINK_EXTRACTORS[name]()
@@ -0,0 +1,239 @@
+import time
+import hashlib
+import random
+import threading
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.politeness import TokenBucket
+
+
+class SyntheticSite():
+    def __init__(self, page_count: int = 50, fan_out: int = 5, seed: int = 0, page_size: int = 0,
+                 depth: int = None, cycles: bool = True) -> None:
+        '''
+        Generate an in-memory website with page_count pages.
+
+        Every page links to the home page (cycle), to fan_out random pages
+        and to one link of every other category (external, dead, phone, email, file).
+        The pages are padded with markup without links up to page_size bytes.
+
+        depth  - None: every page links to the next one, so the pages form a chain
+                 that is page_count - 1 clicks deep, with random shortcuts.
+                 A number: the pages are split into depth levels under the home page. Each
+                 page is linked from a page of the previous level, and its random links
+                 never go more than one level deeper. A page of level n is n clicks deep.
+        cycles - False: no link to the home page, and the random links only go to the
+                 following pages (deeper levels), so the link graph has no cycle
+        '''
+
+        if page_count < 1:
+            raise ValueError(
+                f'page_count is {page_count}, expected to be at least 1')
+        if depth is not None and not 1 <= depth < max(page_count, 2):
+            raise ValueError(
+                f'depth is {depth}, expected to be between 1 and page_count - 1')
+
+        self.page_count: int = page_count
+        self.fan_out: int = fan_out
+        self.page_size: int = page_size
+        self.depth: int = depth
+        self.cycles: bool = cycles
+        self.pages: dict = {}
+
+        rand = random.Random(seed)
+        paths = ['/'] + [f'/page/{index}' for index in range(1, page_count)]
+        # index of the first page of each level, and the end of the last level
+        level_starts = [0] + [1 + (page_count - 1) * level // depth
+                              for level in range(depth + 1)] if depth is not None else None
+        for index, path in enumerate(paths):
+            if depth is None:
+                # the next page is always linked so every page is reachable from home
+                targets = [(index + 1) % page_count] if cycles or index + 1 < page_count else []
+                low, high = (0 if cycles else index + 1), page_count
+            else:
+                level = bisect_right(level_starts, index) - 1
+                targets = self.get_children(level_starts, level, index)
+                low = 0 if cycles else level_starts[level + 1]
+                high = level_starts[min(level + 2, depth + 1)]
+            if low < high:
+                targets += [low + rand.randrange(high - low) for _ in range(fan_out)]
+            self.pages[path] = self.render_page(path, [paths[target] for target in targets])
+
+    @staticmethod
+    def get_children(level_starts: list, level: int, index: int) -> list:
+        '''
+        Return the indexes of the pages of the next level linked from the page,
+        the pages of a level are spread in turn over the pages of the previous level.
+        '''
+
+        if level + 2 >= len(level_starts):
+            return []
+        start, end = level_starts[level], level_starts[level + 1]
+        return list(range(level_starts[level + 1] + index - start, level_starts[level + 2], end - start))
+
+    def render_page(self, path: str, targets: list) -> bytes:
+        '''
+        Build the html body of a single page.
+        '''
+
+        anchors = ['<a href="/">Home</a>'] if self.cycles else []
+        anchors += [f'<a href="{target}">{target}</a>' for target in targets]
+        anchors += ['<a href="https://www.example.org/">External</a>',
+                    '<a href="#">Dead</a>',
+                    '<a href="tel:+1000000">Phone</a>',
+                    '<a href="mailto:info@example.org">Email</a>',
+                    '<a href="/files/report.pdf">File</a>']
+        body = '\n'.join(anchors)
+        filler = '<div class="content"><p>Lorem <b>ipsum</b> dolor sit amet.</p></div>\n'
+        if self.page_size > len(body):
+            body += filler * ((self.page_size - len(body)) // len(filler))
+        return f'<html><head><title>{path}</title></head><body>{body}</body></html>'.encode('utf8')
+
+
+class LocalServer():
+    def __init__(self, site: SyntheticSite, latency: float = 0.0, rate_limit: float = None,
+                 retry_after: str = '1', robots_txt: str = None, path_latency: dict = None,
+                 error_rate: float = 0.0, error_status: int = 500, seed: int = 0, redirects: dict = None) -> None:
+        '''
+        Serve a SyntheticSite from a local threaded HTTP server.
+
+        latency      - seconds to sleep before answering each request
+        rate_limit   - requests per second accepted (bursts of 2), the requests above the limit
+                       get 429 Too Many Requests with a Retry-After: retry_after header
+        robots_txt   - body of /robots.txt, 404 if it is None
+        path_latency - seconds to sleep before answering the requests of some paths, like {'/page/3': 2.0}
+        error_rate   - fraction of the pages (other than the home page) answered with error_status,
+                       the pages are drawn once with the seed so every crawl sees the same errors
+        redirects    - paths answered with 301 Moved Permanently to another path, like {'/old/': '/new/'}
+
+        Every response has an ETag header, requests with a matching
+        If-None-Match header get 304 Not Modified without body.
+        '''
+
+        if not 0 <= error_rate <= 1:
+            raise ValueError(
+                f'error_rate is {error_rate}, expected to be between 0 and 1')
+
+        self.site = site
+        self.latency = latency
+        self.requests_count: int = 0
+        self.connections_count: int = 0
+        self.not_modified_count: int = 0
+        self.rate_limited_count: int = 0
+        self.retry_after: str = retry_after
+        self.robots_txt: str = robots_txt
+        self.path_latency: dict = path_latency or {}
+        other_paths = [path for path in site.pages if path != '/']
+        self.error_paths: set = set(random.Random(seed).sample(
+            other_paths, round(len(other_paths) * error_rate)))
+        self.error_status: int = error_status
+        self.redirects: dict = redirects or {}
+        self.requested_paths: list = []
+        self.bucket: TokenBucket = TokenBucket(
+            rate_limit, burst=2) if rate_limit else None
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self.build_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    @property
+    def root_link(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def build_handler(self) -> type:
+        '''
+        Return a request handler class bound to this server.
+        '''
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with server.lock:
+                    server.connections_count += 1
+
+            def do_GET(self) -> None:
+                with server.lock:
+                    server.requests_count += 1
+                    server.requested_paths.append(self.path)
+                    now = time.monotonic()
+                    rate_limited = server.bucket is not None and server.bucket.ready_at(
+                        now) > now
+                    if server.bucket is not None and not rate_limited:
+                        server.bucket.reserve(now)
+                    if rate_limited:
+                        server.rate_limited_count += 1
+                if server.latency or self.path in server.path_latency:
+                    time.sleep(server.path_latency.get(
+                        self.path, server.latency))
+
+                if rate_limited:
+                    self.send_response(429)
+                    self.send_header('Retry-After', server.retry_after)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if self.path in server.redirects:
+                    self.send_response(301)
+                    self.send_header('Location', server.redirects[self.path])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                body = server.site.pages.get(self.path)
+                if self.path == '/robots.txt' and server.robots_txt is not None:
+                    body = server.robots_txt.encode('utf8')
+                status = 200
+                if body is None:
+                    status = 404
+                    body = b'<html><body>Not Found</body></html>'
+                elif self.path in server.error_paths:
+                    status = server.error_status
+                    body = b'<html><body>Server Error</body></html>'
+
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    with server.lock:
+                        server.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client timed out and closed the connection
+                    self.close_connection = True
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> 'LocalServer':
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self) -> 'LocalServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,124 @@
+import numpy as np
+from app.compact_graph import CompactGraph
+
+
+class PathEngine():
+    def __init__(self, compact_graph: CompactGraph) -> None:
+        '''
+        Cycle safe path metrics of a compact graph, every traversal is iterative and linear
+        in the number of edges:
+            - the strongly connected components (Tarjan), numbered in reverse topological order
+            - the longest path of the condensation DAG, each component counts as one node
+              so the result does not depend on the iteration order of the cycles
+        '''
+
+        self.compact_graph: CompactGraph = compact_graph
+        self.components: np.ndarray = None
+        self.component_count: int = 0
+        self.longest_paths: np.ndarray = None
+
+    def __str__(self) -> str:
+        return f'PathEngine(nodes={self.compact_graph.node_count}, components={self.component_count})'
+
+    def get_components(self) -> np.ndarray:
+        '''
+        Return the component id of each node id, computed with an iterative Tarjan algorithm.
+        A component only has edges to components with a smaller id.
+        '''
+
+        if self.components is not None:
+            return self.components
+
+        offsets = self.compact_graph.offsets.tolist()
+        targets = self.compact_graph.targets.tolist()
+        node_count = self.compact_graph.node_count
+
+        index = [-1] * node_count
+        lowlink = [0] * node_count
+        on_stack = [False] * node_count
+        components = [-1] * node_count
+        stack = []
+        counter = 0
+        component_count = 0
+
+        for root in range(node_count):
+            if index[root] != -1:
+                continue
+
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # (node, position of the next edge to check) for each node being visited
+            work = [(root, offsets[root])]
+
+            while work:
+                node, edge = work[-1]
+                end = offsets[node + 1]
+                while edge < end:
+                    target = targets[edge]
+                    edge += 1
+                    if index[target] == -1:
+                        # visit the target first, the node continues from the next edge
+                        work[-1] = (node, edge)
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, offsets[target]))
+                        break
+                    if on_stack[target] and index[target] < lowlink[node]:
+                        lowlink[node] = index[target]
+                else:
+                    # all the edges are checked, the node is done
+                    work.pop()
+                    if lowlink[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            components[member] = component_count
+                            if member == node:
+                                break
+                        component_count += 1
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+
+        self.components = np.array(components, dtype=np.int32)
+        self.component_count = component_count
+        return self.components
+
+    def get_longest_paths(self) -> np.ndarray:
+        '''
+        Return the length (number of edges) of the longest path of the condensation DAG
+        starting from the component of each node id.
+        '''
+
+        if self.longest_paths is not None:
+            return self.longest_paths
+
+        components = self.get_components()
+        # the components are numbered in reverse topological order,
+        # so every successor of a component is done before the component itself
+        order = np.argsort(components, kind='stable').tolist()
+        components = components.tolist()
+        offsets = self.compact_graph.offsets.tolist()
+        targets = self.compact_graph.targets.tolist()
+
+        longest = [0] * self.component_count
+        for node in order:
+            component = components[node]
+            best = longest[component]
+            for target in targets[offsets[node]:offsets[node + 1]]:
+                target_component = components[target]
+                if target_component != component and longest[target_component] >= best:
+                    best = longest[target_component] + 1
+            longest[component] = best
+
+        self.longest_paths = np.array(longest, dtype=np.int64)[
+            self.components]
+        return self.longest_paths
+
+    def get_longest_path(self) -> int:
+        return int(self.get_longest_paths().max())
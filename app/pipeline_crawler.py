@@ -0,0 +1,173 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from app.fetch_policy import FetchFailed
+
+
+# WebpageParser of the parser worker process, created by init_parser_worker
+worker_parser = None
+
+
+def init_parser_worker(root_link: str, link_extractor: str, file_extensions: tuple) -> None:
+    '''
+    Create the WebpageParser used by the parser worker process, with the link extractor
+    and the link classification of the crawling parser.
+    '''
+
+    global worker_parser
+    from app.webpage_parser import WebpageParser
+    worker_parser = WebpageParser(root_link=root_link, file_manager=None,
+                                  link_extractor=link_extractor, file_extensions=file_extensions)
+
+
+def parse_batch(batch: list) -> list:
+    '''
+    Parse a batch of fetched pages in a worker process.
+
+    batch   - list of (link, page_link, web_page, status_code, page_size_bytes) tuples,
+              the relative links of the web page are resolved against page_link (its url after the redirects)
+    returns - list of (link, clean_links) tuples
+    '''
+
+    return [(link, worker_parser.parse_web_page(web_page=web_page, status_code=status_code,
+                                                page_size_bytes=page_size_bytes, page_link=page_link))
+            for link, page_link, web_page, status_code, page_size_bytes in batch]
+
+
+class PipelineCrawler():
+    def __init__(self, webpage_parser, fetch_concurrency: int = 8, parse_workers: int = None, batch_size: int = 8, max_pending_pages: int = None) -> None:
+        '''
+        Crawl a website with the network fetching and the html parsing decoupled.
+
+        The pages are fetched by a pool of fetch_concurrency threads and sent in batches
+        of batch_size pages to a pool of parse_workers processes, the coordinator
+        (the calling thread) owns the map_dict and the frontier.
+
+        max_pending_pages - maximum number of fetched html pages held in memory (fetching,
+                            waiting for a batch or being parsed), no new page is fetched
+                            above this limit
+        '''
+
+        parse_workers = parse_workers or os.cpu_count() or 1
+        max_pending_pages = max_pending_pages or 2 * parse_workers * batch_size
+
+        for name, value in [('fetch_concurrency', fetch_concurrency), ('parse_workers', parse_workers),
+                            ('batch_size', batch_size), ('max_pending_pages', max_pending_pages)]:
+            if value < 1:
+                raise ValueError(
+                    f'{name} is {value}, expected to be at least 1')
+
+        self.webpage_parser = webpage_parser
+        self.fetch_concurrency: int = fetch_concurrency
+        self.parse_workers: int = parse_workers
+        self.batch_size: int = batch_size
+        self.max_pending_pages: int = max_pending_pages
+        self.max_pending_pages_seen: int = 0
+
+    def __str__(self) -> str:
+        return f'PipelineCrawler(fetch_concurrency={self.fetch_concurrency}, parse_workers={self.parse_workers}, batch_size={self.batch_size})'
+
+    def fetch_page(self, link: str) -> tuple:
+        '''
+        Query the link as it was found (revalidate its cached response if the parser has
+        a response cache) and return a tuple with:
+            - the tuple expected by parse_batch, keyed by the canonical url of the link,
+              None if the page was not modified
+            - the (link, clean_links) stored parse result if the page was not modified, otherwise None
+            - the response to store in the response cache once the page is parsed, otherwise None
+        '''
+
+        webpage_parser = self.webpage_parser
+        canonical_link = webpage_parser.url_canonicalizer.canonicalize(link)
+        webpage_parser.crawled_at[canonical_link] = time.time()
+        if webpage_parser.response_cache is None:
+            web_page, status_code, page_size_bytes, page_link = webpage_parser.fetch_web_page(
+                url=link)
+            return ((canonical_link, page_link, web_page, status_code, page_size_bytes), None, None)
+
+        try:
+            response, cached_page = webpage_parser.revalidate_page(link)
+        except FetchFailed as exc:
+            return ((canonical_link, link, '', exc.status, 0), None, None)
+        if cached_page is not None:
+            return (None, (canonical_link, cached_page), None)
+        return ((canonical_link, response.url, response.text, response.status_code, len(response.content)),
+                None, response)
+
+    def crawl(self, link: str) -> dict:
+        '''
+        Crawl starting from the given link and return the map_dict of the webpage_parser.
+        '''
+
+        map_dict = self.webpage_parser.map_dict
+        frontier = deque([link])
+        self.webpage_parser.dedup_index.add(link)
+        fetches = set()
+        parses = {}
+        fetched_pages = []
+        # responses to store in the response cache, by link, until their page is parsed
+        responses = {}
+
+        with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=self.parse_workers, initializer=init_parser_worker,
+                                    initargs=(self.webpage_parser.root_link, self.webpage_parser.link_extractor.name,
+                                              self.webpage_parser.link_classifier.file_extensions)) as parse_pool:
+
+            while frontier or fetches or fetched_pages or parses:
+                pending_pages = len(fetches) + len(fetched_pages) + \
+                    sum(parses.values())
+
+                # backpressure: fetch only while there is room for the fetched pages
+                while frontier and len(fetches) < self.fetch_concurrency and pending_pages < self.max_pending_pages:
+                    fetches.add(fetch_pool.submit(
+                        self.fetch_page, frontier.popleft()))
+                    pending_pages += 1
+                self.max_pending_pages_seen = max(
+                    self.max_pending_pages_seen, pending_pages)
+                if self.webpage_parser.profiler is not None:
+                    self.webpage_parser.profiler.record_queue_depth(
+                        'frontier', len(frontier))
+                    self.webpage_parser.profiler.record_queue_depth(
+                        'pending_pages', pending_pages)
+
+                # send a full batch, or the last pages when nothing else is being fetched
+                while len(fetched_pages) >= self.batch_size or (fetched_pages and not fetches):
+                    batch = fetched_pages[:self.batch_size]
+                    del fetched_pages[:self.batch_size]
+                    parses[parse_pool.submit(parse_batch, batch)] = len(batch)
+
+                done, _ = wait(fetches | set(parses),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        fetches.discard(future)
+                        fetched_page, parsed_page, response = future.result()
+                        if parsed_page is not None:
+                            # not modified, the page is not parsed again
+                            self.__record_page(*parsed_page, frontier)
+                            continue
+                        fetched_pages.append(fetched_page)
+                        if response is not None:
+                            responses[fetched_page[0]] = response
+                        continue
+
+                    del parses[future]
+                    for page_link, clean_links in future.result():
+                        response = responses.pop(page_link, None)
+                        if response is not None:
+                            self.webpage_parser.cache_page(
+                                page_link, response, clean_links)
+                        self.__record_page(page_link, clean_links, frontier)
+
+        return map_dict
+
+    def __record_page(self, link: str, clean_links: dict, frontier: deque) -> None:
+        '''
+        Record the page and queue its internal links that were not queued yet.
+        '''
+
+        self.webpage_parser.record_page(link, clean_links)
+        for internal_link in clean_links['internal_links']:
+            if self.webpage_parser.dedup_index.add(internal_link) is not None:
+                frontier.append(internal_link)
@@ -0,0 +1,366 @@
+import time
+import asyncio
+from threading import Lock
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from requests import Session, RequestException
+from app.fetch_policy import FetchFailed
+
+
+# HTTP_STATUS of the pages the robots.txt of their host does not allow to crawl
+DISALLOWED_STATUS = 'DISALLOWED'
+# statuses of a host asking the crawler to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+class RobotsDisallowed(FetchFailed):
+    def __init__(self, url: str) -> None:
+        super().__init__(url, DISALLOWED_STATUS)
+
+
+def get_host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def parse_retry_after(value: str, now: float = None) -> float:
+    '''
+    Return the seconds to wait from a Retry-After header (seconds or HTTP date), None if it is invalid.
+    '''
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class TokenBucket():
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        '''
+        Token bucket refilled with rate tokens per second up to burst tokens,
+        a request takes one token.
+        '''
+
+        if rate <= 0 or burst < 1:
+            raise ValueError(
+                f'rate={rate} and burst={burst}, expected rate > 0 and burst >= 1')
+
+        self.rate: float = rate
+        self.burst: int = burst
+        self.tokens: float = burst
+        self.updated_at: float = time.monotonic()
+
+    def __refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.burst, self.tokens +
+                              (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def ready_at(self, now: float) -> float:
+        '''
+        Return the time a token is available, without taking it.
+        '''
+
+        self.__refill(now)
+        if self.tokens >= 1:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+    def reserve(self, now: float) -> float:
+        '''
+        Take a token and return the time the request can be sent, the tokens can go below
+        zero so the concurrent requests are spaced 1 / rate seconds apart.
+        '''
+
+        ready_at = self.ready_at(now)
+        self.tokens -= 1
+        return ready_at
+
+
+class HostState():
+    def __init__(self, allowed_rate: float, burst: int) -> None:
+        '''
+        Politeness state of a host: its token bucket, robots.txt and backoff.
+        '''
+
+        self.allowed_rate: float = allowed_rate
+        self.bucket: TokenBucket = TokenBucket(allowed_rate, burst)
+        self.robots: RobotFileParser = None
+        self.robots_lock = Lock()
+        self.robots_fetched_at: float = 0.0
+        self.blocked_until: float = 0.0
+        self.requests: int = 0
+        self.throttled: int = 0
+        self.disallowed: int = 0
+        self.first_request_at: float = None
+        self.last_request_at: float = None
+
+
+class PolitenessScheduler():
+    def __init__(self, requests_per_second: float = 2.0, burst: int = 1, user_agent: str = '*',
+                 respect_robots: bool = True, robots_ttl: float = 24 * 60 * 60,
+                 max_retries: int = 3, backoff: float = 1.0, max_backoff: float = 60.0) -> None:
+        '''
+        Keep the requests of the crawl within the limits of each host:
+            - a token bucket of requests_per_second (burst requests at once) per host,
+              slowed down to the Crawl-delay / Request-rate of the host robots.txt
+            - the robots.txt of each host is fetched once and cached for robots_ttl seconds,
+              the disallowed urls raise RobotsDisallowed
+            - on 429 / 503 the host is paused for Retry-After seconds (or an exponential backoff
+              from backoff up to max_backoff seconds) and its rate is halved, the rate grows
+              back on the following successful responses; the request is retried max_retries times
+
+        The scheduler is shared by the crawl threads, each request waits for its own slot.
+        '''
+
+        if requests_per_second <= 0:
+            raise ValueError(
+                f'requests_per_second is {requests_per_second}, expected to be greater than 0')
+        if burst < 1:
+            raise ValueError(f'burst is {burst}, expected to be at least 1')
+        if max_retries < 0:
+            raise ValueError(
+                f'max_retries is {max_retries}, expected to be at least 0')
+
+        self.requests_per_second: float = requests_per_second
+        self.burst: int = burst
+        self.user_agent: str = user_agent
+        self.respect_robots: bool = respect_robots
+        self.robots_ttl: float = robots_ttl
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.hosts: dict = {}
+        self.lock = Lock()
+
+    def __str__(self) -> str:
+        return f'PolitenessScheduler(requests_per_second={self.requests_per_second}, hosts={len(self.hosts)})'
+
+    def __host_state(self, host: str) -> HostState:
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostState(
+                    self.requests_per_second, self.burst)
+            return state
+
+    def ready_at(self, url: str) -> float:
+        '''
+        Return the monotonic time the next request to the host of the url can be sent.
+        '''
+
+        state = self.hosts.get(get_host(url))
+        if state is None:
+            return 0.0
+        with self.lock:
+            return max(state.blocked_until, state.bucket.ready_at(time.monotonic()))
+
+    def wait_for_slot(self, url: str) -> None:
+        '''
+        Block until the host of the url can receive one more request.
+        '''
+
+        state = self.__host_state(get_host(url))
+        with self.lock:
+            now = time.monotonic()
+            send_at = state.bucket.reserve(max(now, state.blocked_until))
+            state.requests += 1
+        delay = send_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+        now = time.monotonic()
+        with self.lock:
+            if state.first_request_at is None:
+                state.first_request_at = now
+            state.last_request_at = now
+
+    def get_robots(self, session: Session, url: str, timeout=None) -> RobotFileParser:
+        '''
+        Return the parsed robots.txt of the host of the url, fetched on the first call.
+        '''
+
+        parts = urlsplit(url)
+        state = self.__host_state(parts.netloc.lower())
+        # one thread fetches the robots.txt, the others wait for it
+        with state.robots_lock:
+            if state.robots is None or time.monotonic() - state.robots_fetched_at >= self.robots_ttl:
+                self.__fetch_robots(session, state, f'{parts.scheme}://{parts.netloc}/robots.txt',
+                                    timeout)
+            return state.robots
+
+    def __fetch_robots(self, session: Session, state: HostState, robots_url: str, timeout=None) -> None:
+        robots = RobotFileParser()
+        self.wait_for_slot(robots_url)
+        try:
+            response = session.get(robots_url, timeout=timeout)
+        except RequestException:
+            # the host is not reachable, the page request reports the error
+            robots.allow_all = True
+        else:
+            # the same rules as RobotFileParser.read
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+        robots.modified()
+
+        with self.lock:
+            state.robots = robots
+            state.robots_fetched_at = time.monotonic()
+            crawl_delay = robots.crawl_delay(self.user_agent)
+            request_rate = robots.request_rate(self.user_agent)
+            allowed_rate = self.requests_per_second
+            if crawl_delay:
+                allowed_rate = min(allowed_rate, 1 / float(crawl_delay))
+            if request_rate:
+                allowed_rate = min(
+                    allowed_rate, request_rate.requests / request_rate.seconds)
+            state.allowed_rate = state.bucket.rate = allowed_rate
+
+    def can_fetch(self, session: Session, url: str, timeout=None) -> bool:
+        if not self.respect_robots:
+            return True
+        return self.get_robots(session, url, timeout).can_fetch(self.user_agent, url)
+
+    def fetch(self, session: Session, url: str, headers: dict = None, timeout=None):
+        '''
+        Send the GET request in the next slot of the host, retrying the throttled responses.
+        Raises RobotsDisallowed if the robots.txt of the host does not allow the url.
+        '''
+
+        state = self.__host_state(get_host(url))
+        if not self.can_fetch(session, url, timeout):
+            with self.lock:
+                state.disallowed += 1
+            raise RobotsDisallowed(url)
+
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_slot(url)
+            response = session.get(url=url, headers=headers, timeout=timeout)
+            if response.status_code not in THROTTLE_STATUSES:
+                self.__speed_up(state)
+                return response
+            self.__slow_down(state, response, attempt)
+        return response
+
+    def __slow_down(self, state: HostState, response, attempt: int) -> None:
+        '''
+        Pause the host for Retry-After seconds (or an exponential backoff) and halve its rate.
+        '''
+
+        delay = parse_retry_after(response.headers.get('Retry-After'))
+        if delay is None:
+            delay = self.backoff * 2 ** attempt
+        delay = min(delay, self.max_backoff)
+        with self.lock:
+            state.throttled += 1
+            state.blocked_until = max(
+                state.blocked_until, time.monotonic() + delay)
+            # the rate does not go under a sixteenth of the allowed rate
+            state.bucket.rate = max(
+                state.bucket.rate / 2, state.allowed_rate / 16)
+
+    def __speed_up(self, state: HostState) -> None:
+        with self.lock:
+            if state.bucket.rate < state.allowed_rate:
+                state.bucket.rate = min(
+                    state.allowed_rate, state.bucket.rate + state.allowed_rate / 10)
+
+    def get_host_statistics(self) -> dict:
+        '''
+        Return the achieved and allowed request rates of each host like:
+        {'www.globalapptesting.com': {'requests': 120, 'allowed_rate': 2.0, 'achieved_rate': 1.98,
+                                      'throttled': 0, 'disallowed': 3}}
+        '''
+
+        statistics = {}
+        with self.lock:
+            for host, state in self.hosts.items():
+                achieved_rate = None
+                if state.requests > 1 and state.last_request_at > state.first_request_at:
+                    # the requests after the first one are spread over the elapsed time
+                    achieved_rate = (state.requests - 1) / \
+                        (state.last_request_at - state.first_request_at)
+                statistics[host] = {'requests': state.requests, 'allowed_rate': state.allowed_rate,
+                                    'achieved_rate': achieved_rate, 'throttled': state.throttled,
+                                    'disallowed': state.disallowed}
+        return statistics
+
+
+class HostFrontier():
+    def __init__(self, scheduler: PolitenessScheduler, links: list = ()) -> None:
+        '''
+        Frontier with one queue per host, the next link is taken from the host that can
+        receive a request the soonest (round robin between the ready hosts), so a slow or
+        throttled host does not hold the links of the other hosts.
+
+        pop takes the last queued link of the host (stack), popleft the first one (queue).
+        '''
+
+        self.scheduler: PolitenessScheduler = scheduler
+        self.hosts: OrderedDict = OrderedDict()
+        self.length: int = 0
+        for link in links:
+            self.append(link)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        for links in self.hosts.values():
+            yield from links
+
+    def append(self, link: str) -> None:
+        host = get_host(link)
+        links = self.hosts.get(host)
+        if links is None:
+            links = self.hosts[host] = deque()
+        links.append(link)
+        self.length += 1
+
+    def __next_host(self) -> str:
+        if not self.hosts:
+            raise IndexError('pop from an empty frontier')
+        # the earliest ready host, the first one in round robin order on ties
+        host = min(self.hosts, key=lambda host: self.scheduler.ready_at(
+            self.hosts[host][0]))
+        self.hosts.move_to_end(host)
+        return host
+
+    def __take(self, host: str, last: bool) -> str:
+        links = self.hosts[host]
+        link = links.pop() if last else links.popleft()
+        if not links:
+            del self.hosts[host]
+        self.length -= 1
+        return link
+
+    def pop(self) -> str:
+        return self.__take(self.__next_host(), last=True)
+
+    def popleft(self) -> str:
+        return self.__take(self.__next_host(), last=False)
+
+
+class HostQueue(asyncio.Queue):
+    def __init__(self, scheduler: PolitenessScheduler) -> None:
+        '''
+        asyncio.Queue serving the links in the fair host order of HostFrontier.
+        '''
+
+        self.scheduler: PolitenessScheduler = scheduler
+        super().__init__()
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = HostFrontier(self.scheduler)
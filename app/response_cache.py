@@ -0,0 +1,189 @@
+import os
+import json
+import hashlib
+from threading import Lock
+from collections import Counter, OrderedDict
+from app.url_canonicalizer import UrlCanonicalizer
+from app.link_classifier import LINK_CATEGORIES
+
+
+url_canonicalizer = UrlCanonicalizer()
+
+
+class ResponseCache():
+    def __init__(self, directory: str = 'http_cache', max_bytes: int = 256 * 1024 * 1024) -> None:
+        '''
+        Persistent on-disk cache of HTTP responses keyed by normalized url.
+
+        Each entry stores the response body, its ETag / Last-Modified validators
+        and the parse result of the page, the index keeps the entries in least
+        recently used order and the oldest ones are evicted when the total size
+        of the stored bodies is over max_bytes.
+        '''
+
+        if max_bytes < 1:
+            raise ValueError(
+                f'max_bytes is {max_bytes}, expected to be at least 1')
+
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.index: OrderedDict = OrderedDict()
+        self.total_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes_saved: int = 0
+        self.lock = Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.__load_index()
+
+    def __str__(self) -> str:
+        return f'ResponseCache(directory={self.directory}, entries={len(self.index)})'
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        '''
+        Return the canonical url, so equivalent urls share one entry.
+        '''
+
+        return url_canonicalizer.canonicalize(url)
+
+    def __key(self, url: str) -> str:
+        return hashlib.sha1(self.normalize_url(url).encode('utf8')).hexdigest()
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def __index_path(self) -> str:
+        return os.path.join(self.directory, 'index.json')
+
+    def __load_index(self) -> None:
+        if not os.path.exists(self.__index_path()):
+            return
+        with open(self.__index_path(), mode='r', encoding='utf8') as fhandle:
+            # the index is saved from the least to the most recently used entry
+            for key, meta in json.load(fhandle):
+                self.index[key] = meta
+                self.total_bytes += meta['size']
+
+    def flush(self) -> None:
+        '''
+        Save the index to the disk, the bodies are written when they are stored.
+        '''
+
+        with self.lock:
+            with open(self.__index_path(), mode='w', encoding='utf8') as fhandle:
+                json.dump(list(self.index.items()), fhandle)
+
+    def conditional_headers(self, url: str) -> dict:
+        '''
+        Return the If-None-Match / If-Modified-Since headers for the cached url.
+        '''
+
+        with self.lock:
+            meta = self.index.get(self.__key(url))
+        if meta is None:
+            return {}
+
+        headers = {}
+        if meta['etag']:
+            headers['If-None-Match'] = meta['etag']
+        if meta['last_modified']:
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def get(self, url: str) -> dict:
+        '''
+        Return the cached entry of the url like:
+
+        {'body': '<html>...</html>', 'etag': '"5d8c72a5"', 'last_modified': None,
+         'page': {'internal_links': Counter(...), ..., 'HTTP_STATUS': 200, 'page_size_bytes': 116577}}
+
+        or None if the url is not cached.
+        '''
+
+        key = self.__key(url)
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is None:
+                return None
+            self.index.move_to_end(key)
+
+        try:
+            with open(self.__entry_path(key), mode='r', encoding='utf8') as fhandle:
+                entry = json.load(fhandle)
+        except OSError:
+            with self.lock:
+                self.__remove(key)
+            return None
+
+        for category in LINK_CATEGORIES:
+            entry['page'][category] = Counter(entry['page'][category])
+        return entry
+
+    def put(self, url: str, body: str, etag: str, last_modified: str, page: dict) -> None:
+        '''
+        Store the response of the url, only responses with a validator
+        (ETag or Last-Modified) can be revalidated so the others are skipped.
+        '''
+
+        if not etag and not last_modified:
+            return
+
+        key = self.__key(url)
+        entry = {'body': body, 'etag': etag,
+                 'last_modified': last_modified, 'page': page}
+        data = json.dumps(entry).encode('utf8')
+        with open(self.__entry_path(key), mode='wb') as fhandle:
+            fhandle.write(data)
+
+        with self.lock:
+            if key in self.index:
+                self.total_bytes -= self.index[key]['size']
+            self.index[key] = {'etag': etag,
+                               'last_modified': last_modified, 'size': len(data)}
+            self.index.move_to_end(key)
+            self.total_bytes += len(data)
+            self.__evict()
+
+    def __evict(self) -> None:
+        '''
+        Remove the least recently used entries until the cache fits in max_bytes.
+        '''
+
+        while self.total_bytes > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            self.__remove(key)
+
+    def __remove(self, key: str) -> None:
+        meta = self.index.pop(key, None)
+        if meta is None:
+            return
+        self.total_bytes -= meta['size']
+        try:
+            os.remove(self.__entry_path(key))
+        except OSError:
+            pass
+
+    def record_hit(self, page_size_bytes: int) -> None:
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += page_size_bytes
+
+    def record_miss(self) -> None:
+        with self.lock:
+            self.misses += 1
+
+    def get_cache_statistics(self) -> dict:
+        '''
+        Return the number of hits, misses and bytes that were not downloaded again.
+        '''
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self.index),
+                'size_bytes': self.total_bytes}
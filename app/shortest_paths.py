@@ -0,0 +1,235 @@
+import heapq
+from collections import OrderedDict, deque
+import numpy as np
+from app.compact_graph import CompactGraph
+
+
+MAX_CACHED_TABLES = 64
+
+
+class ShortestPaths():
+    def __init__(self, compact_graph: CompactGraph, max_cached_tables: int = MAX_CACHED_TABLES) -> None:
+        '''
+        Shortest path queries on a compact graph.
+
+        The distance / parent table of a source is computed once (BFS,
+        or Dijkstra with the edge weights as costs in weighted mode) and cached, so the distances
+        to any number of targets are read from the table. One-off pairs can use a bidirectional BFS
+        that stops as soon as the two searches meet.
+        '''
+
+        if max_cached_tables < 1:
+            raise ValueError(
+                f'max_cached_tables is {max_cached_tables}, expected to be at least 1')
+
+        self.compact_graph: CompactGraph = compact_graph
+        self.max_cached_tables: int = max_cached_tables
+        self.tables: OrderedDict = OrderedDict()
+        self.reverse_edge_lists: tuple = None
+        self.edge_lists: tuple = None
+
+    def __str__(self) -> str:
+        return f'ShortestPaths(nodes={self.compact_graph.node_count}, cached_tables={len(self.tables)})'
+
+    def get_table(self, source_id: int, weighted: bool = False) -> tuple:
+        '''
+        Return the (distances, parents) arrays of the source, indexed by node id.
+        The unreachable nodes have distance -1 and parent -1, the source has parent -1.
+        '''
+
+        key = (source_id, weighted)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+
+        table = self.__dijkstra(source_id) if weighted else self.__bfs(source_id)
+        self.tables[key] = table
+        if len(self.tables) > self.max_cached_tables:
+            self.tables.popitem(last=False)
+        return table
+
+    def get_distances(self, source: str, targets: list = None, weighted: bool = False) -> dict:
+        '''
+        Return the distance from the source to each target (all the nodes if targets is None),
+        None for the targets that cannot be reached.
+        '''
+
+        compact_graph = self.compact_graph
+        distances, _ = self.get_table(compact_graph.node_id(source), weighted)
+        if targets is None:
+            node_ids = np.arange(compact_graph.node_count)
+            targets = compact_graph.nodes
+        else:
+            node_ids = np.array([compact_graph.node_id(target)
+                                for target in targets], dtype=np.int64)
+
+        return {target: None if distance < 0 else distance
+                for target, distance in zip(targets, distances[node_ids].tolist())}
+
+    def get_path(self, source: str, target: str, weighted: bool = False) -> list:
+        '''
+        Return the urls of the shortest path from the source to the target,
+        an empty list if the target cannot be reached.
+        '''
+
+        compact_graph = self.compact_graph
+        distances, parents = self.get_table(
+            compact_graph.node_id(source), weighted)
+        node_id = compact_graph.node_id(target)
+        if distances[node_id] < 0:
+            return []
+
+        path = []
+        while node_id != -1:
+            path.append(compact_graph.nodes[node_id])
+            node_id = int(parents[node_id])
+        return path[::-1]
+
+    def get_path_bidirectional(self, source: str, target: str) -> list:
+        '''
+        Return the urls of a shortest (unweighted) path from the source to the target found with
+        a bidirectional BFS, an empty list if the target cannot be reached.
+        '''
+
+        compact_graph = self.compact_graph
+        source_id = compact_graph.node_id(source)
+        target_id = compact_graph.node_id(target)
+        if source_id == target_id:
+            return [source]
+
+        offsets, targets, _ = self.__get_edge_lists()
+        reverse_offsets, reverse_targets = self.__get_reverse_edges()
+
+        # (parent, depth) in the forward search, (child, depth) in the backward search
+        forward_visited = {source_id: (-1, 0)}
+        backward_visited = {target_id: (-1, 0)}
+        forward_frontier = [source_id]
+        backward_frontier = [target_id]
+        meeting_node = -1
+
+        while forward_frontier and backward_frontier and meeting_node == -1:
+            # expand the smaller frontier
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting_node = self.__expand(
+                    forward_frontier, offsets, targets, forward_visited, backward_visited)
+            else:
+                backward_frontier, meeting_node = self.__expand(
+                    backward_frontier, reverse_offsets, reverse_targets, backward_visited, forward_visited)
+
+        if meeting_node == -1:
+            return []
+
+        path = []
+        node_id = meeting_node
+        while node_id != -1:
+            path.append(compact_graph.nodes[node_id])
+            node_id = forward_visited[node_id][0]
+        path.reverse()
+        node_id = backward_visited[meeting_node][0]
+        while node_id != -1:
+            path.append(compact_graph.nodes[node_id])
+            node_id = backward_visited[node_id][0]
+        return path
+
+    @staticmethod
+    def __expand(frontier: list, offsets: list, targets: list, visited: dict, other_visited: dict) -> tuple:
+        '''
+        Expand one BFS level, return the next frontier and the node where the searches met (or -1).
+        The whole level is expanded so the meeting node on the shortest path is chosen.
+        '''
+
+        next_frontier = []
+        meeting_node = -1
+        shortest = 0
+        for node_id in frontier:
+            depth = visited[node_id][1] + 1
+            for neighbor_id in targets[offsets[node_id]:offsets[node_id + 1]]:
+                if neighbor_id in visited:
+                    continue
+                visited[neighbor_id] = (node_id, depth)
+                next_frontier.append(neighbor_id)
+                other = other_visited.get(neighbor_id)
+                if other is not None and (meeting_node == -1 or depth + other[1] < shortest):
+                    meeting_node = neighbor_id
+                    shortest = depth + other[1]
+        return next_frontier, meeting_node
+
+    def __get_reverse_edges(self) -> tuple:
+        '''
+        CSR arrays of the reversed edges (offsets and source ids grouped by destination).
+        '''
+
+        if self.reverse_edge_lists is None:
+            compact_graph = self.compact_graph
+            sources = np.repeat(np.arange(compact_graph.node_count, dtype=np.int32),
+                                np.diff(compact_graph.offsets))
+            order = np.argsort(compact_graph.targets, kind='stable')
+            counts = np.bincount(compact_graph.targets,
+                                 minlength=compact_graph.node_count)
+            self.reverse_edge_lists = (np.concatenate(([0], np.cumsum(counts))).tolist(),
+                                       sources[order].tolist())
+        return self.reverse_edge_lists
+
+    def __get_edge_lists(self) -> tuple:
+        '''
+        Python lists of the CSR arrays, indexing them is much faster than indexing NumPy arrays
+        one element at a time.
+        '''
+
+        if self.edge_lists is None:
+            self.edge_lists = (self.compact_graph.offsets.tolist(),
+                               self.compact_graph.targets.tolist(),
+                               self.compact_graph.weights.tolist())
+        return self.edge_lists
+
+    def __bfs(self, source_id: int) -> tuple:
+        '''
+        BFS from the source, the first edge that reaches a node gives its parent.
+        '''
+
+        offsets, targets, _ = self.__get_edge_lists()
+        distances = [-1] * self.compact_graph.node_count
+        parents = [-1] * self.compact_graph.node_count
+        distances[source_id] = 0
+
+        queue = deque([source_id])
+        while queue:
+            node_id = queue.popleft()
+            distance = distances[node_id] + 1
+            for neighbor_id in targets[offsets[node_id]:offsets[node_id + 1]]:
+                if distances[neighbor_id] < 0:
+                    distances[neighbor_id] = distance
+                    parents[neighbor_id] = node_id
+                    queue.append(neighbor_id)
+
+        return np.array(distances, dtype=np.int64), np.array(parents, dtype=np.int32)
+
+    def __dijkstra(self, source_id: int) -> tuple:
+        '''
+        Dijkstra with the weight (number of links) of each edge as its cost.
+        '''
+
+        compact_graph = self.compact_graph
+        offsets, targets, weights = self.__get_edge_lists()
+        distances = [-1] * compact_graph.node_count
+        parents = [-1] * compact_graph.node_count
+        distances[source_id] = 0
+
+        done = [False] * compact_graph.node_count
+        priority_queue = [(0, source_id)]
+        while priority_queue:
+            distance, node_id = heapq.heappop(priority_queue)
+            if done[node_id]:
+                continue
+            done[node_id] = True
+            for edge in range(offsets[node_id], offsets[node_id + 1]):
+                neighbor_id = targets[edge]
+                neighbor_distance = distance + weights[edge]
+                if distances[neighbor_id] < 0 or neighbor_distance < distances[neighbor_id]:
+                    distances[neighbor_id] = neighbor_distance
+                    parents[neighbor_id] = node_id
+                    heapq.heappush(
+                        priority_queue, (neighbor_distance, neighbor_id))
+
+        return np.array(distances, dtype=np.int64), np.array(parents, dtype=np.int32)
@@ -0,0 +1,64 @@
+import pytest
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.async_crawler import AsyncCrawler
+from app.local_server import LocalServer
+
+
+def test_async_crawler_invalid_concurrency(web_parser: WebpageParser):
+    '''
+    Test the exception when the number of workers is not positive.
+    '''
+
+    with pytest.raises(ValueError):
+        AsyncCrawler(webpage_parser=web_parser, concurrency=0)
+
+
+def test_build_dict_map_concurrently(local_server: LocalServer):
+    '''
+    The concurrent crawl must produce the same map_dict as the iterative one.
+    '''
+
+    iterative_parser = WebpageParser(local_server.root_link, FileManager())
+    expected_map = iterative_parser.build_dict_map()
+
+    concurrent_parser = WebpageParser(local_server.root_link, FileManager())
+    obtained_map = concurrent_parser.build_dict_map(concurrency=4)
+
+    assert expected_map == obtained_map
+    # the home page and the 29 sub pages
+    assert len(obtained_map) == 30
+
+
+def test_build_dict_map_concurrently_map_shape(local_server: LocalServer):
+    '''
+    Each page entry has the Counters, the HTTP status code and the page size.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    obtained_map = parser.build_dict_map(concurrency=8)
+    page = obtained_map[local_server.root_link + '/']
+
+    for key in ['internal_links', 'external_links', 'dead_links', 'phone_links', 'email_links', 'file_links']:
+        assert key in page
+    assert page['HTTP_STATUS'] == 200
+    assert page['page_size_bytes'] > 0
+    assert page['phone_links']['tel:+1000000'] == 1
+
+    adj_list_graph = parser.convert_counters_to_graph_edges()
+    assert set(adj_list_graph) == set(obtained_map)
+
+
+def test_build_dict_map_concurrently_propagates_errors(local_server: LocalServer, monkeypatch):
+    '''
+    An exception raised by a worker stops the crawl and is raised to the caller.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+
+    def failing_request(url: str = '') -> tuple:
+        raise ConnectionError(f'Could not connect to {url}')
+
+    monkeypatch.setattr(parser, 'fetch_web_page', failing_request)
+    with pytest.raises(ConnectionError):
+        parser.build_dict_map(concurrency=2)
@@ -0,0 +1,80 @@
+import os
+import random
+import numpy as np
+import pytest
+from app.click_depth_matrix import ClickDepthMatrix, UNREACHABLE
+from app.compact_graph import CompactGraph
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+@pytest.fixture
+def adj_list_graph() -> dict:
+    return {'/': [['/', '/a', 1], ['/', '/b', 1]],
+            '/a': [['/a', '/c', 1]],
+            '/b': [['/b', '/c', 1], ['/b', '/', 1]],
+            '/c': [['/c', '/d', 1]],
+            '/d': [],
+            '/e': [['/e', '/', 1]]}
+
+
+def test_click_depth_matrix_queries(adj_list_graph: dict):
+    matrix = ClickDepthMatrix.build(
+        CompactGraph.from_adj_list_graph(adj_list_graph), workers=1)
+
+    assert matrix.get_distance('/', '/d') == 3
+    assert matrix.get_distance('/d', '/') is None
+    assert matrix.get_histogram() == {1: 7, 2: 6, 3: 2, 4: 1, None: 14}
+    assert matrix.get_farthest_pairs(k=2) == [
+        ('/e', '/d', 4), ('/', '/d', 3)]
+    assert matrix.get_eccentricities() == {
+        '/': 3, '/a': 2, '/b': 2, '/c': 1, '/d': 0, '/e': 4}
+
+
+def test_process_pool_and_memmap_match_bfs_tables(tmp_path):
+    '''
+    The matrix built by the process pool (memory-mapped) matches the BFS tables of the graph.
+    '''
+
+    rand = random.Random(0)
+    nodes = [f'/page/{i}' for i in range(150)]
+    adj_list_graph = {node: [[node, rand.choice(nodes), 1] for _ in range(rand.randint(0, 3))]
+                      for node in nodes}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=FileManager())
+
+    memmap_path = str(tmp_path / 'click_depth.bin')
+    matrix = ClickDepthMatrix.build(graph.get_compact_graph(), workers=2, chunk_size=16,
+                                    memmap_path=memmap_path)
+    assert matrix.is_memory_mapped
+
+    shortest_paths = graph.get_shortest_paths()
+    for node_id in range(0, len(nodes), 7):
+        distances, _ = shortest_paths.get_table(node_id)
+        expected = np.where(distances < 0, UNREACHABLE, distances)
+        assert matrix.matrix[node_id].tolist() == expected.tolist()
+
+    in_memory_matrix = graph.build_click_depth_matrix(workers=1)
+    assert not in_memory_matrix.is_memory_mapped
+    assert in_memory_matrix.get_histogram() == matrix.get_histogram()
+    matrix.close()
+
+
+def test_big_matrix_is_memory_mapped_to_temporary_file(adj_list_graph: dict):
+    matrix = ClickDepthMatrix.build(CompactGraph.from_adj_list_graph(adj_list_graph),
+                                    workers=1, max_memory_bytes=16)
+    temporary_path = matrix.temporary_path
+
+    assert matrix.is_memory_mapped
+    assert matrix.get_distance('/', '/d') == 3
+    matrix.close()
+    assert not os.path.exists(temporary_path)
+
+
+def test_invalid_arguments_raise_value_error(adj_list_graph: dict):
+    compact_graph = CompactGraph.from_adj_list_graph(adj_list_graph)
+    with pytest.raises(ValueError):
+        ClickDepthMatrix.build(compact_graph, workers=0)
+    with pytest.raises(ValueError):
+        ClickDepthMatrix(compact_graph, np.zeros((2, 2), dtype=np.uint16))
+    with pytest.raises(ValueError):
+        ClickDepthMatrix.build(compact_graph, workers=1).get_farthest_pairs(k=0)
@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+from app.compact_graph import CompactGraph
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+def test_from_adj_list_graph_interns_urls(temp_adj_list_graph: dict):
+    '''
+    Every url gets one node id, the destination only urls are appended after the keys.
+    '''
+
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph)
+
+    assert compact_graph.source_count == 1
+    assert compact_graph.node_count == 9
+    assert compact_graph.edge_count == 8
+    assert compact_graph.nodes[0] == 'https://www.globalapptesting.com/'
+    assert compact_graph.offsets.tolist() == [0] + [8] * 9
+    assert compact_graph.targets.dtype == np.int32
+    assert compact_graph.weights.tolist() == [1, 7, 2, 2, 2, 5, 2, 2]
+    assert compact_graph.node_url(compact_graph.node_id(
+        'https://www.globalapptesting.com/product')) == 'https://www.globalapptesting.com/product'
+
+
+def test_view_keeps_the_adj_list_graph_api(temp_adj_list_graph_full: dict):
+    '''
+    The dict-style view returns the same edges as the adjacency list.
+    '''
+
+    view = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full).view()
+
+    assert len(view) == len(temp_adj_list_graph_full)
+    assert list(view) == list(temp_adj_list_graph_full)
+    link = 'https://www.globalapptesting.com/blog'
+    assert [list(edge) for edge in view[link]] == \
+        [list(edge) for edge in temp_adj_list_graph_full[link]]
+    assert 'https://www.globalapptesting.com/not-a-page' not in view
+    with pytest.raises(KeyError):
+        view['https://www.globalapptesting.com/not-a-page']
+
+
+def test_invalid_arrays_raise_value_error():
+    with pytest.raises(ValueError):
+        CompactGraph(nodes=['a', 'b'], source_count=2, offsets=np.array([0, 1]),
+                     targets=np.array([1]), weights=np.array([1]))
+    with pytest.raises(ValueError):
+        CompactGraph(nodes=['a'], source_count=1, offsets=np.array([0, 2]),
+                     targets=np.array([0]), weights=np.array([1]))
+
+
+def test_graph_from_compact_graph(temp_adj_list_graph_full: dict, file_manager: FileManager):
+    '''
+    A graph built only from the compact representation gives the same results.
+    '''
+
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+    compact_only_graph = Graph.from_compact_graph(compact_graph, file_manager)
+    graph = Graph(adj_list_graph=temp_adj_list_graph_full,
+                  file_manager=file_manager)
+
+    assert compact_only_graph.get_compact_graph() is compact_graph
+    assert compact_only_graph.get_longest_path() == graph.get_longest_path()
+    assert compact_only_graph.count_incoming_edges() == graph.count_incoming_edges()
+    start_node = 'https://www.globalapptesting.com'
+    target_node = 'https://www.globalapptesting.com/blog/software-testing'
+    assert compact_only_graph.dijsktra(start_node, target_node) == \
+        graph.dijsktra(start_node, target_node)
+
+
+def test_compact_graph_is_rebuilt_after_invalidate_cache(file_manager: FileManager):
+    adj_list_graph = {'a': [['a', 'b', 1]], 'b': []}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+    assert graph.count_incoming_edges() == {'a': 0, 'b': 1}
+
+    adj_list_graph['b'] = [['b', 'a', 1]]
+    graph.invalidate_cache()
+    assert graph.count_incoming_edges() == {'a': 1, 'b': 1}
+
+    graph.adj_list_graph = {'c': [['c', 'a', 1]]}
+    assert graph.count_incoming_edges() == {'c': 0, 'a': 1}
+
+
+def test_dijsktra_on_cycle(file_manager: FileManager):
+    adj_list_graph = {'a': [['a', 'b', 1], ['a', 'c', 1]],
+                      'b': [['b', 'd', 1]],
+                      'c': [['c', 'a', 1]],
+                      'd': [['d', 'a', 1]]}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    parent, node_dependencies = graph.dijsktra('a', 'd')
+    assert parent['d'] == 'b'
+    assert parent['b'] == 'a'
+    assert node_dependencies['d'] == 2
+
+
+def test_get_longest_path_on_deep_chain(file_manager: FileManager):
+    '''
+    The iterative dfs does not hit the recursion limit on long chains of pages.
+    '''
+
+    chain_length = 20_000
+    adj_list_graph = {f'/page/{i}': [[f'/page/{i}', f'/page/{i + 1}', 1]]
+                      for i in range(chain_length)}
+    adj_list_graph[f'/page/{chain_length}'] = []
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    assert graph.get_longest_path() == chain_length
@@ -0,0 +1,91 @@
+import pytest
+from app.crawl_checkpoint import CrawlCheckpoint
+from app.file_manager import FileManager
+from app.local_server import LocalServer
+from app.webpage_parser import WebpageParser
+
+
+class CrawlInterrupted(Exception):
+    pass
+
+
+def interrupt_after(parser: WebpageParser, pages_count: int, monkeypatch) -> None:
+    '''
+    Make crawl_page fail after pages_count pages, like a crash in the middle of the crawl.
+    '''
+
+    crawl_page = parser.crawl_page
+    crawled = []
+
+    def failing_crawl_page(link: str) -> dict:
+        if len(crawled) == pages_count:
+            raise CrawlInterrupted(link)
+        crawled.append(link)
+        return crawl_page(link)
+    monkeypatch.setattr(parser, 'crawl_page', failing_crawl_page)
+
+
+def test_resume_does_not_fetch_the_checkpointed_pages(local_server: LocalServer, tmp_path, monkeypatch):
+    checkpoint_file = str(tmp_path / 'crawl_checkpoint')
+    expected_map = WebpageParser(
+        local_server.root_link, FileManager()).build_dict_map()
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    interrupt_after(parser, 12, monkeypatch)
+    with pytest.raises(CrawlInterrupted):
+        parser.build_dict_map(checkpoint_file=checkpoint_file,
+                              checkpoint_interval=0)
+    assert parser.checkpoint is None
+
+    requests_count = local_server.requests_count
+    resumed_parser = WebpageParser(local_server.root_link, FileManager())
+    obtained_map = resumed_parser.resume_map_dict(
+        checkpoint_file=checkpoint_file)
+
+    assert local_server.requests_count - requests_count == len(expected_map) - 12
+    assert obtained_map.keys() == expected_map.keys()
+    assert len(resumed_parser.crawled_at) == len(expected_map)
+
+
+def test_resume_without_frontier_snapshot(local_server: LocalServer, tmp_path, monkeypatch):
+    '''
+    The frontier is rebuilt from the logged pages when no snapshot was written.
+    '''
+
+    checkpoint_file = str(tmp_path / 'crawl_checkpoint')
+    parser = WebpageParser(local_server.root_link, FileManager())
+    interrupt_after(parser, 5, monkeypatch)
+    with pytest.raises(CrawlInterrupted):
+        parser.build_dict_map(checkpoint_file=checkpoint_file,
+                              checkpoint_interval=3600)
+
+    map_dict, frontier, _ = CrawlCheckpoint.load(FileManager(), checkpoint_file)
+    assert len(map_dict) == 5
+    assert frontier == []
+
+    resumed_parser = WebpageParser(local_server.root_link, FileManager())
+    assert len(resumed_parser.resume_map_dict(checkpoint_file=checkpoint_file)) == 30
+
+
+def test_generate_and_save_map_dict_resume_requires_checkpoint_file(web_parser: WebpageParser):
+    with pytest.raises(ValueError):
+        web_parser.generate_and_save_map_dict(resume=True)
+
+
+def test_checkpoint_frontier_snapshots(tmp_path):
+    checkpoint = CrawlCheckpoint(FileManager(), str(tmp_path / 'checkpoint'), interval=3600)
+    checkpoint.record_page('/a', {'internal_links': {'/b': 1}}, crawled_at=1.0)
+    assert checkpoint.save_frontier(['/b', '/c'], force=True)
+    assert not checkpoint.save_frontier(['/c'])
+    checkpoint.record_page('/b', {'internal_links': {}})
+    checkpoint.remove_page('/a')
+    checkpoint.close()
+
+    map_dict, frontier, crawled_at = CrawlCheckpoint.load(
+        FileManager(), str(tmp_path / 'checkpoint'))
+    assert map_dict == {'/b': {'internal_links': {}}}
+    assert frontier == ['/b', '/c']
+    assert crawled_at == {}
+
+    with pytest.raises(ValueError):
+        CrawlCheckpoint(FileManager(), str(tmp_path / 'other'), interval=-1)
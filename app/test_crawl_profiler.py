@@ -0,0 +1,97 @@
+import json
+import pytest
+from app.crawl_profiler import CrawlProfiler, Histogram, STAGES
+from app.fetch_policy import FetchPolicy
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.politeness import get_host
+from app.webpage_parser import WebpageParser
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for milliseconds in range(1, 101):
+        histogram.add(milliseconds / 1000)
+
+    summary = histogram.get_summary()
+
+    assert summary['count'] == 100
+    assert summary['mean_ms'] == pytest.approx(50.5)
+    assert summary['max_ms'] == 100
+    # the percentiles are the bucket bounds, at most 19% above the exact values
+    for percentile in (50, 90, 99):
+        assert percentile <= summary[f'p{percentile}_ms'] <= percentile * 1.19
+    assert Histogram().get_summary()['p50_ms'] is None
+
+
+def test_profiled_crawl(tmp_path, monkeypatch, local_server: LocalServer):
+    '''
+    generate_and_save_map_dict exports the stage timings, counters and queue depths of the crawl.
+    '''
+
+    monkeypatch.chdir(tmp_path)
+    parser = WebpageParser(local_server.root_link, FileManager(),
+                           profiler=CrawlProfiler())
+    parser.generate_and_save_map_dict(profile_file='profile')
+
+    summary = json.loads((tmp_path / 'profile.json').read_text())
+    map_dict = parser.get_map_dict()
+    assert summary['pages'] == len(map_dict)
+    assert summary['bytes'] == sum(page['page_size_bytes']
+                                   for page in map_dict.values())
+    assert summary['pages_per_second'] > 0
+    assert list(summary['stages']) == list(STAGES)
+    for stage in ('wait', 'ttfb', 'download', 'parse', 'classify', 'store'):
+        assert summary['stages'][stage]['count'] == len(map_dict)
+    assert summary['stages']['write']['count'] == 1
+    host = summary['hosts'][get_host(local_server.root_link)]
+    assert host['count'] == len(map_dict)
+    assert host['failures'] == 0
+    assert host['p50_ms'] <= host['p99_ms'] <= host['max_ms'] * 1.19
+    assert summary['queue_depths']['frontier']['samples'] == len(map_dict)
+
+
+def test_slow_host_and_failures():
+    '''
+    The per-host percentiles show the slow pages, the pages that cannot be fetched are counted as failures.
+    '''
+
+    site = SyntheticSite(page_count=10, fan_out=2)
+    with LocalServer(site, path_latency={'/page/3': 0.2}) as server, \
+            LocalServer(site, path_latency={'/': 2}) as failing_server:
+        parser = WebpageParser(server.root_link, FileManager(), profiler=CrawlProfiler(),
+                               fetch_policy=FetchPolicy(read_timeout=0.5, max_retries=0))
+        parser.build_dict_map(concurrency=4)
+        parser.perform_get_request(failing_server.root_link)
+
+    summary = parser.profiler.get_summary()
+    host = summary['hosts'][get_host(server.root_link)]
+    assert host['count'] == 10
+    assert host['max_ms'] >= 200 > host['p50_ms']
+    assert summary['hosts'][get_host(failing_server.root_link)] == {
+        **Histogram().get_summary(), 'failures': 1}
+    assert summary['elapsed_seconds'] is None
+
+
+@pytest.mark.parametrize('capture', ['cprofile', 'tracemalloc'])
+def test_capture(capture: str, local_server: LocalServer):
+    parser = WebpageParser(local_server.root_link, FileManager(),
+                           profiler=CrawlProfiler(capture=capture))
+
+    parser.profiler.start()
+    parser.build_dict_map()
+    parser.profiler.stop()
+
+    summary = parser.profiler.get_summary()['capture']
+    assert summary['type'] == capture
+    if capture == 'cprofile':
+        assert any('crawl_page' in function['function']
+                   for function in summary['functions'])
+    else:
+        assert summary['peak_bytes'] >= summary['current_bytes'] > 0
+        assert summary['allocations']
+
+
+def test_invalid_capture():
+    with pytest.raises(ValueError):
+        CrawlProfiler(capture='perf')
@@ -0,0 +1,103 @@
+import json
+import pytest
+from collections import Counter
+from app.crawl_statistics import CrawlStatistics, StatisticsReport
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.helpers import get_webpage_report, get_webpage_statistics
+from app.local_server import LocalServer, SyntheticSite
+from app.webpage_parser import WebpageParser
+
+
+def page(status: int, size: int, internal_links: list) -> dict:
+    return {'internal_links': Counter(internal_links), 'external_links': Counter(['https://x.com']),
+            'dead_links': Counter(), 'phone_links': Counter(), 'email_links': Counter(),
+            'file_links': Counter(), 'HTTP_STATUS': status, 'page_size_bytes': size}
+
+
+def edges(link: str, value: dict) -> list:
+    return [(link, destination, weight) for destination, weight in value['internal_links'].items()]
+
+
+def assert_same_extremes(extremes: dict, expected: dict):
+    for key in ('minimum_incoming_links', 'maximum_incoming_links'):
+        assert extremes[key]['incoming_links_count'] == expected[key]['incoming_links_count']
+        assert sorted(extremes[key]['links']) == sorted(expected[key]['links'])
+
+
+def test_incremental_updates_match_a_full_scan():
+    '''
+    Pages added, replaced and removed one by one give the statistics of the final map_dict.
+    '''
+
+    map_dict = {'/a': page(200, 100, ['/b', '/c']), '/b': page(200, 300, ['/c']),
+                '/c': page(404, 200, []), '/d': page('TIMEOUT', 0, [])}
+    statistics = CrawlStatistics()
+    for link, value in map_dict.items():
+        statistics.add_page(link, value, edges(link, value))
+    # /b is crawled again with other links, /d is removed
+    map_dict['/b'] = page(200, 500, ['/a', '/e'])
+    statistics.add_page('/b', map_dict['/b'], edges('/b', map_dict['/b']))
+    del map_dict['/d']
+    statistics.remove_page('/d')
+
+    expected = CrawlStatistics.from_map_dict(
+        map_dict, lambda link: edges(link, map_dict[link]))
+    assert statistics.get_totals() == expected.get_totals() == {
+        'total_webpages': 3, 'http_statuses': {200: 2, 404: 1}, 'total_internal_links': 4,
+        'total_external_links': 3, 'total_dead_links': 0, 'total_phone_links': 0,
+        'total_email_links': 0, 'total_file_links': 0, 'total_page_size_bytes': 800}
+    assert statistics.get_size_percentiles() == {50: 200, 90: 500, 99: 500}
+
+    graph = Graph({link: edges(link, value) for link, value in map_dict.items()}, FileManager())
+    assert_same_extremes(statistics.get_nodes_with_min_max_links(),
+                         graph.get_nodes_with_min_max_links())
+
+
+def test_live_crawl_statistics(local_server: LocalServer):
+    '''
+    The statistics recorded during the crawl match the ones computed from the map_dict and the graph.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    parser.build_dict_map()
+    graph = Graph(parser.convert_counters_to_graph_edges(), FileManager())
+
+    assert len(parser.statistics) == len(parser.get_map_dict())
+    assert parser.statistics.get_totals() == \
+        CrawlStatistics.from_map_dict(parser.get_map_dict()).get_totals()
+    assert_same_extremes(parser.statistics.get_nodes_with_min_max_links(),
+                         graph.get_nodes_with_min_max_links())
+
+    report = get_webpage_report(local_server.root_link, parser, graph)
+    assert report.render_text() == get_webpage_statistics(
+        local_server.root_link, parser, graph)
+    exported = json.loads(report.to_json())
+    assert exported['total_webpages'] == len(parser.get_map_dict())
+    assert exported['http_statuses'] == {'200': len(parser.get_map_dict())}
+    assert exported['root_eccentricity'] == report.root_eccentricity
+
+
+def test_loaded_map_dict_is_scanned_once(tmp_path, local_server: LocalServer):
+    '''
+    After a map_dict is loaded the statistics of the previous crawl are not used.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    parser.build_dict_map()
+    parser.write_map_dict_to_json_file(str(tmp_path / 'map_dict'))
+    graph = Graph(parser.convert_counters_to_graph_edges(), FileManager())
+    live_statistics = get_webpage_statistics(local_server.root_link, parser, graph)
+
+    parser.load_map_dict_from_json(str(tmp_path / 'map_dict'))
+
+    assert len(parser.statistics) == 0
+    assert get_webpage_statistics(local_server.root_link, parser, graph).split('Minimum')[0] == \
+        live_statistics.split('Minimum')[0]
+
+
+def test_report_without_pages():
+    with pytest.raises(ValueError):
+        StatisticsReport('https://www.example.com', CrawlStatistics().get_totals())
+    with pytest.raises(ValueError):
+        CrawlStatistics().get_nodes_with_min_max_links()
@@ -0,0 +1,96 @@
+from collections import Counter
+import pytest
+from app.crawl_store import CrawlStore
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.helpers import get_webpage_statistics
+from app.local_server import LocalServer
+from app.webpage_parser import WebpageParser
+
+
+def page(http_status: int = 200, internal_links: dict = None) -> dict:
+    return {'internal_links': Counter(internal_links or {}), 'external_links': Counter({'https://www.example.org/': 1}),
+            'dead_links': Counter(), 'phone_links': Counter(), 'email_links': Counter(), 'file_links': Counter(),
+            'HTTP_STATUS': http_status, 'page_size_bytes': 100}
+
+
+def test_write_and_load_map_dict(tmp_path, temp_map_dict: dict):
+    '''
+    The pages are read back in the map_dict format and the order they were written.
+    '''
+
+    with CrawlStore(str(tmp_path / 'crawl.sqlite')) as crawl_store:
+        crawl_store.write_map_dict(temp_map_dict)
+
+    with CrawlStore(str(tmp_path / 'crawl.sqlite')) as crawl_store:
+        assert crawl_store.load_map_dict() == temp_map_dict
+        assert list(crawl_store.load_map_dict()) == list(temp_map_dict)
+        link = 'https://www.globalapptesting.com/product'
+        assert crawl_store.get_page(link) == temp_map_dict[link]
+        assert crawl_store.get_page('https://www.globalapptesting.com/not-a-page') is None
+
+
+def test_pages_are_written_in_batches():
+    crawl_store = CrawlStore(':memory:', batch_size=2)
+
+    crawl_store.add_page('a', page())
+    assert crawl_store.connection.execute(
+        'SELECT COUNT(*) FROM pages').fetchone()[0] == 0
+    crawl_store.add_page('b', page())
+    assert crawl_store.connection.execute(
+        'SELECT COUNT(*) FROM pages').fetchone()[0] == 2
+
+    # the last record of a page replaces its links and edges
+    crawl_store.add_page('a', page(404, {'b': 3}), edges=[('a', 'b', 3)])
+    crawl_store.remove_page('b')
+    assert crawl_store.load_map_dict() == {'a': page(404, {'b': 3})}
+    assert crawl_store.load_adj_list_graph() == {'a': [('a', 'b', 3)]}
+    crawl_store.close()
+
+    with pytest.raises(ValueError):
+        CrawlStore(':memory:', batch_size=0)
+
+
+def test_get_pages_by_status():
+    '''
+    Only the pages with the status and at least min_backlinks incoming edges, most linked first.
+    '''
+
+    with CrawlStore(':memory:') as crawl_store:
+        crawl_store.add_page('a', page(200), [('a', 'b', 1), ('a', 'c', 1)])
+        crawl_store.add_page('b', page(404), [('b', 'c', 2)])
+        crawl_store.add_page('c', page(404), [('c', 'a', 1)])
+        crawl_store.add_page('d', page(404))
+
+        assert crawl_store.get_pages_by_status(404) == [
+            ('c', 2), ('b', 1), ('d', 0)]
+        assert crawl_store.get_pages_by_status(404, min_backlinks=2) == [
+            ('c', 2)]
+        assert crawl_store.get_status_counts() == {200: 1, 404: 3}
+
+
+def test_crawl_store_matches_the_in_memory_statistics(local_server: LocalServer):
+    '''
+    A crawl recorded to the store gives the same statistics and backlinks as the in-memory path.
+    '''
+
+    crawl_store = CrawlStore(':memory:', batch_size=8)
+    parser = WebpageParser(local_server.root_link,
+                           FileManager(), crawl_store=crawl_store)
+    parser.build_dict_map()
+    graph = Graph(adj_list_graph=parser.convert_counters_to_graph_edges(),
+                  file_manager=FileManager())
+
+    store_graph = Graph.from_crawl_store(crawl_store, FileManager())
+    assert store_graph.count_incoming_edges() == graph.count_incoming_edges()
+    assert crawl_store.count_incoming_edges() == graph.count_incoming_edges()
+    for key, value in crawl_store.get_nodes_with_min_max_links().items():
+        expected_value = graph.get_nodes_with_min_max_links()[key]
+        assert value['incoming_links_count'] == expected_value['incoming_links_count']
+        assert sorted(value['links']) == sorted(expected_value['links'])
+
+    store_statistics = get_webpage_statistics(local_server.root_link, parser, graph)
+    parser.crawl_store = None
+    assert store_statistics == get_webpage_statistics(
+        local_server.root_link, parser, graph)
+    crawl_store.close()
@@ -0,0 +1,64 @@
+import pytest
+from app.compact_graph import CompactGraph
+from app.degree_engine import DegreeEngine
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+@pytest.fixture
+def degree_engine() -> DegreeEngine:
+    adj_list_graph = {'a': [['a', 'b', 3], ['a', 'c', 1]],
+                      'b': [['b', 'c', 2]],
+                      'c': [['c', 'a', 5], ['c', 'd', 1], ['c', 'b', 1]]}
+    return DegreeEngine(CompactGraph.from_adj_list_graph(adj_list_graph))
+
+
+def test_degrees(degree_engine: DegreeEngine):
+    assert degree_engine.as_dict('in_degree') == {
+        'a': 1, 'b': 2, 'c': 2, 'd': 1}
+    assert degree_engine.as_dict('out_degree') == {
+        'a': 2, 'b': 1, 'c': 3, 'd': 0}
+    assert degree_engine.as_dict('weighted_in_degree') == {
+        'a': 5, 'b': 4, 'c': 3, 'd': 1}
+    assert degree_engine.as_dict('weighted_out_degree') == {
+        'a': 4, 'b': 2, 'c': 7, 'd': 0}
+
+
+def test_top_and_bottom_k(degree_engine: DegreeEngine):
+    assert degree_engine.top_k(2) == [('b', 2), ('c', 2)]
+    assert degree_engine.bottom_k(2) == [('a', 1), ('d', 1)]
+    assert degree_engine.top_k(kind='weighted_out_degree') == [
+        ('c', 7), ('a', 4), ('b', 2), ('d', 0)]
+    assert degree_engine.bottom_k(0) == []
+
+    with pytest.raises(ValueError):
+        degree_engine.top_k(-1)
+    with pytest.raises(ValueError):
+        degree_engine.top_k(kind='pagerank')
+
+
+def test_min_max_links_reports_a_node_in_both_lists(file_manager: FileManager):
+    '''
+    When every node has the same number of incoming links it is both the minimum and the maximum.
+    '''
+
+    adj_list_graph = {'a': [['a', 'b', 1]], 'b': [['b', 'a', 1]]}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    assert graph.get_nodes_with_min_max_links() == {
+        'minimum_incoming_links': {'links': ['a', 'b'], 'incoming_links_count': 1},
+        'maximum_incoming_links': {'links': ['a', 'b'], 'incoming_links_count': 1}
+    }
+
+
+def test_degree_engine_is_cached_until_the_graph_changes(file_manager: FileManager):
+    adj_list_graph = {'a': [['a', 'b', 1]], 'b': []}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    degree_engine = graph.get_degree_engine()
+    assert graph.get_degree_engine() is degree_engine
+
+    adj_list_graph['b'].append(['b', 'a', 1])
+    graph.invalidate_cache()
+    assert graph.get_degree_engine() is not degree_engine
+    assert graph.count_incoming_edges() == {'a': 1, 'b': 1}
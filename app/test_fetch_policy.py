@@ -0,0 +1,146 @@
+import time
+import socket
+import pytest
+from requests import exceptions
+from urllib3.exceptions import NewConnectionError
+from app.fetch_policy import FetchPolicy, FetchFailed, classify_exception, TIMEOUT_STATUS, DNS_STATUS, TLS_STATUS, CONNECTION_STATUS, CIRCUIT_OPEN_STATUS, REQUEST_ERROR_STATUS
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.helpers import get_webpage_statistics
+from app.local_server import LocalServer, SyntheticSite
+from app.politeness import RobotsDisallowed
+from app.webpage_parser import WebpageParser
+
+
+def test_classify_exception():
+    dns_error = exceptions.ConnectionError(NewConnectionError(
+        None, 'Failed to resolve'))
+    dns_error.args[0].__cause__ = socket.gaierror(-2, 'Name or service not known')
+
+    assert classify_exception(exceptions.ReadTimeout()) == TIMEOUT_STATUS
+    assert classify_exception(exceptions.ConnectTimeout()) == TIMEOUT_STATUS
+    assert classify_exception(exceptions.SSLError()) == TLS_STATUS
+    assert classify_exception(dns_error) == DNS_STATUS
+    assert classify_exception(exceptions.ConnectionError()) == CONNECTION_STATUS
+    assert classify_exception(exceptions.TooManyRedirects()) == REQUEST_ERROR_STATUS
+
+
+def failing_send(errors: list):
+    '''Return a send function raising the errors, then returning 'response' '''
+    calls = []
+
+    def send(timeout: tuple) -> str:
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return 'response'
+    return send, calls
+
+
+def test_timeouts_are_retried():
+    fetch_policy = FetchPolicy(connect_timeout=1, read_timeout=2,
+                               max_retries=2, backoff=0)
+    send, calls = failing_send(
+        [exceptions.ConnectTimeout(), exceptions.ReadTimeout()])
+
+    assert fetch_policy.fetch('host', 'http://host/', send) == 'response'
+    assert calls == [(1, 2)] * 3
+    assert fetch_policy.retries == 2
+
+    send, calls = failing_send([exceptions.ReadTimeout()] * 3)
+    with pytest.raises(FetchFailed) as exc_info:
+        fetch_policy.fetch('host', 'http://host/', send)
+    assert exc_info.value.status == TIMEOUT_STATUS
+    assert len(calls) == 3
+
+
+def test_tls_errors_are_not_retried():
+    fetch_policy = FetchPolicy(max_retries=2, backoff=0)
+    send, calls = failing_send([exceptions.SSLError()])
+
+    with pytest.raises(FetchFailed) as exc_info:
+        fetch_policy.fetch('host', 'https://host/', send)
+    assert exc_info.value.status == TLS_STATUS
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_and_closes():
+    '''
+    After failure_threshold failures the host fails at once, a request after reset_timeout closes it.
+    '''
+
+    fetch_policy = FetchPolicy(max_retries=0, failure_threshold=2,
+                               reset_timeout=0.05)
+    for _ in range(2):
+        send, _ = failing_send([exceptions.ConnectionError()])
+        with pytest.raises(FetchFailed):
+            fetch_policy.fetch('host', 'http://host/', send)
+    assert fetch_policy.get_open_circuits() == ['host']
+
+    send, calls = failing_send([])
+    with pytest.raises(FetchFailed) as exc_info:
+        fetch_policy.fetch('host', 'http://host/', send)
+    assert exc_info.value.status == CIRCUIT_OPEN_STATUS
+    assert calls == []
+    # the other hosts are not affected
+    assert fetch_policy.fetch('other-host', 'http://other-host/', send) == 'response'
+
+    time.sleep(0.06)
+    assert fetch_policy.fetch('host', 'http://host/', send) == 'response'
+    assert fetch_policy.get_open_circuits() == []
+
+
+def test_circuit_breaker_trial_ends_in_disallowed_fetch():
+    '''
+    A half open trial refused by robots.txt does not leave the circuit open, the next request is a new trial.
+    '''
+
+    fetch_policy = FetchPolicy(max_retries=0, failure_threshold=1,
+                               reset_timeout=0.05)
+    send, _ = failing_send([exceptions.ConnectionError()])
+    with pytest.raises(FetchFailed):
+        fetch_policy.fetch('host', 'http://host/', send)
+
+    time.sleep(0.06)
+    send, calls = failing_send([RobotsDisallowed('http://host/private')])
+    with pytest.raises(RobotsDisallowed):
+        fetch_policy.fetch('host', 'http://host/private', send)
+    assert len(calls) == 1
+
+    assert fetch_policy.fetch('host', 'http://host/', send) == 'response'
+    assert fetch_policy.get_open_circuits() == []
+
+
+def test_hanging_page_is_recorded_as_timeout():
+    '''
+    The crawl goes on after a page times out, the failure is in map_dict and in the statistics.
+    '''
+
+    with LocalServer(SyntheticSite(page_count=10, fan_out=2), path_latency={'/page/3': 1.0}) as server:
+        parser = WebpageParser(server.root_link, FileManager(),
+                               fetch_policy=FetchPolicy(read_timeout=0.2, max_retries=1, backoff=0))
+        start = time.perf_counter()
+        map_dict = parser.build_dict_map()
+        crawl_time = time.perf_counter() - start
+        parser.close()
+
+    assert crawl_time < 1.0
+    assert len(map_dict) == 10
+    assert map_dict[f'{server.root_link}/page/3']['HTTP_STATUS'] == TIMEOUT_STATUS
+    assert parser.get_slow_pages(k=1)[0][0] == f'{server.root_link}/page/3'
+
+    graph = Graph(adj_list_graph=parser.convert_counters_to_graph_edges(),
+                  file_manager=FileManager())
+    statistics = get_webpage_statistics(server.root_link, parser, graph)
+    assert 'Pages not fetched:                         1\n' in statistics
+    assert f'    TIMEOUT:{" " * 31}1\n' in statistics
+    assert f'   {server.root_link}/page/3\n' in statistics.split('Slowest pages:')[1]
+
+
+def test_unreachable_host_does_not_abort_the_crawl():
+    parser = WebpageParser('http://127.0.0.1:1', FileManager(),
+                           fetch_policy=FetchPolicy(max_retries=1, backoff=0))
+
+    map_dict = parser.build_dict_map()
+
+    assert map_dict == {'http://127.0.0.1:1/': parser.parse_web_page('', CONNECTION_STATUS, 0)}
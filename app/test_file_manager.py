@@ -1,4 +1,5 @@
 import json
+import pytest
 from typing import Callable
 from app.webpage_parser import FileManager
 
@@ -32,3 +33,51 @@ def test_write_to_file(file_manager: FileManager, build_path: Callable[[], str],
         except Exception as exc:
             print(
                 f'Exception occured when trying to read from the json file with name={file_name}: {exc}')
+
+
+def test_write_and_load_jsonl(file_manager: FileManager, tmp_path, small_map_sample: dict):
+    '''
+    The JSON Lines file has one line per key and loads back to the same dict.
+    '''
+
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_jsonl(file_name=file_name, data=small_map_sample)
+
+    with open(f'{file_name}.jsonl', mode='r', encoding='utf8') as fhandle:
+        assert len(fhandle.readlines()) == len(small_map_sample)
+    assert file_manager.load_from_jsonl(file_name) == small_map_sample
+
+
+def test_jsonl_last_record_wins_and_truncated_line_is_skipped(file_manager: FileManager, tmp_path):
+    file_name = str(tmp_path / 'pages')
+    with file_manager.open_jsonl_writer(file_name) as writer:
+        writer.write('/a', {'HTTP_STATUS': 200})
+        writer.write('/b', {'HTTP_STATUS': 200})
+        writer.write('/a', {'HTTP_STATUS': 404})
+        writer.remove('/b')
+    with file_manager.open_jsonl_writer(file_name, append=True) as writer:
+        writer.write('/c', {'HTTP_STATUS': 200})
+
+    # the process crashed while writing the last line
+    with open(f'{file_name}.jsonl', mode='a', encoding='utf8') as fhandle:
+        fhandle.write('{"key": "/d", "val')
+
+    assert file_manager.load_from_jsonl(file_name) == {
+        '/a': {'HTTP_STATUS': 404}, '/c': {'HTTP_STATUS': 200}}
+
+
+def test_jsonl_invalid_line_raises_value_error(file_manager: FileManager, tmp_path):
+    file_name = str(tmp_path / 'pages')
+    with open(f'{file_name}.jsonl', mode='w', encoding='utf8') as fhandle:
+        fhandle.write('not json\n{"key": "/a", "value": {}}\n')
+
+    with pytest.raises(ValueError):
+        file_manager.load_from_jsonl(file_name)
+
+
+def test_convert_json_to_jsonl(file_manager: FileManager, tmp_path, small_map_sample: dict):
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_file(file_name=file_name, data=small_map_sample)
+
+    file_manager.convert_json_to_jsonl(file_name)
+    assert file_manager.load_from_jsonl(file_name) == small_map_sample
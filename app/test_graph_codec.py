@@ -0,0 +1,89 @@
+import pytest
+from app.compact_graph import CompactGraph
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.graph_codec import MAGIC, encode_compact_graph, decode_compact_graph, read_compact_graph, write_compact_graph
+
+
+def assert_same_graph(compact_graph: CompactGraph, expected: CompactGraph):
+    assert compact_graph.nodes == expected.nodes
+    assert compact_graph.source_count == expected.source_count
+    assert compact_graph.offsets.tolist() == expected.offsets.tolist()
+    assert compact_graph.targets.tolist() == expected.targets.tolist()
+    assert compact_graph.weights.tolist() == expected.weights.tolist()
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_encode_decode_round_trip(temp_adj_list_graph_full: dict, compress: bool):
+    '''
+    The decoded graph has the same urls and edges, with or without compression.
+    '''
+
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+
+    data = encode_compact_graph(compact_graph, compress=compress)
+
+    assert data.startswith(MAGIC)
+    assert_same_graph(decode_compact_graph(data), compact_graph)
+
+
+def test_compression_makes_the_file_smaller(temp_adj_list_graph_full: dict):
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+
+    assert len(encode_compact_graph(compact_graph, compress=True)) < \
+        len(encode_compact_graph(compact_graph))
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_read_compact_graph(tmp_path, temp_adj_list_graph_full: dict, mmap: bool):
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+    file_path = str(tmp_path / 'graph.graph')
+    write_compact_graph(file_path, compact_graph)
+
+    assert_same_graph(read_compact_graph(file_path, mmap=mmap), compact_graph)
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(ValueError):
+        decode_compact_graph(b'{"not": "a graph"}' + b'\x00' * 64)
+
+
+def test_file_manager_picks_the_codec_from_the_extension(tmp_path, file_manager: FileManager, temp_adj_list_graph_full: dict):
+    '''
+    json -> graphz -> graph -> jsonl -> json keeps every edge.
+    '''
+
+    json_path = str(tmp_path / 'graph.json')
+    file_manager.save(json_path, temp_adj_list_graph_full)
+
+    file_manager.convert(json_path, str(tmp_path / 'graph.graphz'))
+    file_manager.convert(str(tmp_path / 'graph.graphz'),
+                         str(tmp_path / 'graph.graph'))
+    file_manager.convert(str(tmp_path / 'graph.graph'),
+                         str(tmp_path / 'graph.jsonl'))
+    file_manager.convert(str(tmp_path / 'graph.jsonl'), json_path)
+
+    assert isinstance(file_manager.load(
+        str(tmp_path / 'graph.graph')), CompactGraph)
+    assert file_manager.load(json_path) == temp_adj_list_graph_full
+    with pytest.raises(ValueError):
+        file_manager.save(str(tmp_path / 'graph.csv'),
+                          temp_adj_list_graph_full)
+
+
+def test_graph_load_binary_graph(tmp_path, initialized_graph: Graph, file_manager: FileManager):
+    '''
+    The graph loaded from the binary file gives the same results as the json one.
+    '''
+
+    file_path = str(tmp_path / 'graph.graph')
+    initialized_graph.write_graph(file_path)
+    graph = Graph(adj_list_graph={}, file_manager=file_manager)
+
+    graph.load_graph(file_path)
+
+    assert graph.count_incoming_edges() == initialized_graph.count_incoming_edges()
+    assert graph.get_nodes_with_min_max_links() == initialized_graph.get_nodes_with_min_max_links()
+    link = 'https://www.globalapptesting.com/blog'
+    assert [list(edge) for edge in graph.adj_list_graph[link]] == \
+        [list(edge) for edge in initialized_graph.adj_list_graph[link]]
@@ -0,0 +1,112 @@
+import json
+import pytest
+from app.compact_graph import CompactGraph
+from app.graph_export import GraphExporter, detect_communities, get_path_prefix
+
+
+SITE = 'https://www.example.com'
+
+
+def two_clusters_graph() -> dict:
+    '''
+    Two groups of 4 pages linking to each other, joined by one edge.
+    '''
+
+    adj_list_graph = {}
+    for section in ('blog', 'docs'):
+        pages = [f'{SITE}/{section}/{index}' for index in range(4)]
+        for page in pages:
+            adj_list_graph[page] = [(page, other, 1)
+                                    for other in pages if other != page]
+    adj_list_graph[f'{SITE}/blog/0'].append(
+        (f'{SITE}/blog/0', f'{SITE}/docs/0', 5))
+    return adj_list_graph
+
+
+def export(tmp_path, compact_graph: CompactGraph, **kwargs) -> dict:
+    file_path = tmp_path / 'graph.json'
+    meta = GraphExporter(compact_graph, **kwargs).export(str(file_path))
+    exported = json.loads(file_path.read_text())
+    assert {key: exported[key] for key in meta} == meta
+    return exported
+
+
+def test_page_export_matches_the_graph(tmp_path, temp_adj_list_graph_full: dict):
+    '''
+    At the page level every node and edge of the graph is exported, in the node id order.
+    '''
+
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+    statuses = {url: 200 for url in temp_adj_list_graph_full}
+
+    exported = export(tmp_path, compact_graph, statuses=statuses,
+                      max_nodes=None, max_edges=None, chunk_size=7)
+
+    labels = [node[1] for node in exported['nodes']]
+    assert labels == compact_graph.nodes
+    edges = {(labels[source], labels[target], weight)
+             for source, target, weight in exported['edges']}
+    # the self links are left out
+    assert edges == {tuple(edge) for edges in temp_adj_list_graph_full.values()
+                     for edge in edges if edge[0] != edge[1]}
+    assert exported['exported_nodes'] == exported['total_nodes'] == compact_graph.node_count
+
+
+def test_path_prefix_collapses_the_pages(tmp_path):
+    compact_graph = CompactGraph.from_adj_list_graph(two_clusters_graph())
+    statuses = {f'{SITE}/docs/3': 404}
+
+    exported = export(tmp_path, compact_graph, statuses=statuses,
+                      level_of_detail='path_prefix')
+
+    assert exported['nodes'] == [[0, f'{SITE}/blog', 4, 12, 0, None],
+                                 [1, f'{SITE}/docs', 4, 13, 1, None]]
+    # the edges inside a prefix are left out, the weights between the prefixes are summed
+    assert exported['edges'] == [[0, 1, 5]]
+    assert get_path_prefix(f'{SITE}/blog/post?page=2', depth=2) == f'{SITE}/blog/post'
+    assert get_path_prefix(SITE) == f'{SITE}/'
+
+
+def test_detect_communities():
+    compact_graph = CompactGraph.from_adj_list_graph(two_clusters_graph())
+
+    communities = detect_communities(compact_graph)
+
+    assert communities.tolist() == [0, 0, 0, 0, 1, 1, 1, 1]
+
+
+def test_max_nodes_and_max_edges(tmp_path, temp_adj_list_graph_full: dict):
+    '''
+    The capped export keeps the root link, the nodes with most backlinks and the heaviest edges.
+    '''
+
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+
+    exported = export(tmp_path, compact_graph, max_nodes=3, max_edges=2)
+
+    assert exported['exported_nodes'] == len(exported['nodes']) == 3
+    assert exported['exported_edges'] == len(exported['edges']) <= 2
+    assert exported['nodes'][0][1] == compact_graph.nodes[0]
+    assert all(source < 3 and target < 3 for source,
+               target, _ in exported['edges'])
+
+
+def test_export_html_escapes_the_urls(tmp_path):
+    compact_graph = CompactGraph.from_adj_list_graph(
+        {SITE: [(SITE, f'{SITE}/</script><b>', 1)]})
+    file_path = tmp_path / 'graph.html'
+
+    GraphExporter(compact_graph).export_html(str(file_path))
+
+    html = file_path.read_text()
+    assert html.count('</script>') == 2
+    assert '<\\/script><b>' in html
+
+
+def test_invalid_arguments():
+    compact_graph = CompactGraph.from_adj_list_graph(two_clusters_graph())
+
+    with pytest.raises(ValueError):
+        GraphExporter(compact_graph, level_of_detail='host')
+    with pytest.raises(ValueError):
+        GraphExporter(compact_graph, max_nodes=0)
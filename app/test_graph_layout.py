@@ -0,0 +1,91 @@
+import json
+import numpy as np
+import pytest
+from app.compact_graph import CompactGraph
+from app.graph_export import GraphExporter
+from app.graph_layout import GraphLayout, force_layout, hierarchy_layout, LAYER_SPACING
+
+
+def two_clusters_edges() -> tuple:
+    '''
+    Edges of two groups of 5 nodes linking to each other, joined by one edge.
+    '''
+
+    edges = [(source, target) for cluster in (range(5), range(5, 10))
+             for source in cluster for target in cluster if source != target]
+    edges.append((0, 5))
+    sources, targets = zip(*edges)
+    return np.array(sources), np.array(targets)
+
+
+def test_force_layout_keeps_the_clusters_apart():
+    sources, targets = two_clusters_edges()
+
+    positions = force_layout(10, sources, targets, iterations=100)
+
+    assert positions.shape == (10, 2)
+    assert np.isfinite(positions).all()
+    distances = np.linalg.norm(positions[:, None] - positions[None, :], axis=2)
+    inside = np.mean([distances[i, j] for i in range(10) for j in range(10)
+                      if i != j and (i < 5) == (j < 5)])
+    between = np.mean([distances[i, j] for i in range(5) for j in range(5, 10)])
+    assert inside < between
+    assert np.array_equal(positions, force_layout(10, sources, targets, iterations=100))
+
+
+def test_hierarchy_layout_rows_by_click_depth():
+    '''
+    Node 0 is on the first row, each node one row under its parent, the unreachable node on the last row.
+    '''
+
+    sources, targets = np.array([0, 0, 1, 2]), np.array([1, 2, 3, 3])
+
+    positions = hierarchy_layout(5, sources, targets)
+
+    assert (positions[:, 1] / LAYER_SPACING).tolist() == [0, 1, 1, 2, 3]
+    # the nodes of a row are centered and do not overlap
+    assert positions[1, 0] == -positions[2, 0] != 0
+
+
+def test_positions_are_cached(tmp_path):
+    sources, targets = two_clusters_edges()
+    labels = [str(node_id) for node_id in range(10)]
+    layout = GraphLayout(cache_directory=str(tmp_path))
+
+    positions = layout.get_positions(labels, sources, targets)
+    cache_files = list(tmp_path.iterdir())
+    assert [file.name for file in cache_files] == \
+        [f'{layout.get_hash(labels, sources, targets)}.npy']
+
+    # the second call reads the cache file instead of computing the layout
+    np.save(cache_files[0], np.zeros_like(positions))
+    assert not layout.get_positions(labels, sources, targets).any()
+    # another graph or other settings have another hash
+    assert GraphLayout(kind='hierarchy').get_hash(labels, sources, targets) != \
+        layout.get_hash(labels, sources, targets)
+    assert layout.get_hash(labels, sources[:-1], targets[:-1]) != \
+        layout.get_hash(labels, sources, targets)
+
+
+def test_export_with_layout(tmp_path, temp_adj_list_graph_full: dict):
+    compact_graph = CompactGraph.from_adj_list_graph(temp_adj_list_graph_full)
+    exporter = GraphExporter(compact_graph, layout=GraphLayout(
+        kind='hierarchy', cache_directory=None))
+
+    exporter.export(str(tmp_path / 'graph.json'))
+    exporter.export_html(str(tmp_path / 'graph.html'))
+
+    exported = json.loads((tmp_path / 'graph.json').read_text())
+    assert exported['layout'] == 'hierarchy'
+    assert exported['node_fields'][-2:] == ['x', 'y']
+    assert exported['nodes'][0][-2:] == [0.0, 0.0]
+    assert all(len(node) == len(exported['node_fields'])
+               for node in exported['nodes'])
+    assert 'physics = field(\'x\') >= 0 ? false' in (tmp_path / 'graph.html').read_text()
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        GraphLayout(kind='circle')
+    with pytest.raises(ValueError):
+        GraphLayout(iterations=0)
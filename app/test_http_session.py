@@ -0,0 +1,68 @@
+import pytest
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.http_session import build_session
+from app.local_server import LocalServer
+
+
+def test_build_session_invalid_pool_size():
+    '''
+    Test the exception when the pool size is not positive.
+    '''
+
+    with pytest.raises(ValueError):
+        build_session(pool_connections=0)
+
+    with pytest.raises(ValueError):
+        build_session(pool_maxsize=0)
+
+
+def test_build_session_headers():
+    '''
+    The session keeps the connections alive and accepts compressed responses.
+    '''
+
+    session = build_session()
+
+    assert session.headers['Connection'] == 'keep-alive'
+    assert 'gzip' in session.headers['Accept-Encoding']
+    assert session.get_adapter('https://www.globalapptesting.com')._pool_maxsize == 10
+
+
+def test_session_is_reused(web_parser: WebpageParser):
+    '''
+    The same session is returned until the parser is closed.
+    '''
+
+    session = web_parser.get_session()
+    assert session is web_parser.get_session()
+
+    web_parser.close()
+    assert web_parser.session is None
+    assert session is not web_parser.get_session()
+
+
+def test_crawl_reuses_connections(local_server: LocalServer):
+    '''
+    The iterative crawl sends all requests over a single keep-alive connection.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    parser.build_dict_map()
+    parser.close()
+
+    assert local_server.requests_count > 1
+    assert local_server.connections_count == 1
+
+
+def test_concurrent_crawl_respects_per_host_limit(local_server: LocalServer):
+    '''
+    The concurrent crawl does not open more connections than pool_maxsize.
+    '''
+
+    parser = WebpageParser(local_server.root_link,
+                           FileManager(), pool_maxsize=2)
+    parser.build_dict_map(concurrency=8)
+    parser.close()
+
+    assert local_server.connections_count <= 2
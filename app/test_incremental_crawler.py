@@ -0,0 +1,128 @@
+import time
+import pytest
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.incremental_crawler import IncrementalCrawler
+from app.local_server import LocalServer, SyntheticSite
+
+
+def set_pages(local_server: LocalServer, pages: dict) -> None:
+    '''Replace the pages of the local website, pages maps path to linked paths'''
+    local_server.site.pages = {path: ''.join(f'<a href="{target}">link</a>' for target in targets).encode('utf8')
+                               for path, targets in pages.items()}
+
+
+@pytest.fixture
+def crawled_parser(local_server: LocalServer) -> WebpageParser:
+    set_pages(local_server, {'/': ['/a', '/b'], '/a': ['/b'], '/b': ['/a']})
+    parser = WebpageParser(local_server.root_link, FileManager())
+    parser.build_dict_map()
+    parser.convert_counters_to_graph_edges()
+    return parser
+
+
+def test_refresh_map_dict_empty(web_parser: WebpageParser):
+    '''
+    Test the exception when there is no map_dict to refresh.
+    '''
+
+    with pytest.raises(ValueError):
+        web_parser.refresh_map_dict()
+
+
+def test_select_pages_invalid_strategy(crawled_parser: WebpageParser):
+    '''
+    Test the exception when the refresh strategy is unknown.
+    '''
+
+    with pytest.raises(ValueError):
+        IncrementalCrawler(crawled_parser).select_pages(strategy='random')
+
+
+def test_select_pages_by_staleness(crawled_parser: WebpageParser):
+    '''
+    The stalest pages are selected first and the fresh ones are skipped.
+    '''
+
+    root = crawled_parser.root_link
+    home = f'{root}/'
+    crawled_parser.crawled_at = {home: 10.0,
+                                 f'{root}/a': 5.0, f'{root}/b': time.time()}
+    crawler = IncrementalCrawler(crawled_parser)
+
+    assert crawler.select_pages(stale_after=60) == [f'{root}/a', home]
+    assert crawler.select_pages(max_pages=1) == [f'{root}/a']
+
+
+def test_select_pages_by_priority(crawled_parser: WebpageParser):
+    '''
+    The pages with most incoming links are selected first.
+    '''
+
+    root = crawled_parser.root_link
+    home = f'{root}/'
+    crawled_parser.map_dict[f'{root}/b']['internal_links'][f'{root}/b'] = 1
+    selected_pages = IncrementalCrawler(
+        crawled_parser).select_pages(strategy='priority')
+
+    assert selected_pages == [f'{root}/b', f'{root}/a', home]
+
+
+def test_refresh_unchanged_website(crawled_parser: WebpageParser):
+    '''
+    Nothing is patched when the website did not change.
+    '''
+
+    expected_map = dict(crawled_parser.map_dict)
+    report = crawled_parser.refresh_map_dict()
+
+    assert report == {'refreshed': 3, 'changed': [],
+                      'added': [], 'removed': []}
+    assert expected_map == crawled_parser.map_dict
+
+
+def test_refresh_patches_map_dict_and_graph(crawled_parser: WebpageParser, local_server: LocalServer):
+    '''
+    New pages are added, unreachable pages are dropped and the graph is patched in place.
+    '''
+
+    root = crawled_parser.root_link
+    home = f'{root}/'
+    graph = Graph(adj_list_graph=dict(
+        crawled_parser.adj_list_graph), file_manager=FileManager())
+    set_pages(local_server, {'/': ['/a', '/c'],
+              '/a': ['/a'], '/b': ['/a'], '/c': ['/a']})
+
+    report = crawled_parser.refresh_map_dict(graph=graph, concurrency=2)
+
+    assert report['refreshed'] == 4
+    assert sorted(report['changed']) == [home, f'{root}/a']
+    assert report['added'] == [f'{root}/c']
+    assert report['removed'] == [f'{root}/b']
+
+    assert set(crawled_parser.map_dict) == {home, f'{root}/a', f'{root}/c'}
+    assert crawled_parser.adj_list_graph == graph.adj_list_graph
+    assert graph.adj_list_graph[home] == [
+        (home, f'{root}/a', 1), (home, f'{root}/c', 1)]
+    assert graph.count_incoming_edges() == {
+        home: 0, f'{root}/a': 3, f'{root}/c': 1}
+
+
+def test_refresh_keeps_pages_of_stopped_server():
+    '''
+    The pages that cannot be fetched keep their previous links, so nothing is removed.
+    '''
+
+    with LocalServer(SyntheticSite(page_count=30, fan_out=3)) as server:
+        parser = WebpageParser(server.root_link, FileManager())
+        parser.build_dict_map()
+        # the pooled connections would still reach the stopped server
+        parser.close()
+    expected_map = {link: dict(page) for link, page in parser.map_dict.items()}
+
+    report = parser.refresh_map_dict(max_pages=1)
+
+    assert report == {'refreshed': 0, 'changed': [],
+                      'added': [], 'removed': []}
+    assert parser.map_dict == expected_map
@@ -0,0 +1,102 @@
+import os
+import pytest
+from app.file_manager import FileManager
+from app.lazy_map_store import LazyMapStore, INDEX_EXTENSION
+from app.webpage_parser import WebpageParser
+
+
+def test_lazy_map_store_reads_the_same_pages(tmp_path, file_manager: FileManager, temp_map_dict: dict):
+    '''
+    The store has the same keys (in the same order) and pages as the eager loader.
+    '''
+
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_jsonl(file_name=file_name, data=temp_map_dict)
+
+    with LazyMapStore(file_name) as map_store:
+        assert len(map_store) == len(temp_map_dict)
+        assert list(map_store) == list(temp_map_dict)
+        assert dict(map_store) == file_manager.load_from_jsonl(file_name)
+        assert 'https://www.globalapptesting.com/not-a-page' not in map_store
+        with pytest.raises(KeyError):
+            map_store['https://www.globalapptesting.com/not-a-page']
+    assert os.path.exists(f'{file_name}.jsonl{INDEX_EXTENSION}')
+
+
+def test_lazy_map_store_last_record_wins(tmp_path, file_manager: FileManager):
+    '''
+    Rewritten keys keep their first position, removed keys and a truncated last line are skipped.
+    '''
+
+    file_name = str(tmp_path / 'map_dict')
+    with file_manager.open_jsonl_writer(file_name) as writer:
+        writer.write('a', {'HTTP_STATUS': 200})
+        writer.write('b', {'HTTP_STATUS': 200})
+        writer.write('c', {'HTTP_STATUS': 200})
+        writer.write('a', {'HTTP_STATUS': 404})
+        writer.remove('b')
+    with open(f'{file_name}.jsonl', mode='a', encoding='utf8') as fhandle:
+        fhandle.write('{"key": "d", "val')
+
+    with LazyMapStore(file_name) as map_store:
+        assert dict(map_store) == {'a': {'HTTP_STATUS': 404},
+                                   'c': {'HTTP_STATUS': 200}}
+
+
+def test_lazy_map_store_rebuilds_a_stale_index(tmp_path, file_manager: FileManager):
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_jsonl(file_name, {'a': {'HTTP_STATUS': 200}})
+    LazyMapStore(file_name).close()
+
+    with file_manager.open_jsonl_writer(file_name, append=True) as writer:
+        writer.write('b', {'HTTP_STATUS': 301})
+
+    with LazyMapStore(file_name) as map_store:
+        assert map_store['b'] == {'HTTP_STATUS': 301}
+        assert len(map_store) == 2
+
+
+def test_lazy_map_store_keeps_at_most_cache_size_pages(tmp_path, file_manager: FileManager):
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_jsonl(
+        file_name, {str(number): {'HTTP_STATUS': number} for number in range(10)})
+
+    with LazyMapStore(file_name, cache_size=3) as map_store:
+        for key in map_store:
+            assert map_store[key] == {'HTTP_STATUS': int(key)}
+        assert list(map_store.cache) == ['7', '8', '9']
+
+    with pytest.raises(ValueError):
+        LazyMapStore(file_name, cache_size=-1)
+
+
+def test_webpage_parser_uses_the_lazy_map_dict(tmp_path, web_parser: WebpageParser, file_manager: FileManager, temp_map_dict: dict):
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_file(file_name=file_name, data=temp_map_dict)
+    link = 'https://www.globalapptesting.com/product'
+
+    map_dict = web_parser.load_map_dict_lazily(file_name)
+
+    assert isinstance(map_dict, LazyMapStore)
+    assert web_parser.get_link_status_code(link) == 200
+    assert web_parser.get_link_info(link)['internal_links'] == len(
+        temp_map_dict[link]['internal_links'])
+    map_dict.close()
+
+
+def test_lazy_map_dict_is_read_only(tmp_path, web_parser: WebpageParser, file_manager: FileManager, temp_map_dict: dict):
+    '''
+    Recording, removing or refreshing the pages of a lazily loaded map_dict raises a descriptive error.
+    '''
+
+    file_name = str(tmp_path / 'map_dict')
+    file_manager.write_to_file(file_name=file_name, data=temp_map_dict)
+    link = 'https://www.globalapptesting.com/product'
+
+    with web_parser.load_map_dict_lazily(file_name):
+        for update in [lambda: web_parser.record_page(link, temp_map_dict[link]),
+                       lambda: web_parser.remove_page(link),
+                       lambda: web_parser.refresh_map_dict()]:
+            with pytest.raises(ValueError, match='read only'):
+                update()
+        assert web_parser.get_link_status_code(link) == 200
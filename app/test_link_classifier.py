@@ -0,0 +1,123 @@
+import pytest
+from collections import Counter
+from app.link_classifier import LinkClassifier
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+
+
+@pytest.fixture
+def classifier() -> LinkClassifier:
+    return LinkClassifier('https://www.globalapptesting.com/')
+
+
+def test_link_classifier_without_root():
+    '''
+    Test the exception when the root link is not provided.
+    '''
+
+    with pytest.raises(ValueError):
+        LinkClassifier('')
+
+
+@pytest.mark.parametrize('href, expected', [
+    ('/product', ('internal_links', 'https://www.globalapptesting.com/product')),
+    ('/hotel', ('internal_links', 'https://www.globalapptesting.com/hotel')),
+    ('/about/mailtoolkit', ('internal_links',
+     'https://www.globalapptesting.com/about/mailtoolkit')),
+    ('https://www.globalapptesting.com/product',
+     ('internal_links', 'https://www.globalapptesting.com/product')),
+    ('http://globalapptesting.com/product',
+     ('internal_links', 'http://globalapptesting.com/product')),
+    ('//www.globalapptesting.com/product',
+     ('internal_links', 'https://www.globalapptesting.com/product')),
+    ('pricing', ('internal_links', 'https://www.globalapptesting.com/pricing')),
+    ('https://www.linkedin.com/shareArticle?url=https://www.globalapptesting.com',
+     ('external_links', 'https://www.linkedin.com/shareArticle?url=https://www.globalapptesting.com')),
+    ('https://www.hotels.com/', ('external_links', 'https://www.hotels.com/')),
+    ('https://go.globalapptesting.com/speak-to-us',
+     ('external_links', 'https://go.globalapptesting.com/speak-to-us')),
+    ('https://www.globalapptesting.com.example.org/',
+     ('external_links', 'https://www.globalapptesting.com.example.org/')),
+    ('ftp://files.example.org/', ('external_links', 'ftp://files.example.org/')),
+    ('#', ('dead_links', '#')),
+    ('#section', ('dead_links', '#section')),
+    ('tel:+14087525770', ('phone_links', 'tel:+14087525770')),
+    ('mailto:info@globalapptesting.com',
+     ('email_links', 'mailto:info@globalapptesting.com')),
+    ('/files/report.PDF', ('file_links', '/files/report.PDF')),
+    ('https://cdn.example.org/image.png?size=2',
+     ('file_links', 'https://cdn.example.org/image.png?size=2')),
+    ('javascript:;', (None, None)),
+    ('javascript:void(0);', (None, None)),
+    ('', (None, None)),
+])
+def test_classify_href(classifier: LinkClassifier, href: str, expected: tuple):
+    '''
+    Check the category of the edge cases of the previous if/elif chain.
+    '''
+
+    assert classifier.classify_href(href) == expected
+
+
+def test_classify_batch(classifier: LinkClassifier):
+    '''
+    A batch of hrefs is counted per category.
+    '''
+
+    hrefs = ['/product', 'https://www.globalapptesting.com/product', '#', 'javascript:;',
+             'https://testathon.co/', 'https://testathon.co/']
+    counters = classifier.classify(hrefs)
+
+    assert counters['internal_links'] == Counter(
+        {'https://www.globalapptesting.com/product': 2})
+    assert counters['external_links'] == Counter(
+        {'https://testathon.co/': 2})
+    assert counters['dead_links'] == Counter({'#': 1})
+    assert not counters['phone_links']
+    assert not counters['email_links']
+    assert not counters['file_links']
+
+
+def test_configurable_file_extensions():
+    '''
+    The file extensions are configurable per parser.
+    '''
+
+    parser = WebpageParser('https://www.globalapptesting.com',
+                           FileManager(), file_extensions=('.zip',))
+    hrefs = parser.extract_hrefs(links=['/archive.zip', '/report.pdf'])
+
+    assert hrefs['file_links'] == Counter({'/archive.zip': 1})
+    assert hrefs['internal_links'] == Counter(
+        {'https://www.globalapptesting.com/report.pdf': 1})
+
+
+def test_relative_links_are_resolved_against_the_page(classifier: LinkClassifier):
+    '''
+    The relative hrefs of a nested page are resolved against the page, the memoized
+    hrefs found on another page are resolved again.
+    '''
+
+    page_link = 'https://www.globalapptesting.com/a/b/'
+    hrefs = ['../x', 'sub/page', '?page=2', '/product']
+
+    counters = classifier.classify(hrefs, page_link)
+
+    assert counters['internal_links'] == Counter({'https://www.globalapptesting.com/a/x': 1,
+                                                  'https://www.globalapptesting.com/a/b/sub/page': 1,
+                                                  'https://www.globalapptesting.com/a/b/?page=2': 1,
+                                                  'https://www.globalapptesting.com/product': 1})
+    assert classifier.classify(['sub/page'], 'https://www.globalapptesting.com/c')['internal_links'] == \
+        Counter({'https://www.globalapptesting.com/sub/page': 1})
+    assert classifier.classify_href('../x', page_link) == (
+        'internal_links', 'https://www.globalapptesting.com/a/x')
+
+
+def test_parse_nested_page():
+    parser = WebpageParser('https://www.globalapptesting.com', FileManager())
+
+    clean_links = parser.parse_web_page('<a href="../pricing">Pricing</a><a href="team">Team</a>', 200, 60,
+                                        page_link='https://www.globalapptesting.com/about/careers/')
+
+    assert clean_links['internal_links'] == Counter({'https://www.globalapptesting.com/about/pricing': 1,
+                                                     'https://www.globalapptesting.com/about/careers/team': 1})
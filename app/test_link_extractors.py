@@ -0,0 +1,115 @@
+import os
+import pytest
+from typing import Callable
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.link_extractors import get_link_extractor, StreamingLinkExtractor, BeautifulSoupLinkExtractor
+from app.local_server import SyntheticSite
+
+
+EDGE_CASES_PAGE = '''<html><!-- <a href="/commented">x</a> --><script>var s = '<a href="/script">';</script>
+<A HREF="/upper">u</A><a title="a > b" href='/single'>s</a><a href=/unquoted>q</a>
+<a href="/q?a=1&amp;b=2">e</a><a name="no-href">n</a><a href="">empty</a><a
+href="/newline">n</a><abbr href="/abbr">no</abbr><style>a[href="<a href='/style'>"]{}</style>
+<a data-x='href="/fake"' href="/real">r</a></html>'''
+
+
+def available_extractors() -> list:
+    extractors = ['streaming', 'beautifulsoup']
+    try:
+        get_link_extractor('lxml')
+        extractors.append('lxml')
+    except ImportError:
+        pass
+    return extractors
+
+
+def fixture_pages(build_path: Callable[[], str]) -> list:
+    '''Return the html pages from the test data directory and a few synthetic pages'''
+    pages = []
+    test_data_directory = os.path.dirname(build_path('global_test_app.html'))
+    for file_name in sorted(os.listdir(test_data_directory)):
+        if file_name.endswith('.html'):
+            with open(os.path.join(test_data_directory, file_name), mode='r', encoding='utf8') as fhandle:
+                pages.append(fhandle.read())
+    pages += [page.decode('utf8')
+              for page in SyntheticSite(page_count=5).pages.values()]
+    return pages + [EDGE_CASES_PAGE]
+
+
+def test_get_link_extractor_unknown_name():
+    '''
+    Test the exception when the link extractor does not exist.
+    '''
+
+    with pytest.raises(ValueError):
+        get_link_extractor('regex')
+
+
+@pytest.mark.parametrize('name', available_extractors())
+def test_extractors_equivalence(name: str, build_path: Callable[[], str]):
+    '''
+    Every backend extracts the same hrefs as the BeautifulSoup reference.
+    '''
+
+    reference = BeautifulSoupLinkExtractor()
+    extractor = get_link_extractor(name)
+    for page in fixture_pages(build_path):
+        assert reference.extract(page) == extractor.extract(page)
+
+
+@pytest.mark.parametrize('name', available_extractors())
+def test_extractors_empty_page(name: str):
+    '''
+    An empty page has no links.
+    '''
+
+    assert get_link_extractor(name).extract('') == []
+
+
+def test_streaming_extractor_edge_cases():
+    '''
+    Links inside comments, scripts and styles are ignored, entities are decoded.
+    '''
+
+    hrefs = StreamingLinkExtractor().extract(EDGE_CASES_PAGE)
+    assert hrefs == ['/upper', '/single', '/unquoted',
+                     '/q?a=1&b=2', '', '/newline', '/real']
+
+
+def test_streaming_extractor_file_object(build_path: Callable[[], str]):
+    '''
+    The streaming extractor accepts file objects, like BeautifulSoup.
+    '''
+
+    with open(file=build_path('global_test_app', 'html'), mode='r', encoding='utf8') as fhandle:
+        hrefs = StreamingLinkExtractor().extract(fhandle)
+
+    assert len(hrefs) == 167
+    assert hrefs[-1] == 'https://go.globalapptesting.com/speak-to-us'
+
+
+def test_extract_hrefs_from_href_values(web_parser: WebpageParser, build_path: Callable[[], str]):
+    '''
+    extract_hrefs gives the same result for href values and for <a> tags.
+    '''
+
+    with open(file=build_path('global_test_app', 'html'), mode='r', encoding='utf8') as fhandle:
+        web_page = fhandle.read()
+
+    expected_hrefs = web_parser.extract_hrefs(
+        links=web_parser.get_links_from_web_page(web_page))
+    obtained_hrefs = web_parser.extract_hrefs(
+        links=web_parser.get_hrefs_from_web_page(web_page))
+
+    assert expected_hrefs == obtained_hrefs
+
+
+def test_web_parser_link_extractor_option():
+    '''
+    The backend is chosen at the parser construction.
+    '''
+
+    parser = WebpageParser('https://www.globalapptesting.com/',
+                           FileManager(), link_extractor='beautifulsoup')
+    assert isinstance(parser.link_extractor, BeautifulSoupLinkExtractor)
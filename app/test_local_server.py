@@ -0,0 +1,60 @@
+import pytest
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.local_server import LocalServer, SyntheticSite
+from app.webpage_parser import WebpageParser
+
+
+def crawl(server: LocalServer) -> tuple:
+    parser = WebpageParser(server.root_link, FileManager())
+    parser.build_dict_map()
+    graph = Graph(parser.convert_counters_to_graph_edges(), FileManager())
+    return parser, graph, parser.url_canonicalizer.canonicalize(server.root_link)
+
+
+@pytest.mark.parametrize('cycles', [True, False])
+def test_site_depth(cycles: bool):
+    '''
+    Every page is reachable and the pages of the last level are depth clicks from the home page.
+    '''
+
+    with LocalServer(SyntheticSite(page_count=60, fan_out=3, depth=4, cycles=cycles)) as server:
+        parser, graph, root_node = crawl(server)
+
+    assert len(parser.get_map_dict()) == 60
+    assert graph.get_eccentricity(root_node) == 4
+    if not cycles:
+        # the links only go one level deeper
+        assert graph.get_longest_path() == 4
+
+
+def test_site_without_cycles():
+    '''
+    Without cycles every link goes to a following page, so there is no link back to the home page.
+    '''
+
+    with LocalServer(SyntheticSite(page_count=30, fan_out=3, cycles=False)) as server:
+        parser, graph, root_node = crawl(server)
+
+    assert len(parser.get_map_dict()) == 30
+    assert graph.count_incoming_edges()[root_node] == 0
+    assert graph.get_longest_path() == 29
+
+
+def test_error_rate():
+    site = SyntheticSite(page_count=41, fan_out=3)
+    with LocalServer(site, error_rate=0.25, seed=1) as server:
+        parser, _, _ = crawl(server)
+    with LocalServer(site, error_rate=0.25, seed=1) as other_server:
+        assert other_server.error_paths == server.error_paths
+
+    statuses = [page['HTTP_STATUS'] for page in parser.get_map_dict().values()]
+    assert len(server.error_paths) == 10
+    assert statuses.count(500) == 10
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SyntheticSite(page_count=5, depth=5)
+    with pytest.raises(ValueError):
+        LocalServer(SyntheticSite(page_count=5), error_rate=1.5)
@@ -0,0 +1,86 @@
+import random
+import networkx as nx
+from app.compact_graph import CompactGraph
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.path_engine import PathEngine
+
+
+def build_path_engine(adj_list_graph: dict) -> PathEngine:
+    return PathEngine(CompactGraph.from_adj_list_graph(adj_list_graph))
+
+
+def test_components_match_networkx():
+    '''
+    The components and the longest path of the condensation match networkx on random graphs.
+    '''
+
+    rand = random.Random(0)
+    for _ in range(20):
+        nodes = [f'/page/{i}' for i in range(40)]
+        adj_list_graph = {node: [[node, rand.choice(nodes), 1] for _ in range(rand.randint(0, 2))]
+                          for node in nodes}
+        path_engine = build_path_engine(adj_list_graph)
+        components = path_engine.get_components().tolist()
+
+        nx_graph = nx.DiGraph()
+        nx_graph.add_nodes_from(nodes)
+        nx_graph.add_edges_from((source, destination)
+                                for edges in adj_list_graph.values() for source, destination, _ in edges)
+        expected_components = {frozenset(component)
+                               for component in nx.strongly_connected_components(nx_graph)}
+        obtained_components = {}
+        for node, component in zip(path_engine.compact_graph.nodes, components):
+            obtained_components.setdefault(component, set()).add(node)
+
+        assert {frozenset(component) for component in obtained_components.values()} == expected_components
+        assert path_engine.get_longest_path() == nx.dag_longest_path_length(
+            nx.condensation(nx_graph))
+
+
+def test_longest_path_does_not_depend_on_the_order_of_the_cycles():
+    adj_list_graph = {'/': [['/', '/', 1], ['/', '/a', 1]],
+                      '/a': [['/a', '/b', 1], ['/a', '/', 1]],
+                      '/b': [['/b', '/c', 1]],
+                      '/c': [['/c', '/b', 1], ['/c', '/d', 1]],
+                      '/d': []}
+    reversed_adj_list_graph = dict(reversed(list(adj_list_graph.items())))
+
+    # {/, /a} -> {/b, /c} -> {/d}
+    assert build_path_engine(adj_list_graph).get_longest_path() == 2
+    assert build_path_engine(reversed_adj_list_graph).get_longest_path() == 2
+
+
+def test_eccentricity(file_manager: FileManager):
+    adj_list_graph = {'/': [['/', '/a', 1], ['/', '/b', 1]],
+                      '/a': [['/a', '/c', 1]],
+                      '/b': [['/b', '/c', 1], ['/b', '/', 1]],
+                      '/c': [['/c', '/d', 1]],
+                      '/d': [['/d', '/', 1]]}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    assert graph.get_eccentricity('/') == 3
+    assert graph.get_eccentricity('/a') == 4
+
+
+def test_deep_chain_stress(file_manager: FileManager):
+    '''
+    Long chains and a long cycle do not hit the recursion limit.
+    '''
+
+    chain_length = 200_000
+    adj_list_graph = {f'/page/{i}': [[f'/page/{i}', f'/page/{i + 1}', 1]]
+                      for i in range(chain_length)}
+    adj_list_graph[f'/page/{chain_length}'] = []
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    assert graph.get_longest_path() == chain_length
+    assert graph.get_eccentricity('/page/0') == chain_length
+
+    # close the chain into one cycle
+    adj_list_graph[f'/page/{chain_length}'] = [
+        [f'/page/{chain_length}', '/page/0', 1]]
+    graph.invalidate_cache()
+    assert graph.get_longest_path() == 0
+    assert graph.get_path_engine().component_count == 1
+    assert graph.get_eccentricity('/page/0') == chain_length
@@ -0,0 +1,103 @@
+import pytest
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.pipeline_crawler import PipelineCrawler
+from app.local_server import LocalServer
+from app.response_cache import ResponseCache
+
+
+@pytest.mark.parametrize('argument', ['fetch_concurrency', 'parse_workers', 'batch_size', 'max_pending_pages'])
+def test_pipeline_crawler_invalid_arguments(web_parser: WebpageParser, argument: str):
+    '''
+    Test the exception when a pool size or a limit is not positive.
+    '''
+
+    with pytest.raises(ValueError):
+        PipelineCrawler(webpage_parser=web_parser, **{argument: -1})
+
+
+def test_build_dict_map_with_parse_workers(local_server: LocalServer):
+    '''
+    The pipeline crawl must produce the same map_dict as the iterative one.
+    '''
+
+    iterative_parser = WebpageParser(local_server.root_link, FileManager())
+    expected_map = iterative_parser.build_dict_map()
+
+    pipeline_parser = WebpageParser(local_server.root_link, FileManager())
+    obtained_map = pipeline_parser.build_dict_map(
+        concurrency=4, parse_workers=2, batch_size=3)
+
+    assert expected_map == obtained_map
+
+
+def test_parse_workers_keep_the_link_classification(local_server: LocalServer):
+    '''
+    The parser processes classify the links with the file extensions of the crawling parser.
+    '''
+
+    serial_parser = WebpageParser(local_server.root_link, FileManager(),
+                                  file_extensions=('.png',))
+    expected_map = serial_parser.build_dict_map()
+
+    pipeline_parser = WebpageParser(local_server.root_link, FileManager(),
+                                    file_extensions=('.png',))
+    obtained_map = pipeline_parser.build_dict_map(
+        concurrency=4, parse_workers=2, batch_size=3)
+
+    assert expected_map == obtained_map
+    # the .pdf link of every page is not a file link with these extensions
+    assert not any(page['file_links'] for page in obtained_map.values())
+
+
+def test_pipeline_crawler_backpressure(local_server: LocalServer):
+    '''
+    The number of fetched pages held in memory never goes over max_pending_pages.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    crawler = PipelineCrawler(webpage_parser=parser, fetch_concurrency=8,
+                              parse_workers=2, batch_size=2, max_pending_pages=3)
+    obtained_map = crawler.crawl(local_server.root_link)
+
+    assert len(obtained_map) == 30
+    assert 0 < crawler.max_pending_pages_seen <= 3
+
+
+def test_pipeline_crawler_propagates_errors(local_server: LocalServer, monkeypatch):
+    '''
+    An exception raised while fetching stops the crawl and is raised to the caller.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+
+    def failing_request(url: str = '') -> tuple:
+        raise ConnectionError(f'Could not connect to {url}')
+
+    monkeypatch.setattr(parser, 'fetch_web_page', failing_request)
+    with pytest.raises(ConnectionError):
+        parser.build_dict_map(parse_workers=1)
+
+
+def test_pipeline_recrawl_revalidates_with_conditional_requests(tmp_path, local_server: LocalServer):
+    '''
+    The pipeline stores the parsed pages in the response cache, the second crawl gets
+    304 Not Modified for every page and reuses the stored parse results.
+    '''
+
+    first_parser = WebpageParser(local_server.root_link, FileManager(),
+                                 response_cache=ResponseCache(directory=str(tmp_path)))
+    expected_map = first_parser.build_dict_map(parse_workers=1)
+    first_parser.response_cache.flush()
+    assert first_parser.response_cache.get_cache_statistics()['entries'] == 30
+    not_modified_count = local_server.not_modified_count
+
+    second_parser = WebpageParser(local_server.root_link, FileManager(),
+                                  response_cache=ResponseCache(directory=str(tmp_path)))
+    obtained_map = second_parser.build_dict_map(parse_workers=1)
+    cache_statistics = second_parser.response_cache.get_cache_statistics()
+
+    assert expected_map == obtained_map
+    assert cache_statistics['misses'] == 0
+    assert cache_statistics['hits'] == local_server.not_modified_count - \
+        not_modified_count == 30
@@ -0,0 +1,120 @@
+import time
+import pytest
+from email.utils import formatdate
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.politeness import TokenBucket, PolitenessScheduler, HostFrontier, parse_retry_after, DISALLOWED_STATUS
+from app.webpage_parser import WebpageParser
+
+
+def test_token_bucket_spaces_the_requests():
+    bucket = TokenBucket(rate=10, burst=1)
+    now = bucket.updated_at
+
+    send_times = [bucket.reserve(now) - now for _ in range(4)]
+
+    assert send_times == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_parse_retry_after():
+    now = time.time()
+
+    assert parse_retry_after('2') == 2.0
+    assert parse_retry_after('0.5') == 0.5
+    assert parse_retry_after(formatdate(now + 30, usegmt=True), now=now) == pytest.approx(30, abs=1)
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_host_frontier_takes_the_ready_host_first():
+    '''
+    The links of a host that has to wait are taken after the links of the other hosts.
+    '''
+
+    scheduler = PolitenessScheduler(requests_per_second=1, respect_robots=False)
+    scheduler.wait_for_slot('http://slow.test/')
+    frontier = HostFrontier(scheduler, ['http://slow.test/a', 'http://slow.test/b',
+                                        'http://fast.test/a', 'http://fast.test/b'])
+
+    assert list(frontier) == ['http://slow.test/a', 'http://slow.test/b',
+                              'http://fast.test/a', 'http://fast.test/b']
+    assert [frontier.popleft() for _ in range(4)] == ['http://fast.test/a', 'http://fast.test/b',
+                                                      'http://slow.test/a', 'http://slow.test/b']
+    assert len(frontier) == 0
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+
+def test_crawl_stays_within_the_allowed_rate():
+    '''
+    A concurrent crawl at half the server limit is never throttled and does not go over its rate.
+    '''
+
+    with LocalServer(SyntheticSite(page_count=30, fan_out=3), rate_limit=80) as server:
+        scheduler = PolitenessScheduler(requests_per_second=40)
+        parser = WebpageParser(server.root_link, FileManager(), scheduler=scheduler)
+        map_dict = parser.build_dict_map(concurrency=4)
+        parser.close()
+
+    assert len(map_dict) == 30
+    assert server.rate_limited_count == 0
+    statistics = scheduler.get_host_statistics()[server.root_link.split('//')[1]]
+    # the pages and the robots.txt
+    assert statistics['requests'] == 31
+    assert statistics['throttled'] == 0
+    assert statistics['achieved_rate'] <= statistics['allowed_rate'] * 1.05
+
+
+def test_throttled_requests_are_retried_after_retry_after():
+    '''
+    Without the scheduler the server throttles the crawl, with it every page is crawled.
+    '''
+
+    site = SyntheticSite(page_count=30, fan_out=3)
+    with LocalServer(site, rate_limit=20) as server:
+        parser = WebpageParser(server.root_link, FileManager())
+        map_dict = parser.build_dict_map(concurrency=4)
+        parser.close()
+    assert server.rate_limited_count > 0
+    assert 429 in [page['HTTP_STATUS'] for page in map_dict.values()]
+
+    with LocalServer(site, rate_limit=20, retry_after='0.05') as server:
+        scheduler = PolitenessScheduler(requests_per_second=100, max_retries=10)
+        parser = WebpageParser(server.root_link, FileManager(), scheduler=scheduler)
+        map_dict = parser.build_dict_map(concurrency=4)
+        parser.close()
+
+    assert len(map_dict) == 30
+    assert {page['HTTP_STATUS'] for page in map_dict.values()} == {200}
+    statistics = scheduler.get_host_statistics()[server.root_link.split('//')[1]]
+    assert statistics['throttled'] == server.rate_limited_count > 0
+
+
+def test_robots_txt_is_cached_and_respected():
+    robots_txt = 'User-agent: *\nDisallow: /page/1\nRequest-rate: 50/1\n'
+    with LocalServer(SyntheticSite(page_count=30, fan_out=3), robots_txt=robots_txt) as server:
+        scheduler = PolitenessScheduler(requests_per_second=100)
+        parser = WebpageParser(server.root_link, FileManager(), scheduler=scheduler)
+        map_dict = parser.build_dict_map()
+        parser.close()
+
+    assert server.requested_paths.count('/robots.txt') == 1
+    assert not [path for path in server.requested_paths if path.startswith('/page/1')]
+    for link, page in map_dict.items():
+        disallowed = link.startswith(f'{server.root_link}/page/1')
+        assert (page['HTTP_STATUS'] == DISALLOWED_STATUS) == disallowed
+    statistics = scheduler.get_host_statistics()[server.root_link.split('//')[1]]
+    assert statistics['allowed_rate'] == 50
+    assert statistics['disallowed'] > 0
+
+
+def test_crawl_delay_lowers_the_allowed_rate():
+    with LocalServer(SyntheticSite(page_count=1), robots_txt='User-agent: *\nCrawl-delay: 2\n') as server:
+        scheduler = PolitenessScheduler(requests_per_second=10)
+        parser = WebpageParser(server.root_link, FileManager())
+        assert scheduler.can_fetch(parser.get_session(), f'{server.root_link}/')
+        parser.close()
+
+    assert scheduler.get_host_statistics()[server.root_link.split('//')[1]]['allowed_rate'] == 0.5
@@ -0,0 +1,148 @@
+import pytest
+from collections import Counter
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.response_cache import ResponseCache
+from app.local_server import LocalServer
+from app.helpers import get_webpage_statistics
+
+
+@pytest.fixture
+def page() -> dict:
+    return {'internal_links': Counter({'https://www.globalapptesting.com/product': 7}),
+            'external_links': Counter({'https://testathon.co/': 2}),
+            'dead_links': Counter(), 'phone_links': Counter(), 'email_links': Counter(), 'file_links': Counter(),
+            'HTTP_STATUS': 200, 'page_size_bytes': 100}
+
+
+def test_response_cache_invalid_max_bytes(tmp_path):
+    '''
+    Test the exception when the cache size is not positive.
+    '''
+
+    with pytest.raises(ValueError):
+        ResponseCache(directory=str(tmp_path), max_bytes=0)
+
+
+def test_normalize_url():
+    '''
+    Equivalent urls are normalized to the same key.
+    '''
+
+    expected_url = 'https://www.globalapptesting.com/product'
+    assert ResponseCache.normalize_url(
+        'HTTPS://WWW.GlobalAppTesting.com/product/#section') == expected_url
+    assert ResponseCache.normalize_url(
+        'https://www.globalapptesting.com') == 'https://www.globalapptesting.com/'
+
+
+def test_put_and_get(tmp_path, page: dict):
+    '''
+    The stored entry is returned with Counter objects and survives a reload from disk.
+    '''
+
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.put('https://www.globalapptesting.com/', body='<html></html>',
+              etag='"abc"', last_modified=None, page=page)
+
+    entry = cache.get('https://www.globalapptesting.com')
+    assert entry['body'] == '<html></html>'
+    assert entry['page'] == page
+    assert isinstance(entry['page']['internal_links'], Counter)
+    assert cache.conditional_headers('https://www.globalapptesting.com/') == {
+        'If-None-Match': '"abc"'}
+
+    cache.flush()
+    reloaded_cache = ResponseCache(directory=str(tmp_path))
+    assert len(reloaded_cache) == 1
+    assert reloaded_cache.get('https://www.globalapptesting.com/')[
+        'page'] == page
+
+
+def test_put_without_validators_is_skipped(tmp_path, page: dict):
+    '''
+    Responses without ETag and Last-Modified cannot be revalidated, so they are not stored.
+    '''
+
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.put('https://www.globalapptesting.com/', body='<html></html>',
+              etag=None, last_modified=None, page=page)
+
+    assert cache.get('https://www.globalapptesting.com/') is None
+    assert cache.conditional_headers('https://www.globalapptesting.com/') == {}
+
+
+def test_lru_eviction(tmp_path, page: dict):
+    '''
+    The least recently used entries are evicted when the cache is full.
+    '''
+
+    cache = ResponseCache(directory=str(tmp_path), max_bytes=1500)
+    body = 'x' * 400
+    cache.put('https://www.globalapptesting.com/a', body, '"a"', None, page)
+    cache.put('https://www.globalapptesting.com/b', body, '"b"', None, page)
+    # touch the first entry so the second one becomes the least recently used
+    cache.get('https://www.globalapptesting.com/a')
+    cache.put('https://www.globalapptesting.com/c', body, '"c"', None, page)
+
+    assert cache.total_bytes <= 1500
+    assert cache.get('https://www.globalapptesting.com/a') is not None
+    assert cache.get('https://www.globalapptesting.com/b') is None
+    assert cache.get('https://www.globalapptesting.com/c') is not None
+
+
+def test_recrawl_revalidates_with_conditional_requests(tmp_path, local_server: LocalServer):
+    '''
+    The second crawl gets 304 Not Modified for every page and reuses the stored parse results.
+    '''
+
+    first_parser = WebpageParser(local_server.root_link, FileManager(),
+                                 response_cache=ResponseCache(directory=str(tmp_path)))
+    expected_map = first_parser.build_dict_map()
+    first_parser.response_cache.flush()
+    not_modified_count = local_server.not_modified_count
+
+    second_parser = WebpageParser(local_server.root_link, FileManager(),
+                                  response_cache=ResponseCache(directory=str(tmp_path)))
+    obtained_map = second_parser.build_dict_map()
+    cache_statistics = second_parser.response_cache.get_cache_statistics()
+
+    assert expected_map == obtained_map
+    assert cache_statistics['misses'] == 0
+    assert cache_statistics['hits'] == local_server.not_modified_count - \
+        not_modified_count
+    assert cache_statistics['bytes_saved'] > 0
+
+
+def test_changed_page_is_parsed_again(tmp_path, local_server: LocalServer):
+    '''
+    A page whose body changed gets a new ETag, so it is downloaded and parsed again.
+    '''
+
+    parser = WebpageParser(local_server.root_link, FileManager(),
+                           response_cache=ResponseCache(directory=str(tmp_path)))
+    parser.crawl_page(local_server.root_link + '/page/1')
+
+    local_server.site.pages['/page/1'] = b'<html><body><a href="tel:+123">Call</a></body></html>'
+    clean_links = parser.crawl_page(local_server.root_link + '/page/1')
+
+    assert clean_links['phone_links'] == Counter({'tel:+123': 1})
+    assert parser.response_cache.get_cache_statistics()['misses'] == 2
+
+
+def test_get_webpage_statistics_with_cache(tmp_path, root_link: str, web_parser_without_root: WebpageParser, build_path, initialized_graph):
+    '''
+    The statistics contain the cache report when the parser has a response cache.
+    '''
+
+    web_parser_without_root.response_cache = ResponseCache(
+        directory=str(tmp_path))
+    web_parser_without_root.response_cache.record_hit(100)
+    web_parser_without_root.load_map_dict_from_json(
+        file_name=build_path('test_map_dict_full'))
+
+    obtained_statistic = get_webpage_statistics(
+        root_link=root_link, webpage_parser=web_parser_without_root, graph=initialized_graph)
+
+    assert 'HTTP cache hits:                           1\n' in obtained_statistic
+    assert 'HTTP cache bytes saved:                    100\n' in obtained_statistic
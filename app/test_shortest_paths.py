@@ -0,0 +1,80 @@
+import random
+import pytest
+import networkx as nx
+from app.compact_graph import CompactGraph
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.shortest_paths import ShortestPaths
+
+
+@pytest.fixture
+def adj_list_graph() -> dict:
+    return {'/': [['/', '/a', 1], ['/', '/b', 5]],
+            '/a': [['/a', '/c', 1], ['/a', '/', 1]],
+            '/b': [['/b', '/d', 1]],
+            '/c': [['/c', '/d', 1]],
+            '/d': [['/d', '/', 1]],
+            '/e': [['/e', '/', 1]]}
+
+
+def test_distances_and_paths(adj_list_graph: dict, file_manager: FileManager):
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+
+    assert graph.get_distances('/') == {
+        '/': 0, '/a': 1, '/b': 1, '/c': 2, '/d': 2, '/e': None}
+    assert graph.get_distances('/', ['/d', '/e']) == {'/d': 2, '/e': None}
+    assert graph.get_shortest_path('/', '/d') == ['/', '/b', '/d']
+    assert graph.get_shortest_path('/', '/e') == []
+
+    # the link to /b has weight 5
+    assert graph.get_distances('/', ['/d'], weighted=True) == {'/d': 3}
+    assert graph.get_shortest_path('/', '/d', weighted=True) == [
+        '/', '/a', '/c', '/d']
+
+
+def test_distance_table_is_cached(adj_list_graph: dict):
+    shortest_paths = ShortestPaths(CompactGraph.from_adj_list_graph(
+        adj_list_graph), max_cached_tables=2)
+
+    table = shortest_paths.get_table(0)
+    assert shortest_paths.get_table(0) is table
+    assert shortest_paths.get_table(0, weighted=True) is not table
+
+    shortest_paths.get_table(1)
+    assert (0, False) not in shortest_paths.tables
+    assert len(shortest_paths.tables) == 2
+
+    with pytest.raises(ValueError):
+        ShortestPaths(shortest_paths.compact_graph, max_cached_tables=0)
+
+
+def test_bidirectional_matches_bfs():
+    '''
+    The bidirectional search finds paths as short as the BFS table on random graphs.
+    '''
+
+    rand = random.Random(0)
+    nodes = [f'/page/{i}' for i in range(200)]
+    adj_list_graph = {node: [[node, rand.choice(nodes), 1] for _ in range(rand.randint(0, 3))]
+                      for node in nodes}
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=FileManager())
+    nx_graph = nx.DiGraph([(source, destination)
+                           for edges in adj_list_graph.values() for source, destination, _ in edges])
+
+    for _ in range(100):
+        source, target = rand.choice(nodes), rand.choice(nodes)
+        path = graph.get_shortest_path(source, target, bidirectional=True)
+        distance = graph.get_distances(source, [target])[target]
+        if distance is None:
+            assert path == []
+            continue
+        assert len(path) == distance + 1
+        assert path[0] == source and path[-1] == target
+        assert all(nx_graph.has_edge(path[i], path[i + 1])
+                   for i in range(len(path) - 1))
+
+
+def test_bidirectional_weighted_raises_value_error(adj_list_graph: dict, file_manager: FileManager):
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=file_manager)
+    with pytest.raises(ValueError):
+        graph.get_shortest_path('/', '/d', weighted=True, bidirectional=True)
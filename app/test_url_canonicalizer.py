@@ -0,0 +1,115 @@
+import pytest
+from collections import Counter
+from app.url_canonicalizer import UrlCanonicalizer, DedupIndex, normalize_percent_encoding
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.local_server import LocalServer
+from app.helpers import get_webpage_statistics
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.x.com', 'https://www.x.com/'),
+    ('https://www.x.com/', 'https://www.x.com/'),
+    ('https://www.x.com/product/', 'https://www.x.com/product'),
+    ('https://www.x.com/product#pricing', 'https://www.x.com/product'),
+    ('https://www.x.com/?utm_source=google&utm_medium=cpc', 'https://www.x.com/'),
+    ('https://www.x.com/search?q=test&gclid=123', 'https://www.x.com/search?q=test'),
+    ('https://www.x.com/search?b=2&a=1&a=0', 'https://www.x.com/search?a=1&a=0&b=2'),
+    ('HTTPS://WWW.X.COM/Product', 'https://www.x.com/Product'),
+    ('https://www.x.com:443/product', 'https://www.x.com/product'),
+    ('http://www.x.com:80/product', 'http://www.x.com/product'),
+    ('http://www.x.com:8080/product', 'http://www.x.com:8080/product'),
+    ('https://www.x.com/%7euser/caf%c3%a9', 'https://www.x.com/~user/caf%C3%A9'),
+])
+def test_canonicalize(url: str, expected: str):
+    '''
+    Check each canonicalization rule with the default configuration.
+    '''
+
+    assert UrlCanonicalizer().canonicalize(url) == expected
+
+
+def test_canonicalize_rules_can_be_disabled():
+    '''
+    Each rule can be turned off and the path can be lower cased.
+    '''
+
+    canonicalizer = UrlCanonicalizer(strip_trailing_slash=False, strip_fragment=False,
+                                     strip_tracking_parameters=False, sort_query_parameters=False,
+                                     strip_default_port=False, normalize_percent_encoding=False,
+                                     lowercase_host=False)
+    url = 'https://WWW.x.com:443/%7e/?utm_source=a&b=1&a=2#top'
+    assert canonicalizer.canonicalize(url) == url
+
+    assert UrlCanonicalizer(lowercase_path=True).canonicalize(
+        'https://www.x.com/Product') == 'https://www.x.com/product'
+
+
+def test_normalize_percent_encoding():
+    '''
+    Only the unreserved characters are decoded.
+    '''
+
+    assert normalize_percent_encoding('/a%2fb%41%2D') == '/a%2FbA-'
+
+
+def test_dedup_index():
+    '''
+    The urls of the same page are added once and the saved duplicates are counted.
+    '''
+
+    dedup_index = DedupIndex()
+
+    assert dedup_index.add('https://www.x.com/') == 'https://www.x.com/'
+    assert dedup_index.add('https://www.x.com') is None
+    assert dedup_index.add('https://www.x.com/#top') is None
+    # the same raw url again is not a saved duplicate, it would not be fetched twice anyway
+    assert dedup_index.add('https://www.x.com/#top') is None
+    assert dedup_index.add('https://www.x.com/product') == 'https://www.x.com/product'
+
+    assert 'https://WWW.X.COM/product/' in dedup_index
+    assert len(dedup_index) == 2
+    assert dedup_index.get_dedup_statistics() == {
+        'unique_urls': 2, 'duplicates_saved': 2}
+
+
+def test_convert_counters_merges_duplicate_destinations(web_parser_without_root: WebpageParser):
+    '''
+    The graph edges use canonical urls and the weights of the same page are summed.
+    '''
+
+    web_parser_without_root.map_dict = {
+        'https://www.x.com': {'internal_links': Counter({'https://www.x.com/a': 2, 'https://www.x.com/a/': 1,
+                                                         'https://www.x.com/a?utm_source=x': 1})},
+        'https://www.x.com/a': {'internal_links': Counter()}}
+
+    adj_list_graph = web_parser_without_root.convert_counters_to_graph_edges()
+
+    assert adj_list_graph == {'https://www.x.com/': [('https://www.x.com/', 'https://www.x.com/a', 4)],
+                              'https://www.x.com/a': []}
+
+
+def test_crawl_does_not_fetch_duplicates(local_server: LocalServer):
+    '''
+    Every page is fetched once and the statistics report the saved fetches.
+    '''
+
+    local_server.site.pages['/'] = b'<a href="/page/1">1</a><a href="/page/1/">1</a><a href="/page/1#top">1</a>' + \
+        b'<a href="/page/1?utm_source=mail">1</a><a href="/">home</a>'
+    local_server.site.pages['/page/1'] = b'<a href="/">home</a>'
+
+    parser = WebpageParser(local_server.root_link, FileManager())
+    map_dict = parser.build_dict_map()
+
+    assert list(map_dict) == [local_server.root_link +
+                              '/', local_server.root_link + '/page/1']
+    assert local_server.requests_count == 2
+    # '/page/1/', '/page/1#top', '/page/1?utm_source=mail' and '/' (the root link without slash was queued)
+    assert parser.dedup_index.duplicates_saved == 4
+
+    graph = Graph(adj_list_graph=parser.convert_counters_to_graph_edges(),
+                  file_manager=FileManager())
+    statistic_info = get_webpage_statistics(
+        root_link=local_server.root_link, webpage_parser=parser, graph=graph)
+    assert 'Duplicate fetches saved (canonical urls):  4\n' in statistic_info
@@ -2,6 +2,9 @@ import pytest
 import json
 from typing import Callable, Counter
 from app.webpage_parser import WebpageParser, ArgumentNotProvided
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.response_cache import ResponseCache
 
 
 def test_get_links_from_web_page_no_url(web_parser: WebpageParser):
@@ -121,35 +124,26 @@ def test_extract_links_from_counter(web_parser: WebpageParser, build_path: Calla
         assert extracted_internal_links == local_links_extraction
 
 
-'''
-This test is commented because the current
-implementation will query the real website
-and it takes too much time to finish.
-'''
-# def test_build_dict_map(web_parser: WebpageParser):
-#     '''
-#     Test the correct generation of dict map.
-#     '''
-
-#     actual_obj_map = web_parser.build_dict_map()
+def test_build_dict_map(local_server: LocalServer):
+    '''
+    Test the correct generation of dict map, on the local synthetic website.
+    '''
 
-#     response = web_parser.perform_get_request(url=root_link)
-#     links = web_parser.get_links_from_web_page(web_page=response)
-#     hrefs = web_parser.extract_hrefs(links=links, root=root_link)
-#     extracted_internal_links = web_parser.extract_links_from_counter(
-#         hrefs['internal_links'])
+    web_parser = WebpageParser(local_server.root_link, FileManager())
+    actual_obj_map = web_parser.build_dict_map()
 
-#     expected_map = {root_link: hrefs}
-#     for url in extracted_internal_links:
-#         response = web_parser.perform_get_request(url=root_link)
-#         page_links = web_parser.get_links_from_web_page(web_page=response)
-#         counter_links = web_parser.extract_hrefs(links=page_links, root=url)
-#         expected_map[url] = counter_links
+    expected_map = {}
+    for path, body in local_server.site.pages.items():
+        url = local_server.root_link + path
+        links = web_parser.get_links_from_web_page(web_page=body.decode('utf8'))
+        expected_map[web_parser.url_canonicalizer.canonicalize(url)] = web_parser.extract_hrefs(links=links)
 
-#     assert type(expected_map) == type(actual_obj_map)
-#     for (key_map, value_map), (key_obj_map, value_obj_map) in zip(expected_map[root_link].items(), actual_obj_map[root_link].items()):
-#         assert key_map == key_obj_map
-#         assert value_map == value_obj_map
+    assert len(actual_obj_map) == len(expected_map)
+    for link, page in actual_obj_map.items():
+        expected_page = expected_map[web_parser.url_canonicalizer.canonicalize(link)]
+        assert page['HTTP_STATUS'] == 200
+        for category, counter in expected_page.items():
+            assert page[category] == counter
 
 
 def test_convert_counters_to_graph_edges_tuples(web_parser_without_root: WebpageParser, temp_map_dict: dict, graph_edges: list):
@@ -225,3 +219,66 @@ def test_get_link_status_code(web_parser_without_root: WebpageParser,  temp_map_
     obtained_status_code = web_parser_without_root.get_link_status_code(
         'https://www.globalapptesting.com/')
     assert 200 == obtained_status_code
+
+
+def test_build_dict_map_streams_pages_to_jsonl(local_server: LocalServer, tmp_path):
+    '''
+    Every crawled page is appended to the JSON Lines file and loads back to the same map_dict.
+    '''
+
+    file_name = str(tmp_path / 'map_dict')
+    parser = WebpageParser(local_server.root_link, FileManager())
+    map_dict = parser.build_dict_map(concurrency=4, output_file=file_name)
+    assert parser.page_writer is None
+
+    loading_parser = WebpageParser(local_server.root_link, FileManager())
+    loaded_map_dict = loading_parser.load_map_dict_from_jsonl(file_name)
+    assert len(loaded_map_dict) == len(map_dict) == 30
+    assert loaded_map_dict == json.loads(json.dumps(map_dict))
+
+
+@pytest.mark.parametrize('crawl_options', [{}, {'recursive': True}, {'concurrency': 4}, {'parse_workers': 1}])
+def test_build_dict_map_queries_the_links_as_found(local_server: LocalServer, crawl_options: dict):
+    '''
+    The canonical url (without the trailing slash) is the key of the page, but the page
+    is queried as it was linked, here /docs is not served.
+    '''
+
+    local_server.site.pages = {'/': b'<a href="/docs/">docs</a>',
+                               '/docs/': b'<a href="/docs/setup">setup</a>',
+                               '/docs/setup': b'<a href="/">home</a>'}
+    root = local_server.root_link
+    parser = WebpageParser(root, FileManager())
+
+    map_dict = parser.build_dict_map(**crawl_options)
+
+    assert {link: page['HTTP_STATUS'] for link, page in map_dict.items()} == {
+        f'{root}/': 200, f'{root}/docs': 200, f'{root}/docs/setup': 200}
+    assert parser.crawled_at.keys() == map_dict.keys()
+    # the refreshed pages are queried as they were linked too
+    assert parser.refresh_map_dict()['changed'] == []
+
+
+@pytest.mark.parametrize('cached', [False, True])
+@pytest.mark.parametrize('crawl_options', [{}, {'recursive': True}, {'concurrency': 4}, {'parse_workers': 1}])
+def test_build_dict_map_resolves_relative_links_against_the_page_url(tmp_path, crawl_options: dict, cached: bool):
+    '''
+    The relative links are resolved against the url of the page after the redirects,
+    not against its canonical url (without the trailing slash).
+    '''
+
+    site = SyntheticSite(page_count=1)
+    site.pages = {'/': b'<a href="docs/">docs</a><a href="old/">old</a>',
+                  '/docs/': b'<a href="intro">intro</a>',
+                  '/docs/intro': b'<a href="../">home</a>',
+                  '/new/': b'<a href="page">page</a>',
+                  '/new/page': b''}
+    with LocalServer(site, redirects={'/old/': '/new/'}) as server:
+        root = server.root_link
+        response_cache = ResponseCache(directory=str(tmp_path)) if cached else None
+        map_dict = WebpageParser(root, FileManager(), response_cache=response_cache).build_dict_map(
+            **crawl_options)
+
+    assert {link: page['HTTP_STATUS'] for link, page in map_dict.items()} == {
+        f'{root}/': 200, f'{root}/docs': 200, f'{root}/docs/intro': 200,
+        f'{root}/old': 200, f'{root}/new/page': 200}
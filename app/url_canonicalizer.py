@@ -0,0 +1,171 @@
+import re
+from threading import Lock
+from urllib.parse import urlsplit, urlunsplit
+
+
+DEFAULT_TRACKING_PARAMETERS = ('utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+                               'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid',
+                               '_hsenc', '_hsmi', '__hstc', '__hssc', '__hsfp', 'hsctatracking')
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+PERCENT_ENCODING_PATTERN = re.compile(r'%[0-9a-fA-F]{2}')
+
+# characters that never need percent-encoding (RFC 3986 unreserved characters)
+UNRESERVED_CHARACTERS = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+# maximum number of memoized urls
+MAX_MEMOIZED_URLS = 100_000
+
+
+def normalize_percent_encoding(text: str) -> str:
+    '''
+    Decode the percent-encoded unreserved characters and upper case the other escapes:
+    '/%7Euser/%c3%a9' -> '/~user/%C3%A9'
+    '''
+
+    def replace(match: re.Match) -> str:
+        character = chr(int(match.group()[1:], 16))
+        return character if character in UNRESERVED_CHARACTERS else match.group().upper()
+
+    return PERCENT_ENCODING_PATTERN.sub(replace, text) if '%' in text else text
+
+
+class UrlCanonicalizer():
+    def __init__(self, strip_trailing_slash: bool = True, strip_fragment: bool = True,
+                 strip_tracking_parameters: bool = True, sort_query_parameters: bool = True,
+                 strip_default_port: bool = True, normalize_percent_encoding: bool = True,
+                 lowercase_host: bool = True, lowercase_path: bool = False,
+                 tracking_parameters: tuple = DEFAULT_TRACKING_PARAMETERS) -> None:
+        '''
+        Rewrite urls to a canonical form, so the urls of the same page are equal:
+
+        'HTTPS://WWW.GlobalAppTesting.com:443/product/?utm_source=x&b=2&a=1#pricing'
+        -> 'https://www.globalapptesting.com/product?a=1&b=2'
+
+        Every rule can be turned off, lowercase_path is off by default because
+        the paths are case sensitive on most servers.
+        '''
+
+        self.strip_trailing_slash: bool = strip_trailing_slash
+        self.strip_fragment: bool = strip_fragment
+        self.strip_tracking_parameters: bool = strip_tracking_parameters
+        self.sort_query_parameters: bool = sort_query_parameters
+        self.strip_default_port: bool = strip_default_port
+        self.normalize_percent_encoding: bool = normalize_percent_encoding
+        self.lowercase_host: bool = lowercase_host
+        self.lowercase_path: bool = lowercase_path
+        self.tracking_parameters: frozenset = frozenset(
+            parameter.lower() for parameter in tracking_parameters)
+        self.memo: dict = {}
+
+    def __str__(self) -> str:
+        return f'UrlCanonicalizer(memoized_urls={len(self.memo)})'
+
+    def canonicalize(self, url: str) -> str:
+        '''
+        Return the canonical form of the url.
+        '''
+
+        canonical_url = self.memo.get(url)
+        if canonical_url is None:
+            if len(self.memo) > MAX_MEMOIZED_URLS:
+                self.memo.clear()
+            canonical_url = self.memo[url] = self.__canonicalize(url)
+        return canonical_url
+
+    def __canonicalize(self, url: str) -> str:
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return url
+
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower() if self.lowercase_host else parts.netloc
+        if self.strip_default_port and scheme in DEFAULT_PORTS and netloc.endswith(f':{DEFAULT_PORTS[scheme]}'):
+            netloc = netloc[:-len(DEFAULT_PORTS[scheme]) - 1]
+
+        path = parts.path
+        if self.normalize_percent_encoding:
+            path = normalize_percent_encoding(path)
+        if self.lowercase_path:
+            path = path.lower()
+        if netloc and not path:
+            path = '/'
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        query = self.__canonicalize_query(parts.query)
+        fragment = '' if self.strip_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def __canonicalize_query(self, query: str) -> str:
+        if not query:
+            return ''
+
+        parameters = [parameter for parameter in query.split('&') if parameter]
+        if self.normalize_percent_encoding:
+            parameters = [normalize_percent_encoding(parameter)
+                          for parameter in parameters]
+        if self.strip_tracking_parameters:
+            parameters = [parameter for parameter in parameters
+                          if parameter.split('=', 1)[0].lower() not in self.tracking_parameters]
+        if self.sort_query_parameters:
+            # sort by name only, the order of the repeated parameters is kept
+            parameters.sort(key=lambda parameter: parameter.split('=', 1)[0])
+        return '&'.join(parameters)
+
+
+class DedupIndex():
+    def __init__(self, canonicalizer: UrlCanonicalizer = None) -> None:
+        '''
+        Set of canonical urls, used by the crawl modes to decide if a link was already queued.
+
+        duplicates_saved counts the distinct urls that were not queued because
+        another url of the same page (same canonical url) was queued before.
+        '''
+
+        self.canonicalizer: UrlCanonicalizer = canonicalizer or UrlCanonicalizer()
+        self.canonical_urls: set = set()
+        self.seen_urls: set = set()
+        self.duplicates_saved: int = 0
+        self.lock = Lock()
+
+    def __str__(self) -> str:
+        return f'DedupIndex(urls={len(self.canonical_urls)}, duplicates_saved={self.duplicates_saved})'
+
+    def __len__(self) -> int:
+        return len(self.canonical_urls)
+
+    def __contains__(self, url: str) -> bool:
+        return self.canonicalizer.canonicalize(url) in self.canonical_urls
+
+    def clear(self) -> None:
+        with self.lock:
+            self.canonical_urls.clear()
+            self.seen_urls.clear()
+            self.duplicates_saved = 0
+
+    def add(self, url: str) -> str:
+        '''
+        Add the url and return its canonical form if the page was not seen before,
+        otherwise return None.
+        '''
+
+        canonical_url = self.canonicalizer.canonicalize(url)
+        with self.lock:
+            if canonical_url not in self.canonical_urls:
+                self.canonical_urls.add(canonical_url)
+                self.seen_urls.add(url)
+                return canonical_url
+
+            if url not in self.seen_urls:
+                # compared as raw strings this url would have been queued again
+                self.seen_urls.add(url)
+                self.duplicates_saved += 1
+            return None
+
+    def get_dedup_statistics(self) -> dict:
+        return {'unique_urls': len(self.canonical_urls),
+                'duplicates_saved': self.duplicates_saved}
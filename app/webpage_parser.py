@@ -1,9 +1,28 @@
-from requests import get
+import os
+import time
+from contextlib import nullcontext
+from requests import Session
 from bs4 import BeautifulSoup
 from httplib2 import Response
 from collections import Counter
 from collections import deque
-from app.file_manager import FileManager
+from threading import Lock
+from app.file_manager import FileManager, JsonLinesWriter
+from app.async_crawler import AsyncCrawler
+from app.incremental_crawler import IncrementalCrawler
+from app.pipeline_crawler import PipelineCrawler
+from app.http_session import build_session
+from app.response_cache import ResponseCache
+from app.link_extractors import get_link_extractor
+from app.link_classifier import LinkClassifier, DEFAULT_FILE_EXTENSIONS
+from app.url_canonicalizer import UrlCanonicalizer, DedupIndex
+from app.crawl_checkpoint import CrawlCheckpoint
+from app.lazy_map_store import LazyMapStore
+from app.crawl_store import CrawlStore
+from app.politeness import PolitenessScheduler, HostFrontier, get_host
+from app.fetch_policy import FetchPolicy, FetchFailed
+from app.crawl_statistics import CrawlStatistics
+from app.crawl_profiler import CrawlProfiler, mark_headers_received
 
 
 class ArgumentNotProvided(ValueError):
@@ -11,7 +30,7 @@ class ArgumentNotProvided(ValueError):
 
 
 class WebpageParser():
-    def __init__(self, root_link: str, file_manager: FileManager) -> None:
+    def __init__(self, root_link: str, file_manager: FileManager, pool_connections: int = 10, pool_maxsize: int = 10, response_cache: ResponseCache = None, link_extractor: str = 'streaming', file_extensions: tuple = DEFAULT_FILE_EXTENSIONS, url_canonicalizer: UrlCanonicalizer = None, crawl_store: CrawlStore = None, scheduler: PolitenessScheduler = None, fetch_policy: FetchPolicy = None, profiler: CrawlProfiler = None) -> None:
 
         if not isinstance(root_link, str):
             raise ValueError(
@@ -23,6 +42,28 @@ class WebpageParser():
         self.map_dict: dict = {}
         self.adj_list_graph: dict = {}
         self.file_manager = file_manager
+        self.pool_connections: int = pool_connections
+        self.pool_maxsize: int = pool_maxsize
+        self.session: Session = None
+        self.session_lock = Lock()
+        self.response_cache: ResponseCache = response_cache
+        self.crawled_at: dict = {}
+        self.link_extractor = get_link_extractor(link_extractor)
+        self.link_classifier: LinkClassifier = LinkClassifier(
+            root_link, file_extensions) if root_link else None
+        self.url_canonicalizer: UrlCanonicalizer = url_canonicalizer or UrlCanonicalizer()
+        self.dedup_index: DedupIndex = DedupIndex(self.url_canonicalizer)
+        self.page_writer: JsonLinesWriter = None
+        self.checkpoint: CrawlCheckpoint = None
+        self.crawl_store: CrawlStore = crawl_store
+        self.scheduler: PolitenessScheduler = scheduler
+        self.fetch_policy: FetchPolicy = fetch_policy or FetchPolicy()
+        # seconds from sending each request to its response headers, or to its failure
+        self.response_times: dict = {}
+        # updated as the pages are recorded, read by get_webpage_statistics during the crawl
+        self.statistics: CrawlStatistics = CrawlStatistics()
+        # stage timings, counters and queue depths of the crawl, recorded only if the parser has a profiler
+        self.profiler: CrawlProfiler = profiler
 
     def __str__(self) -> str:
         return f'WebpageParser(root_link={self.root_link})'
@@ -33,6 +74,79 @@ class WebpageParser():
     def get_adj_list_graph(self) -> dict:
         return self.adj_list_graph
 
+    def get_session(self) -> Session:
+        '''
+        Return the HTTP session (connection pool) reused for the whole crawl,
+        it is created on the first request.
+        '''
+
+        with self.session_lock:
+            if self.session is None:
+                self.session = build_session(pool_connections=self.pool_connections,
+                                             pool_maxsize=self.pool_maxsize)
+                if self.profiler is not None:
+                    self.session.hooks['response'].append(
+                        mark_headers_received)
+            return self.session
+
+    def close(self) -> None:
+        '''
+        Close the pooled connections.
+        '''
+
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def fetch(self, url: str = '', headers: dict = None) -> Response:
+        '''
+        Perform HTTP get request with the pooled session and return the response object,
+        the request waits for its slot if the parser has a politeness scheduler.
+        The timeouts and retries of the fetch policy apply, a page that cannot be fetched
+        raises FetchFailed.
+        '''
+
+        if not url:
+            raise ArgumentNotProvided('url was not provided')
+        return self.fetch_policy.fetch(get_host(url), url,
+                                       lambda timeout: self.__send(url, headers, timeout))
+
+    def __send(self, url: str, headers: dict, timeout: tuple) -> Response:
+        sent_at = time.perf_counter()
+        if self.scheduler is not None:
+            response = self.scheduler.fetch(
+                self.get_session(), url=url, headers=headers, timeout=timeout)
+        else:
+            response = self.get_session().get(url=url, headers=headers, timeout=timeout)
+        if self.profiler is not None:
+            self.profiler.record_response(get_host(url), response, sent_at)
+        return response
+
+    def profile_stage(self, stage: str):
+        '''
+        Return a context manager timing its block as the stage of the profiler (if the parser has one).
+        '''
+
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(stage)
+
+    def __fetch_and_time(self, url: str, headers: dict = None) -> Response:
+        '''
+        fetch, and record the response time of the url.
+        '''
+
+        try:
+            response: Response = self.fetch(url=url, headers=headers)
+        except FetchFailed as exc:
+            if exc.elapsed is not None:
+                self.response_times[url] = exc.elapsed
+            if self.profiler is not None:
+                self.profiler.record_failure(get_host(url))
+            raise
+        self.response_times[url] = response.elapsed.total_seconds()
+        return response
+
     def perform_get_request(self, url: str = '') -> tuple:
         '''
         Perform HTTP get request and return response object.
@@ -41,14 +155,25 @@ class WebpageParser():
             - HTTP status code, 
             - content length (in bytes)
         '''
+
+        return self.fetch_web_page(url=url)[:3]
+
+    def fetch_web_page(self, url: str = '') -> tuple:
+        '''
+        Perform HTTP get request and return the tuple of perform_get_request followed by
+        the url of the web page after the redirects, the relative links of the page
+        are resolved against it.
+        '''
         # len(response.content) - size in bytes
         # len(response.text)    - size in characters
 
-        if not url:
-            raise ArgumentNotProvided('url was not provided')
-        response: Response = get(url=url)
+        try:
+            response: Response = self.__fetch_and_time(url=url)
+        except FetchFailed as exc:
+            # the failure is recorded as the status of the page, the crawl goes on
+            return ('', exc.status, 0, url)
 
-        return (response.text, response.status_code, len(response.content))
+        return (response.text, response.status_code, len(response.content), response.url)
 
     def get_links_from_web_page(self, web_page, parser='html.parser'):
         '''
@@ -58,10 +183,19 @@ class WebpageParser():
         soup: BeautifulSoup = BeautifulSoup(web_page, parser)
         return soup.find_all('a')
 
-    def extract_hrefs(self, links: list) -> dict:
+    def get_hrefs_from_web_page(self, web_page) -> list:
+        '''
+        Extract the href values of all links from given html web page
+        with the configured link extractor backend.
+        '''
+
+        return self.link_extractor.extract(web_page)
+
+    def extract_hrefs(self, links: list, page_link: str = None) -> dict:
         '''
         Extract the links from html href attribute and return a dictionary with
-        links in the format:
+        links in the format (links can be the href values or the <a> tags),
+        the relative links are resolved against page_link (the root link if it is not given):
 
         {'internal_links':  Counter({'https://www.globalapptesting.com/product': 7,
                                      'https://www.globalapptesting.com/platform/integrations': 5}),
@@ -89,45 +223,8 @@ class WebpageParser():
             raise ValueError(
                 f'The root was not provided at the object construction: root_link={self.root_link}')
 
-        internal_links = []
-        external_links = []
-        dead_links = []
-        phone_links = []
-        email_links = []
-        file_links = []
-        common_file_formats = ('.png', '.jpeg', '.gif', '.pdf',
-                               '.svg', '.mp4', '.doc', '.docx', '.txt', '.ppt', '.pptx')
-        for link in links:
-            link_host: str = link.get('href')
-
-            if not link_host or link_host.startswith('javascript:;'):
-                continue
-            elif link_host.endswith(common_file_formats):
-                file_links.append(link_host)
-            elif link_host.startswith('/'):
-                root = self.root_link
-                if self.root_link.endswith('/'):
-                    root = self.root_link[:-1]
-                complete_link = root + link_host
-                internal_links.append(complete_link)
-            elif link_host == '#':
-                dead_links.append(link_host)
-            elif 'tel' in link_host:
-                phone_links.append(link_host)
-            elif 'mailto' in link_host:
-                email_links.append(link_host)
-            # check only if the hosts are the same
-            elif len(link_host.split('.')) > 1 and link_host.startswith('https://www') and self.root_domain in link_host.split('.')[1]:
-                internal_links.append(link_host)
-            else:
-                external_links.append(link_host)
-
-        return {'internal_links':   Counter(internal_links),
-                'external_links':   Counter(external_links),
-                'dead_links':       Counter(dead_links),
-                'phone_links':      Counter(phone_links),
-                'email_links':      Counter(email_links),
-                'file_links':      Counter(file_links)}
+        return self.link_classifier.classify(
+            [link if isinstance(link, str) else link.get('href') for link in links], page_link)
 
     def extract_links_from_counter(self, counter_obj: Counter) -> list:
         '''
@@ -147,7 +244,169 @@ class WebpageParser():
                 f'Argument obj is of type {type(counter_obj)}, expected obj to be of type Counter')
         return [link for link, _ in counter_obj.items()]
 
-    def build_dict_map(self, recursive: bool = False) -> dict:
+    def crawl_page(self, link: str) -> dict:
+        '''
+        Query a single page and return its categorized links together with
+        the HTTP status code and the page size (in bytes).
+
+        The link is queried as it was found, its canonical url (which the server may not
+        serve, e.g. without the trailing slash) is only the key of the page.
+        '''
+
+        self.crawled_at[self.url_canonicalizer.canonicalize(link)] = time.time()
+        if self.response_cache is not None:
+            return self.__crawl_page_with_cache(link)
+
+        # Perform get request
+        response, status_code, page_size_bytes, page_link = self.fetch_web_page(
+            url=link)
+        return self.parse_web_page(web_page=response, status_code=status_code, page_size_bytes=page_size_bytes,
+                                   page_link=page_link)
+
+    def parse_web_page(self, web_page: str, status_code: int, page_size_bytes: int, page_link: str = None) -> dict:
+        '''
+        Return the categorized links of the html web page found at page_link together with
+        the HTTP status code and the page size (in bytes).
+        '''
+
+        # Extract links from html page
+        with self.profile_stage('parse'):
+            links = self.get_hrefs_from_web_page(web_page=web_page)
+
+        # Categorize links
+        with self.profile_stage('classify'):
+            clean_links = self.extract_hrefs(links=links, page_link=page_link)
+        clean_links.__setitem__('HTTP_STATUS', status_code)
+        clean_links.__setitem__('page_size_bytes', page_size_bytes)
+        return clean_links
+
+    def __crawl_page_with_cache(self, link: str) -> dict:
+        '''
+        Revalidate the cached response of the link with a conditional request,
+        on 304 Not Modified the stored parse result is reused.
+        '''
+
+        try:
+            response, cached_page = self.revalidate_page(link)
+        except FetchFailed as exc:
+            return self.parse_web_page(web_page='', status_code=exc.status, page_size_bytes=0)
+        if cached_page is not None:
+            return cached_page
+
+        clean_links = self.parse_web_page(web_page=response.text,
+                                          status_code=response.status_code,
+                                          page_size_bytes=len(response.content),
+                                          page_link=response.url)
+        self.cache_page(link, response, clean_links)
+        return clean_links
+
+    def revalidate_page(self, link: str) -> tuple:
+        '''
+        Query the link with a conditional request for its cached response and return a tuple with:
+            - the response object, None if the page was not modified
+            - the stored parse result if the page was not modified, otherwise None
+        A page that cannot be fetched raises FetchFailed.
+        '''
+
+        headers = self.response_cache.conditional_headers(link)
+        response: Response = self.__fetch_and_time(url=link, headers=headers)
+        if response.status_code == 304:
+            cached = self.response_cache.get(link)
+            if cached is not None:
+                self.response_cache.record_hit(
+                    cached['page']['page_size_bytes'])
+                return (None, cached['page'])
+            # the entry was evicted meanwhile, query the page again
+            response = self.__fetch_and_time(url=link)
+
+        self.response_cache.record_miss()
+        return (response, None)
+
+    def cache_page(self, link: str, response: Response, clean_links: dict) -> None:
+        '''
+        Store the response of the link and its parse result in the response cache.
+        '''
+
+        if response.status_code == 200:
+            self.response_cache.put(link, body=response.text,
+                                    etag=response.headers.get('ETag'),
+                                    last_modified=response.headers.get(
+                                        'Last-Modified'),
+                                    page=clean_links)
+
+    def record_page(self, link: str, clean_links: dict) -> None:
+        '''
+        Add the crawled page to the map_dict and to the crawl statistics, to the JSON Lines output
+        if the parser streams its pages and to the crawl store if the parser has one.
+        '''
+
+        self.__check_map_dict_writable()
+        with self.profile_stage('store'):
+            self.map_dict[link] = clean_links
+            edges = self.get_graph_edges(link)
+            self.statistics.add_page(link, clean_links, edges,
+                                     self.url_canonicalizer.canonicalize(link))
+            if self.page_writer is not None:
+                self.page_writer.write(link, clean_links)
+            if self.checkpoint is not None:
+                self.checkpoint.record_page(
+                    link, clean_links, self.crawled_at.get(link))
+            if self.crawl_store is not None:
+                self.crawl_store.add_page(
+                    link, clean_links, edges, self.crawled_at.get(link))
+        if self.profiler is not None:
+            self.profiler.record_page()
+
+    def remove_page(self, link: str) -> None:
+        '''
+        Remove the page from the map_dict and from the crawl statistics, from the JSON Lines output
+        if the parser streams its pages and from the crawl store if the parser has one.
+        '''
+
+        self.__check_map_dict_writable()
+        del self.map_dict[link]
+        self.statistics.remove_page(link)
+        if self.page_writer is not None:
+            self.page_writer.remove(link)
+        if self.checkpoint is not None:
+            self.checkpoint.remove_page(link)
+        if self.crawl_store is not None:
+            self.crawl_store.remove_page(link)
+
+    def __check_map_dict_writable(self) -> None:
+        '''
+        Raise ValueError if the map_dict was loaded lazily, it is read only.
+        '''
+
+        if isinstance(self.map_dict, LazyMapStore):
+            raise ValueError(
+                'The map_dict was loaded lazily and is read only, load it with load_map_dict_from_jsonl to update it')
+
+    def __open_outputs(self, output_file: str = None, checkpoint_file: str = None, checkpoint_interval: float = 10.0, append: bool = False) -> None:
+        '''
+        Open the JSON Lines output and the checkpoint log the crawled pages are recorded to.
+        '''
+
+        if output_file is not None:
+            self.page_writer = self.file_manager.open_jsonl_writer(
+                file_name=output_file, append=append)
+        if checkpoint_file is not None:
+            self.checkpoint = CrawlCheckpoint(file_manager=self.file_manager, file_name=checkpoint_file,
+                                              interval=checkpoint_interval, append=append)
+
+    def __close_outputs(self) -> None:
+        if self.page_writer is not None:
+            self.page_writer.close()
+            self.page_writer = None
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+            self.checkpoint = None
+        if self.crawl_store is not None:
+            # the store is owned by the caller, only the buffered pages are written
+            self.crawl_store.flush()
+
+    def build_dict_map(self, recursive: bool = False, concurrency: int = 0, parse_workers: int = 0, batch_size: int = 8, output_file: str = None,
+                       checkpoint_file: str = None, checkpoint_interval: float = 10.0) -> dict:
         '''
         Crawl links from webpages and build dictionary map from the obtained links.
 
@@ -166,82 +425,112 @@ class WebpageParser():
                                                'HTTP_STATUS': 200,
                                                'page_size_bytes': 116577}
         }
+
+        recursive     - use the recursive implementation
+        concurrency   - number of concurrent workers, 0 means sequential crawl
+        parse_workers - number of parser processes, 0 means the pages are parsed by the crawl workers
+        batch_size    - number of pages sent at once to a parser process
+        output_file   - stream each page to output_file.jsonl as soon as it is parsed
+        checkpoint_file     - log the crawled pages to checkpoint_file.jsonl, so the crawl can be
+                              continued by resume_map_dict if it is interrupted
+        checkpoint_interval - seconds between two snapshots of the frontier (iterative crawl)
+        '''
+
+        self.__open_outputs(output_file=output_file, checkpoint_file=checkpoint_file,
+                            checkpoint_interval=checkpoint_interval)
+        try:
+            return self.__build_dict_map(recursive, concurrency, parse_workers, batch_size)
+        finally:
+            self.__close_outputs()
+
+    def __build_dict_map(self, recursive: bool, concurrency: int, parse_workers: int, batch_size: int) -> dict:
+        '''
+        Dispatch the crawl to the selected crawl mode.
         '''
-        if recursive:
+
+        # every crawl mode queues a link only if its canonical url was not queued before,
+        # the links are queued as they were found and the pages are recorded under their canonical url
+        self.dedup_index.clear()
+        root_link = self.root_link
+        self.dedup_index.add(root_link)
+
+        if parse_workers:
+            print(
+                f'Build map dictionary with {parse_workers} parser processes')
+            crawler = PipelineCrawler(webpage_parser=self, fetch_concurrency=concurrency or 8,
+                                      parse_workers=parse_workers, batch_size=batch_size)
+            return crawler.crawl(root_link)
+        elif concurrency:
+            print(
+                f'Build map dictionary concurrently with {concurrency} workers')
+            return AsyncCrawler(webpage_parser=self, concurrency=concurrency).crawl(root_link)
+        elif recursive:
             print('Build map dictionary recursively')
-            return self.__build_dict_helper_recursive(self.root_link)
+            return self.__build_dict_helper_recursive(root_link)
         else:
             print('Build map dictionary iteratively')
-            return self.__build_dict_helper_iterative(self.root_link)
+            return self.__build_dict_helper_iterative(self.__new_frontier([root_link]))
 
-    def __build_dict_helper_recursive(self, link) -> dict:
+    def __new_frontier(self, links: list):
         '''
-        Does the same thing as iterative version but using recurion.
+        Return the stack of links to query, with a politeness scheduler the links are
+        taken host by host so a throttled host does not hold the others.
         '''
 
-        # Perform get request
-        response, status_code, page_size_bytes = self.perform_get_request(
-            url=link)
+        if self.scheduler is not None:
+            return HostFrontier(self.scheduler, links)
+        return deque(links)
 
-        # Extract links from html root page
-        links = self.get_links_from_web_page(web_page=response)
+    def __build_dict_helper_recursive(self, link) -> dict:
+        '''
+        Does the same thing as iterative version but using recurion.
+        '''
 
-        # Categorize links
-        clean_links = self.extract_hrefs(links=links)
-        clean_links.__setitem__('HTTP_STATUS', status_code)
-        clean_links.__setitem__('page_size_bytes', page_size_bytes)
+        clean_links = self.crawl_page(link=link)
 
         # Extract internal links
         internal_links_only = self.extract_links_from_counter(
             clean_links['internal_links'])
 
         # Add to the map_dict the first key value
-        self.map_dict[link] = clean_links
+        self.record_page(self.url_canonicalizer.canonicalize(link), clean_links)
 
         # Repeat the above steps for the internal links
         for internal_link in internal_links_only:
-            if internal_link not in self.map_dict:
+            if self.dedup_index.add(internal_link) is not None:
                 self.__build_dict_helper_recursive(internal_link)
 
         return self.map_dict
 
-    def __build_dict_helper_iterative(self, link) -> dict:
+    def __build_dict_helper_iterative(self, stack) -> dict:
         '''
         The iterative implementation uses a stack to track links that were not queried yet.
         At each iteration a new link (key) is popped from the stack, the links (value) are extracted and added to map_dict
         '''
 
-        stack = deque()
-        # Start with the given link
-        stack.append(link)
-
         while stack:
+            if self.profiler is not None:
+                self.profiler.record_queue_depth('frontier', len(stack))
             # pop the top element
             element_link = stack.pop()
 
-            # Perform get request
-            response, status_code, page_size_bytes = self.perform_get_request(
-                url=element_link)
-
-            # Extract links from html root page
-            links = self.get_links_from_web_page(web_page=response)
+            clean_links = self.crawl_page(link=element_link)
 
-            # Categorize links
-            clean_links = self.extract_hrefs(links=links)
-            clean_links.__setitem__('HTTP_STATUS', status_code)
-            clean_links.__setitem__('page_size_bytes', page_size_bytes)
-
-            self.map_dict[element_link] = clean_links
+            self.record_page(self.url_canonicalizer.canonicalize(
+                element_link), clean_links)
 
             # Extract internal links
             internal_links_only = self.extract_links_from_counter(
                 clean_links['internal_links'])
 
-            # Add to the stack links that were not queried yet
+            # Add to the stack links that were not queued yet
             for internal_link in internal_links_only:
-                if internal_link not in self.map_dict:
+                if self.dedup_index.add(internal_link) is not None:
                     stack.append(internal_link)
 
+            if self.checkpoint is not None:
+                self.checkpoint.save_frontier(stack)
+
         return self.map_dict
 
     def convert_counters_to_graph_edges(self) -> dict:
@@ -252,11 +541,90 @@ class WebpageParser():
         if not self.map_dict:
             self.build_dict_map()
 
-        for key_root, value_dict in self.map_dict.items():
-            self.adj_list_graph[key_root] = [(key_root, destination_link, weight)
-                                             for destination_link, weight in value_dict['internal_links'].items()]
+        for key_root in self.map_dict:
+            canonical_root = self.url_canonicalizer.canonicalize(key_root)
+            # the same page stored under two urls is added once
+            if canonical_root not in self.adj_list_graph:
+                self.adj_list_graph[canonical_root] = self.get_graph_edges(
+                    key_root)
         return self.adj_list_graph
 
+    def get_graph_edges(self, link: str) -> list:
+        '''
+        Return the edges of the link as (source, destination, weight) tuples,
+        the urls are canonical and the weights of the same destination are summed.
+        '''
+
+        canonicalize = self.url_canonicalizer.canonicalize
+        destinations = {}
+        for destination_link, weight in self.map_dict[link]['internal_links'].items():
+            destination_link = canonicalize(destination_link)
+            destinations[destination_link] = destinations.get(
+                destination_link, 0) + weight
+
+        source_link = canonicalize(link)
+        return [(source_link, destination_link, weight) for destination_link, weight in destinations.items()]
+
+    def refresh_map_dict(self, graph=None, max_pages: int = None, strategy: str = 'staleness', stale_after: float = 0.0, concurrency: int = 1, output_file: str = None) -> dict:
+        '''
+        Refresh the existing map_dict incrementally instead of building it from scratch,
+        the map_dict, adj_list_graph and graph.adj_list_graph are patched in place.
+
+        strategy    - 'staleness' (oldest crawled pages first) or 'priority' (most linked pages first)
+        stale_after - skip the pages crawled less than stale_after seconds ago
+        max_pages   - refresh at most max_pages of the existing pages
+        concurrency - number of pages queried at the same time
+        output_file - append the refreshed and removed pages to output_file.jsonl
+
+        returns a report with the number of refreshed pages and the changed, added and removed pages
+        '''
+
+        if not self.map_dict:
+            raise ValueError('The map_dict is empty')
+        self.__check_map_dict_writable()
+        crawler = IncrementalCrawler(webpage_parser=self, graph=graph,
+                                     concurrency=concurrency)
+        self.__open_outputs(output_file=output_file, append=True)
+        try:
+            return crawler.refresh(max_pages=max_pages, strategy=strategy, stale_after=stale_after)
+        finally:
+            self.__close_outputs()
+
+    def resume_map_dict(self, checkpoint_file: str = 'crawl_checkpoint', checkpoint_interval: float = 10.0, output_file: str = None) -> dict:
+        '''
+        Continue an interrupted crawl from its checkpoint log, the pages in the log are not queried again.
+
+        The frontier is the last snapshot plus the internal links of the logged pages that were not
+        crawled yet (found after the snapshot), the crawl continues iteratively and keeps logging
+        to the same checkpoint file.
+        '''
+
+        map_dict, frontier, crawled_at = CrawlCheckpoint.load(
+            file_manager=self.file_manager, file_name=checkpoint_file)
+        self.map_dict = map_dict
+        self.crawled_at.update(crawled_at)
+        self.statistics = CrawlStatistics.from_map_dict(
+            map_dict, self.get_graph_edges, self.url_canonicalizer.canonicalize)
+
+        self.dedup_index.clear()
+        for link in map_dict:
+            self.dedup_index.add(link)
+        stack = self.__new_frontier([])
+        links_to_queue = [link for value_dict in map_dict.values()
+                          for link in value_dict['internal_links']]
+        for link in [*frontier, *links_to_queue] or [self.root_link]:
+            if self.dedup_index.add(link) is not None:
+                stack.append(link)
+
+        print(
+            f'Resume map dictionary with {len(map_dict)} pages crawled and {len(stack)} pages queued')
+        self.__open_outputs(output_file=output_file, checkpoint_file=checkpoint_file,
+                            checkpoint_interval=checkpoint_interval, append=True)
+        try:
+            return self.__build_dict_helper_iterative(stack)
+        finally:
+            self.__close_outputs()
+
     def write_map_dict_to_json_file(self, file_name: str = 'map_dict') -> None:
         '''
         Write / Dump the map dict into json file.
@@ -272,8 +640,72 @@ class WebpageParser():
         Load the map dictionary from a json file.
         '''
         self.map_dict = self.file_manager.load_from_json(file_name=file_name)
+        self.statistics = CrawlStatistics()
         return self.map_dict
 
+    def write_map_dict_to_jsonl_file(self, file_name: str = 'map_dict') -> None:
+        '''
+        Write the map dict into a JSON Lines file, one line per page.
+        '''
+
+        if not self.map_dict:
+            raise ValueError('The map_dict is empty')
+        self.file_manager.write_to_jsonl(
+            file_name=file_name, data=self.map_dict)
+
+    def load_map_dict_from_jsonl(self, file_name: str) -> dict:
+        '''
+        Stream the pages of a JSON Lines file into the map dictionary.
+        '''
+        self.map_dict = self.file_manager.load_from_jsonl(file_name=file_name)
+        self.statistics = CrawlStatistics()
+        return self.map_dict
+
+    def write_map_dict_to_crawl_store(self, crawl_store: CrawlStore = None) -> None:
+        '''
+        Bulk write the map dict and its graph edges to the crawl store (the parser's one by default).
+        '''
+
+        crawl_store = crawl_store or self.crawl_store
+        if crawl_store is None:
+            raise ValueError('The crawl_store is not provided')
+        if not self.map_dict:
+            raise ValueError('The map_dict is empty')
+        crawl_store.write_map_dict(self.map_dict, self.get_graph_edges)
+
+    def load_map_dict_lazily(self, file_name: str = 'map_dict', cache_size: int = 1024) -> LazyMapStore:
+        '''
+        Open the map dictionary of a JSON Lines file without decoding the pages, each page is
+        decoded when it is accessed (a map_dict.json file is converted to map_dict.jsonl first).
+        The returned map_dict is read only, the pages cannot be recorded, removed or refreshed.
+        '''
+
+        if not os.path.exists(f'{file_name}.jsonl') and os.path.exists(f'{file_name}.json'):
+            self.file_manager.convert_json_to_jsonl(file_name=file_name)
+        if isinstance(self.map_dict, LazyMapStore):
+            self.map_dict.close()
+        self.map_dict = LazyMapStore(file_name=file_name, cache_size=cache_size)
+        self.statistics = CrawlStatistics()
+        return self.map_dict
+
+    def write_crawl_times_to_json_file(self, file_name: str = 'crawl_times') -> None:
+        '''
+        Write / Dump the time (seconds since epoch) each page was crawled into json file,
+        it is used by refresh_map_dict to refresh the stalest pages first.
+        '''
+
+        if not self.crawled_at:
+            raise ValueError('The crawled_at is empty')
+        self.file_manager.write_to_file(
+            file_name=file_name, data=self.crawled_at)
+
+    def load_crawl_times_from_json(self, file_name: str) -> dict:
+        '''
+        Load the crawl times of the pages from a json file.
+        '''
+        self.crawled_at = self.file_manager.load_from_json(file_name=file_name)
+        return self.crawled_at
+
     def get_link_info(self, link: str) -> dict:
         '''
         Return information about link like:
@@ -289,19 +721,21 @@ class WebpageParser():
         if link not in self.map_dict:
             raise KeyError(f'There was not found key={link} in the map_dict')
 
+        # a lazily loaded map_dict decodes the page on each access
+        page = self.map_dict[link]
         for key in ['internal_links', 'external_links', 'dead_links', 'phone_links', 'email_links']:
-            if key not in self.map_dict[link]:
+            if key not in page:
                 raise KeyError(
                     f'There was not found key={key} in the map_dict[{link}]')
 
         return {
-            'internal_links': len(self.map_dict[link]['internal_links']),
-            'external_links': len(self.map_dict[link]['external_links']),
-            'dead_links':     len(self.map_dict[link]['dead_links']),
-            'phone_links':    len(self.map_dict[link]['phone_links']),
-            'email_links':    len(self.map_dict[link]['email_links']),
-            'file_links':     len(self.map_dict[link]['file_links']),
-            'HTTP_STATUS':    self.map_dict[link]['HTTP_STATUS']
+            'internal_links': len(page['internal_links']),
+            'external_links': len(page['external_links']),
+            'dead_links':     len(page['dead_links']),
+            'phone_links':    len(page['phone_links']),
+            'email_links':    len(page['email_links']),
+            'file_links':     len(page['file_links']),
+            'HTTP_STATUS':    page['HTTP_STATUS']
         }
 
     def get_link_info_formatted_string(self, link: str) -> str:
@@ -320,17 +754,56 @@ class WebpageParser():
 
         return self.map_dict[link].get('HTTP_STATUS', 0)
 
-    def generate_and_save_map_dict(self) -> dict:
+    def get_slow_pages(self, k: int = 10) -> list:
+        '''
+        Return the (link, seconds) of the k pages with the longest response time, slowest first.
+        '''
+
+        if k < 0:
+            raise ValueError(f'k is {k}, expected to be at least 0')
+        return sorted(self.response_times.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def generate_and_save_map_dict(self, file_format: str = 'json', checkpoint_file: str = None, resume: bool = False,
+                                   profile_file: str = 'crawl_profile') -> dict:
         '''
         1. Query provided root link
         2. Build dictionary map
         3. Convert dictionary map to dictionary representation of adjacent list graph
-        4. Save map dictionary in a json file 
+        4. Save map dictionary in a json file, or stream each page to a jsonl file while crawling
+        5. Save the index of the HTTP response cache (if the parser has one)
+        6. Save the summary of the profiler in profile_file.json (if the parser has one)
+
+        file_format     - 'json' or 'jsonl'
+        checkpoint_file - log the crawl to checkpoint_file.jsonl
+        resume          - continue from checkpoint_file if it exists instead of starting a new crawl
+        profile_file    - name of the profiler summary file
 
         returns adj_list_graph
         '''
 
-        self.build_dict_map()
+        if file_format not in ('json', 'jsonl'):
+            raise ValueError(
+                f'file_format is {file_format}, expected to be json or jsonl')
+
+        if resume and checkpoint_file is None:
+            raise ValueError('The checkpoint_file is required to resume the crawl')
+
+        output_file = 'map_dict' if file_format == 'jsonl' else None
+        if self.profiler is not None:
+            self.profiler.start()
+        if resume and CrawlCheckpoint.exists(checkpoint_file):
+            self.resume_map_dict(checkpoint_file=checkpoint_file,
+                                 output_file=output_file)
+        else:
+            self.build_dict_map(output_file=output_file,
+                                checkpoint_file=checkpoint_file)
         adj_graph = self.convert_counters_to_graph_edges()
-        self.write_map_dict_to_json_file()
+        if file_format == 'json':
+            with self.profile_stage('write'):
+                self.write_map_dict_to_json_file()
+        if self.response_cache is not None:
+            self.response_cache.flush()
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler.export(profile_file)
         return adj_graph
@@ -0,0 +1,41 @@
+'''
+Compare the crawl throughput (pages/sec) of the iterative crawl with the
+concurrent crawl at different concurrency levels, against a local website.
+
+Run from the repository root:
+    python -m benchmarks.bench_async_crawl
+'''
+import time
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.local_server import SyntheticSite, LocalServer
+
+
+PAGE_COUNT = 200
+LATENCY = 0.02
+CONCURRENCY_LEVELS = [0, 1, 2, 4, 8, 16, 32]
+
+
+def crawl_pages_per_second(server: LocalServer, concurrency: int) -> float:
+    parser = WebpageParser(root_link=server.root_link,
+                           file_manager=FileManager())
+    start = time.perf_counter()
+    map_dict = parser.build_dict_map(concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    return len(map_dict) / elapsed
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, fan_out=5)
+    with LocalServer(site, latency=LATENCY) as server:
+        results = []
+        for concurrency in CONCURRENCY_LEVELS:
+            results.append(
+                (concurrency, crawl_pages_per_second(server, concurrency)))
+
+    print(f'\n{PAGE_COUNT} pages, {LATENCY * 1000:.0f} ms latency per page\n')
+    print('concurrency   pages/sec')
+    for concurrency, pages_per_second in results:
+        label = 'iterative' if not concurrency else str(concurrency)
+        print(f'{label:<13} {pages_per_second:>9.1f}')
@@ -0,0 +1,59 @@
+'''
+Build the all-pairs click depth matrix of a synthetic site graph with 1 worker and
+with one worker per CPU, and compare with the time of n^2 dijsktra calls (estimated
+from a sample of pairs).
+
+Run from the repository root:
+    python -m benchmarks.bench_click_depth_matrix
+'''
+import os
+import time
+import random
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.click_depth_matrix import ClickDepthMatrix
+
+
+PAGES_COUNT = 3_000
+LINKS_PER_PAGE = 10
+SAMPLE_PAIRS = 200
+
+
+def synthetic_adj_list_graph() -> dict:
+    rand = random.Random(0)
+    nodes = [f'https://example.org/page/{i}' for i in range(PAGES_COUNT)]
+    return {node: [[node, nodes[0], 1]] + [[node, rand.choice(nodes), 1] for _ in range(LINKS_PER_PAGE - 1)]
+            for node in nodes}
+
+
+def measure(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    graph = Graph(adj_list_graph=synthetic_adj_list_graph(),
+                  file_manager=FileManager())
+    compact_graph = graph.get_compact_graph()
+    nodes = compact_graph.nodes
+
+    rand = random.Random(1)
+    pairs = [(rand.choice(nodes), rand.choice(nodes))
+             for _ in range(SAMPLE_PAIRS)]
+    _, sample_time = measure(
+        lambda: [graph.dijsktra(source, target) for source, target in pairs])
+    results = [('dijsktra per pair (estimated)', sample_time / SAMPLE_PAIRS * len(nodes) ** 2)]
+
+    cpu_count = os.cpu_count() or 1
+    for workers in sorted({1, cpu_count}):
+        matrix, elapsed = measure(
+            lambda: ClickDepthMatrix.build(compact_graph, workers=workers))
+        results.append((f'ClickDepthMatrix, {workers} workers', elapsed))
+
+    print(f'\n{len(nodes)} pages, {compact_graph.edge_count} links, matrix {matrix.matrix.nbytes / 2 ** 20:.1f} MB\n')
+    print('method                             seconds')
+    for name, elapsed in results:
+        print(f'{name:<32} {elapsed:>9.2f}')
+    print(f'\ndistance histogram: {matrix.get_histogram()}')
@@ -0,0 +1,127 @@
+'''
+Compare the memory used by the adjacency list dict of [source, destination, weight]
+edges with the compact (CSR) graph, and the traversal times of the previous dict
+based algorithms with the CSR ones, on the bundled adj_list_graph.json.
+
+Run from the repository root:
+    python -m benchmarks.bench_compact_graph
+'''
+import sys
+import time
+import heapq
+import tracemalloc
+from app.file_manager import FileManager
+from app.compact_graph import CompactGraph
+from app.graph import Graph
+
+
+REPEAT = 5
+
+
+def load_adj_list_graph() -> tuple:
+    '''Load the adjacency list and return it with the bytes it allocated'''
+    tracemalloc.start()
+    adj_list_graph = FileManager().load_from_json('adj_list_graph')
+    allocated_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return adj_list_graph, allocated_bytes
+
+
+def build_compact_graph(adj_list_graph: dict) -> tuple:
+    '''Build the compact graph and return it with the bytes it allocated'''
+    tracemalloc.start()
+    compact_graph = CompactGraph.from_adj_list_graph(adj_list_graph)
+    allocated_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return compact_graph, allocated_bytes
+
+
+def previous_count_incoming_edges(adj_list_graph: dict) -> dict:
+    '''count_incoming_edges before the compact graph'''
+    incoming_links_counter = dict.fromkeys(adj_list_graph.keys(), 0)
+    for edges in adj_list_graph.values():
+        for _, destination, _ in edges:
+            incoming_links_counter[destination] = incoming_links_counter.get(
+                destination, 0) + 1
+    return incoming_links_counter
+
+
+def previous_dijsktra(adj_list_graph: dict, start_node: str, target_node: str) -> tuple:
+    '''dijsktra before the compact graph'''
+    distances = {start_node: 0}
+    parent = {start_node: None}
+    priority_queue = [(0, start_node)]
+    visited = set()
+    while priority_queue:
+        distance, current_node = heapq.heappop(priority_queue)
+        if current_node in visited:
+            continue
+        if current_node == target_node:
+            break
+        visited.add(current_node)
+        for _, neighbor, _ in adj_list_graph.get(current_node, []):
+            if neighbor not in distances or distances[neighbor] > distance + 1:
+                distances[neighbor] = distance + 1
+                parent[neighbor] = current_node
+                heapq.heappush(priority_queue, (distances[neighbor], neighbor))
+    return parent, distances
+
+
+def previous_get_longest_path(adj_list_graph: dict) -> int:
+    '''get_longest_path before the compact graph, recursive dfs'''
+    visited = dict.fromkeys(adj_list_graph, False)
+    node_dependencies = dict.fromkeys(adj_list_graph, 0)
+
+    def dfs(node: str) -> None:
+        visited[node] = True
+        for _, neighbor, _ in adj_list_graph.get(node, []):
+            if not visited.get(neighbor, False):
+                dfs(neighbor)
+            node_dependencies[node] = max(node_dependencies.get(node, 0),
+                                          node_dependencies.get(neighbor, 0) + 1)
+
+    for node in adj_list_graph:
+        if not visited[node]:
+            dfs(node)
+    return max(node_dependencies.values())
+
+
+def measure(function) -> float:
+    '''Best time of REPEAT runs'''
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+
+    sys.setrecursionlimit(100_000)
+    adj_list_graph, dict_bytes = load_adj_list_graph()
+    compact_graph, compact_bytes = build_compact_graph(adj_list_graph)
+    graph = Graph.from_compact_graph(compact_graph, FileManager())
+    start_node = compact_graph.nodes[0]
+    target_node = compact_graph.nodes[-1]
+
+    print(f'\n{compact_graph}\n')
+    print('representation              MB')
+    print(f'{"adjacency list dict":<22} {dict_bytes / 2 ** 20:>9.2f}')
+    print(f'{"compact graph":<22} {compact_bytes / 2 ** 20:>9.2f}')
+    print(f'{"  CSR arrays only":<22} {compact_graph.memory_bytes() / 2 ** 20:>9.2f}')
+
+    results = [('count_incoming_edges',
+                measure(lambda: previous_count_incoming_edges(adj_list_graph)),
+                measure(graph.count_incoming_edges)),
+               ('dijsktra',
+                measure(lambda: previous_dijsktra(
+                    adj_list_graph, start_node, target_node)),
+                measure(lambda: graph.dijsktra(start_node, target_node))),
+               ('get_longest_path',
+                measure(lambda: previous_get_longest_path(adj_list_graph)),
+                measure(graph.get_longest_path))]
+
+    print('\noperation              dict (ms)   CSR (ms)   speedup')
+    for name, dict_time, compact_time in results:
+        print(f'{name:<22} {dict_time * 1000:>9.2f} {compact_time * 1000:>10.2f} {dict_time / compact_time:>8.2f}x')
@@ -0,0 +1,49 @@
+'''
+Measure the overhead of the crawl checkpoint log on the iterative crawl of a
+local website: without checkpoint, with the default frontier snapshot interval
+and with a frontier snapshot after every page (worst case).
+
+Run from the repository root:
+    python -m benchmarks.bench_crawl_checkpoint
+'''
+import os
+import time
+import tempfile
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.local_server import SyntheticSite, LocalServer
+
+
+PAGE_COUNT = 500
+LATENCY = 0.005
+REPEAT = 3
+
+
+def crawl_seconds(server: LocalServer, checkpoint_file: str = None, checkpoint_interval: float = 10.0) -> float:
+    '''Best time of REPEAT crawls'''
+    best = float('inf')
+    for _ in range(REPEAT):
+        parser = WebpageParser(root_link=server.root_link,
+                               file_manager=FileManager())
+        start = time.perf_counter()
+        parser.build_dict_map(checkpoint_file=checkpoint_file,
+                              checkpoint_interval=checkpoint_interval)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, fan_out=5)
+    with tempfile.TemporaryDirectory() as directory, LocalServer(site, latency=LATENCY) as server:
+        checkpoint_file = os.path.join(directory, 'crawl_checkpoint')
+        baseline = crawl_seconds(server)
+        results = [('no checkpoint', baseline),
+                   ('checkpoint, 10 s snapshots', crawl_seconds(server, checkpoint_file)),
+                   ('checkpoint, snapshot per page', crawl_seconds(server, checkpoint_file, 0))]
+        log_size = os.path.getsize(f'{checkpoint_file}.jsonl')
+
+    print(f'\n{PAGE_COUNT} pages, {LATENCY * 1000:.0f} ms latency per page, last log {log_size / 2 ** 20:.1f} MB\n')
+    print('mode                            seconds   overhead')
+    for name, elapsed in results:
+        print(f'{name:<30} {elapsed:>9.3f} {(elapsed / baseline - 1) * 100:>9.1f}%')
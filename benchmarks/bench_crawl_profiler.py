@@ -0,0 +1,56 @@
+'''
+Crawl a local website without a profiler, with the stage timers and with the cProfile /
+tracemalloc captures, and report the crawl time and the overhead of each, then the stage
+timings of the profiled crawl.
+
+Run from the repository root:
+    python -m benchmarks.bench_crawl_profiler
+'''
+import time
+from app.crawl_profiler import CrawlProfiler
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.webpage_parser import WebpageParser
+
+
+PAGE_COUNT = 500
+PAGE_SIZE = 20_000
+REPEATS = 3
+PROFILERS = [('none', None), ('stage timers', ''),
+             ('cprofile', 'cprofile'), ('tracemalloc', 'tracemalloc')]
+
+
+def crawl(root_link: str, capture: str) -> tuple:
+    profiler = CrawlProfiler(capture=capture or None) if capture is not None else None
+    parser = WebpageParser(root_link, FileManager(), profiler=profiler)
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.start()
+    parser.build_dict_map()
+    if profiler is not None:
+        profiler.stop()
+    crawl_time = time.perf_counter() - start
+    parser.close()
+    return crawl_time, profiler
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, fan_out=5, page_size=PAGE_SIZE)
+    with LocalServer(site) as server:
+        print(f'\n{PAGE_COUNT} pages of {PAGE_SIZE} bytes, sequential crawl, best of {REPEATS}\n')
+        print('profiler         crawl (s)   overhead')
+        baseline = None
+        for name, capture in PROFILERS:
+            crawl_time = min(crawl(server.root_link, capture)[0] for _ in range(REPEATS))
+            baseline = baseline or crawl_time
+            print(f'{name:<16} {crawl_time:>9.3f} {(crawl_time / baseline - 1) * 100:>9.1f}%')
+
+        summary = crawl(server.root_link, '')[1].get_summary()
+
+    print(f'\n{summary["pages_per_second"]:.0f} pages/sec, {summary["bytes_per_second"] / 1e6:.1f} MB/sec\n')
+    print('stage        count   total (s)   p50 (ms)   p90 (ms)   p99 (ms)')
+    for stage, histogram in summary['stages'].items():
+        if histogram['count']:
+            print(f'{stage:<12} {histogram["count"]:>5} {histogram["total_seconds"]:>11.3f} '
+                  f'{histogram["p50_ms"]:>10.3f} {histogram["p90_ms"]:>10.3f} {histogram["p99_ms"]:>10.3f}')
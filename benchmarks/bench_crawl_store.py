@@ -0,0 +1,104 @@
+'''
+Compare the SQLite crawl store with the in-memory map_dict / Graph path on a synthetic map_dict:
+the bulk insert time against the batch size, and the statistics and backlinks query times.
+
+Run from the repository root (the page count is optional):
+    python -m benchmarks.bench_crawl_store 50000
+'''
+import os
+import sys
+import time
+import random
+import tempfile
+from collections import Counter
+from app.crawl_store import CrawlStore
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+PAGE_COUNT = 50_000
+FAN_OUT = 10
+BATCH_SIZES = (1, 100, 1000)
+
+
+def synthetic_map_dict(page_count: int) -> dict:
+    rand = random.Random(0)
+    map_dict = {}
+    for number in range(page_count):
+        # a few popular pages get most of the links
+        targets = [int(page_count * rand.random() ** 3) for _ in range(FAN_OUT)]
+        map_dict[f'https://example.com/page-{number}'] = {
+            'internal_links': Counter(f'https://example.com/page-{target}' for target in targets),
+            'external_links': Counter({'https://www.example.org/': 1}),
+            'dead_links': Counter(), 'phone_links': Counter(),
+            'email_links': Counter({'mailto:info@example.com': 1}), 'file_links': Counter(),
+            'HTTP_STATUS': 404 if number % 20 == 0 else 200, 'page_size_bytes': 1000 + number % 500}
+    return map_dict
+
+
+def get_graph_edges(map_dict: dict, link: str) -> list:
+    return [(link, destination, weight) for destination, weight in map_dict[link]['internal_links'].items()]
+
+
+def in_memory_statistics(map_dict: dict) -> dict:
+    '''The loop of get_webpage_statistics'''
+    statistics = Counter()
+    http_statuses = []
+    for value_dict in map_dict.values():
+        http_statuses.append(value_dict['HTTP_STATUS'])
+        for category in ('internal_links', 'external_links', 'dead_links', 'phone_links', 'email_links', 'file_links'):
+            statistics[category] += len(value_dict[category])
+        statistics['page_size_bytes'] += value_dict['page_size_bytes']
+    return statistics, Counter(http_statuses)
+
+
+def in_memory_pages_by_status(map_dict: dict, graph: Graph, http_status: int, min_backlinks: int) -> list:
+    incoming_links = graph.count_incoming_edges()
+    return sorted(((link, incoming_links.get(link, 0)) for link, page in map_dict.items()
+                   if page['HTTP_STATUS'] == http_status and incoming_links.get(link, 0) >= min_backlinks),
+                  key=lambda item: -item[1])
+
+
+def measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else PAGE_COUNT
+    map_dict = synthetic_map_dict(page_count)
+    print(f'\n{page_count} pages, {page_count * FAN_OUT} internal links\n')
+
+    with tempfile.TemporaryDirectory() as directory:
+        print('bulk insert             time (s)   pages/sec')
+        for batch_size in BATCH_SIZES:
+            database_path = os.path.join(directory, f'crawl-{batch_size}.sqlite')
+            with CrawlStore(database_path, batch_size=batch_size) as crawl_store:
+                insert_time = measure(lambda: crawl_store.write_map_dict(
+                    map_dict, lambda link: get_graph_edges(map_dict, link)))
+            print(f'{"batch_size=" + str(batch_size):<22} {insert_time:>9.2f} {page_count / insert_time:>11.0f}')
+
+        crawl_store = CrawlStore(os.path.join(directory, f'crawl-{BATCH_SIZES[-1]}.sqlite'))
+        adj_list_graph = {link: get_graph_edges(map_dict, link) for link in map_dict}
+
+        def in_memory_min_max() -> dict:
+            # a new Graph, so the compact graph and the degree engine are built like in a new process
+            return Graph(adj_list_graph=adj_list_graph, file_manager=FileManager()).get_nodes_with_min_max_links()
+
+        graph = Graph(adj_list_graph=adj_list_graph, file_manager=FileManager())
+        results = [('statistics totals',
+                    measure(lambda: in_memory_statistics(map_dict)),
+                    measure(crawl_store.get_statistics)),
+                   ('min / max backlinks',
+                    measure(in_memory_min_max),
+                    measure(crawl_store.get_nodes_with_min_max_links)),
+                   ('404 with >= 10 backlinks',
+                    measure(lambda: in_memory_pages_by_status(map_dict, graph, 404, 10)),
+                    measure(lambda: crawl_store.get_pages_by_status(404, min_backlinks=10)))]
+        crawl_store.close()
+
+    print('\nquery                   in-memory (ms)   SQLite (ms)')
+    for name, in_memory_time, store_time in results:
+        print(f'{name:<24} {in_memory_time * 1000:>14.1f} {store_time * 1000:>13.1f}')
@@ -0,0 +1,78 @@
+'''
+Compare the previous pure Python count_incoming_edges / get_nodes_with_min_max_links
+loops with the NumPy DegreeEngine on a synthetic graph with 1M edges.
+
+Run from the repository root:
+    python -m benchmarks.bench_degree_engine
+'''
+import sys
+import time
+import random
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+NODES_COUNT = 50_000
+EDGES_COUNT = 1_000_000
+
+
+def synthetic_adj_list_graph() -> dict:
+    '''Adjacency list with NODES_COUNT pages and EDGES_COUNT random links'''
+    rand = random.Random(0)
+    nodes = [f'https://example.org/page/{i}' for i in range(NODES_COUNT)]
+    adj_list_graph = {node: [] for node in nodes}
+    for _ in range(EDGES_COUNT):
+        source = rand.choice(nodes)
+        adj_list_graph[source].append(
+            [source, rand.choice(nodes), rand.randint(1, 5)])
+    return adj_list_graph
+
+
+def previous_min_max_links(adj_list_graph: dict) -> dict:
+    '''count_incoming_edges and get_nodes_with_min_max_links before the DegreeEngine'''
+    incoming_links_counter = dict.fromkeys(adj_list_graph, 0)
+    for _, value_list in adj_list_graph.items():
+        for (_, destination, _) in value_list:
+            incoming_links_counter[destination] = incoming_links_counter.get(
+                destination, 0) + 1
+
+    min = sys.maxsize
+    max = 0
+    for _, incoming_count in incoming_links_counter.items():
+        if min > incoming_count:
+            min = incoming_count
+        if max < incoming_count:
+            max = incoming_count
+
+    min_links = []
+    max_links = []
+    for key_link, incoming_count in incoming_links_counter.items():
+        if min == incoming_count:
+            min_links.append(key_link)
+        elif max == incoming_count:
+            max_links.append(key_link)
+    return {'minimum_incoming_links': {'links': min_links, 'incoming_links_count': min},
+            'maximum_incoming_links': {'links': max_links, 'incoming_links_count': max}}
+
+
+def measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    adj_list_graph = synthetic_adj_list_graph()
+    graph = Graph(adj_list_graph=adj_list_graph, file_manager=FileManager())
+
+    results = [('python loops', measure(lambda: previous_min_max_links(adj_list_graph))),
+               ('compact graph build', measure(graph.get_compact_graph)),
+               ('DegreeEngine (cold)', measure(graph.get_nodes_with_min_max_links)),
+               ('DegreeEngine (cached)', measure(graph.get_nodes_with_min_max_links)),
+               ('top 100 in-degree', measure(lambda: graph.get_degree_engine().top_k(100)))]
+
+    print(f'\n{NODES_COUNT} nodes, {EDGES_COUNT} edges\n')
+    print('min / max backlinks        seconds')
+    for name, elapsed in results:
+        print(f'{name:<24} {elapsed:>9.4f}')
@@ -0,0 +1,48 @@
+'''
+Crawl a local website where a few pages hang, with read timeouts long enough to wait for
+them and with short read timeouts, and report the crawl time, the response time percentiles
+and the pages recorded as TIMEOUT.
+
+Run from the repository root:
+    python -m benchmarks.bench_fetch_policy
+'''
+import time
+from app.fetch_policy import FetchPolicy
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.webpage_parser import WebpageParser
+
+
+PAGE_COUNT = 200
+HANGING_PAGES = 10
+HANG_SECONDS = 3.0
+CONCURRENCY = 4
+READ_TIMEOUTS = (60.0, 1.0, 0.25)
+
+
+def crawl(site: SyntheticSite, read_timeout: float) -> tuple:
+    path_latency = {f'/page/{index}': HANG_SECONDS for index in range(
+        1, PAGE_COUNT, PAGE_COUNT // HANGING_PAGES)}
+    with LocalServer(site, path_latency=path_latency) as server:
+        parser = WebpageParser(server.root_link, FileManager(),
+                               fetch_policy=FetchPolicy(read_timeout=read_timeout, max_retries=1, backoff=0.05))
+        start = time.perf_counter()
+        map_dict = parser.build_dict_map(concurrency=CONCURRENCY)
+        crawl_time = time.perf_counter() - start
+        parser.close()
+
+    response_times = sorted(parser.response_times.values())
+    timeouts = sum(page['HTTP_STATUS'] == 'TIMEOUT' for page in map_dict.values())
+    return (crawl_time, response_times[len(response_times) // 2],
+            response_times[int(len(response_times) * 0.99)], response_times[-1], len(map_dict), timeouts)
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, fan_out=3)
+    print(f'\n{PAGE_COUNT} pages, {HANGING_PAGES} pages answer after {HANG_SECONDS} s, {CONCURRENCY} workers, 1 retry\n')
+    print('read timeout (s)   crawl (s)   p50 (ms)   p99 (ms)   max (ms)   pages   TIMEOUT')
+    for read_timeout in READ_TIMEOUTS:
+        crawl_time, median, percentile_99, maximum, pages, timeouts = crawl(site, read_timeout)
+        print(f'{read_timeout:<18} {crawl_time:>9.2f} {median * 1000:>10.1f} {percentile_99 * 1000:>10.1f} '
+              f'{maximum * 1000:>10.1f} {pages:>7} {timeouts:>9}')
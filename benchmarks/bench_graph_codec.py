@@ -0,0 +1,52 @@
+'''
+Compare the file size and load time of the bundled adj_list_graph.json with the
+binary columnar graph files (.graph memory-mapped or read, .graphz compressed).
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_codec
+'''
+import os
+import time
+import tempfile
+from app.file_manager import FileManager
+from app.compact_graph import CompactGraph
+from app.graph_codec import read_compact_graph
+
+
+REPEAT = 5
+
+
+def measure(function) -> float:
+    '''Best time of REPEAT runs'''
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+
+    file_manager = FileManager()
+    with tempfile.TemporaryDirectory() as directory:
+        graph_path = os.path.join(directory, 'adj_list_graph.graph')
+        compressed_graph_path = os.path.join(directory, 'adj_list_graph.graphz')
+        file_manager.convert('adj_list_graph.json', graph_path)
+        file_manager.convert('adj_list_graph.json', compressed_graph_path)
+
+        results = [('json', os.path.getsize('adj_list_graph.json'),
+                    measure(lambda: CompactGraph.from_adj_list_graph(
+                        file_manager.load_from_json('adj_list_graph')))),
+                   ('graph (mmap)', os.path.getsize(graph_path),
+                    measure(lambda: read_compact_graph(graph_path))),
+                   ('graph (fromfile)', os.path.getsize(graph_path),
+                    measure(lambda: read_compact_graph(graph_path, mmap=False))),
+                   ('graphz', os.path.getsize(compressed_graph_path),
+                    measure(lambda: read_compact_graph(compressed_graph_path)))]
+
+    print(f'\n{CompactGraph.from_adj_list_graph(file_manager.load_from_json("adj_list_graph"))}\n')
+    print('format                  size (KB)   load (ms)   speedup')
+    json_time = results[0][2]
+    for name, size, load_time in results:
+        print(f'{name:<22} {size / 1024:>10.1f} {load_time * 1000:>11.2f} {json_time / load_time:>8.1f}x')
@@ -0,0 +1,75 @@
+'''
+Export synthetic graphs of growing size for visualization and report the export time and
+the output size at each level of detail, uncapped and capped to the default 2000 nodes.
+The networkx + pyvis path of the former show_graph is measured on the smaller graphs.
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_export
+'''
+import os
+import time
+import tempfile
+import numpy as np
+from app.compact_graph import CompactGraph
+from app.graph_export import GraphExporter
+
+
+NODE_COUNTS = (10_000, 100_000, 500_000)
+FAN_OUT = 8
+SECTIONS = 50
+# the networkx + pyvis export is too slow above this size
+PYVIS_MAX_NODES = 10_000
+
+
+def build_graph(node_count: int) -> CompactGraph:
+    random = np.random.default_rng(0)
+    nodes = [f'https://www.example.com/section-{index % SECTIONS}/page-{index}'
+             for index in range(node_count)]
+    return CompactGraph(nodes=nodes, source_count=node_count,
+                        offsets=np.arange(0, (node_count + 1) * FAN_OUT,
+                                          FAN_OUT, dtype=np.int64),
+                        targets=random.integers(0, node_count, node_count * FAN_OUT, dtype=np.int32),
+                        weights=random.integers(1, 4, node_count * FAN_OUT, dtype=np.int64))
+
+
+def export_with_pyvis(compact_graph: CompactGraph, file_path: str) -> None:
+    import networkx as nx
+    from pyvis.network import Network
+
+    nx_graph = nx.Graph()
+    for url, edges in compact_graph.view().items():
+        nx_graph.add_node(url, label=url, title=url, size=2.1 * max(len(edges), 20))
+        nx_graph.add_weighted_edges_from([(source, destination, weight * 5)
+                                          for source, destination, weight in edges])
+    network = Network(height='1000px', width='100%', directed=True)
+    network.from_nx(nx_graph)
+    network.write_html(file_path)
+
+
+def measure(function, file_path: str) -> tuple:
+    start = time.perf_counter()
+    function(file_path)
+    return time.perf_counter() - start, os.path.getsize(file_path)
+
+
+if __name__ == '__main__':
+
+    print('\nnodes      export                         time (s)   size (KB)')
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'graph.json')
+        html_path = os.path.join(directory, 'graph.html')
+        for node_count in NODE_COUNTS:
+            compact_graph = build_graph(node_count)
+            exports = [('page, uncapped', GraphExporter(compact_graph, max_nodes=None, max_edges=None).export,
+                        json_path),
+                       ('page, capped', GraphExporter(compact_graph).export, json_path),
+                       ('path_prefix', GraphExporter(compact_graph, level_of_detail='path_prefix').export,
+                        json_path),
+                       ('community, capped', GraphExporter(compact_graph, level_of_detail='community').export,
+                        json_path)]
+            if node_count <= PYVIS_MAX_NODES:
+                exports.append(('networkx + pyvis (html)',
+                                lambda file_path: export_with_pyvis(compact_graph, file_path), html_path))
+            for name, export, file_path in exports:
+                seconds, size = measure(export, file_path)
+                print(f'{node_count:<10} {name:<30} {seconds:>8.2f} {size // 1024:>11}')
@@ -0,0 +1,44 @@
+'''
+Lay out random graphs of growing size with the force-directed and the click depth hierarchy
+layouts, and report the time of the first layout and of the cached one.
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_layout
+'''
+import time
+import tempfile
+import numpy as np
+from app.graph_layout import GraphLayout
+
+
+FAN_OUT = 4
+FORCE_NODE_COUNTS = (500, 1000, 2000, 4000)
+HIERARCHY_NODE_COUNTS = (10_000, 100_000, 1_000_000)
+
+
+def build_edges(node_count: int) -> tuple:
+    random = np.random.default_rng(0)
+    sources = np.repeat(np.arange(node_count), FAN_OUT)
+    targets = random.integers(0, node_count, node_count * FAN_OUT)
+    return sources, targets
+
+
+def measure(layout: GraphLayout, labels: list, sources: np.ndarray, targets: np.ndarray) -> float:
+    start = time.perf_counter()
+    layout.get_positions(labels, sources, targets)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    print(f'\nrandom graphs, {FAN_OUT} edges per node\n')
+    print('layout       nodes      layout (s)   cached (s)')
+    with tempfile.TemporaryDirectory() as directory:
+        for kind, node_counts in [('force', FORCE_NODE_COUNTS), ('hierarchy', HIERARCHY_NODE_COUNTS)]:
+            layout = GraphLayout(kind=kind, cache_directory=directory)
+            for node_count in node_counts:
+                labels = [f'https://www.example.com/page-{index}' for index in range(node_count)]
+                sources, targets = build_edges(node_count)
+                first = measure(layout, labels, sources, targets)
+                cached = measure(layout, labels, sources, targets)
+                print(f'{kind:<12} {node_count:<10} {first:>10.3f} {cached:>12.3f}')
@@ -0,0 +1,40 @@
+'''
+Compare a new connection per request (module level requests.get) with the
+pooled keep-alive session owned by WebpageParser, against a local website.
+
+Run from the repository root:
+    python -m benchmarks.bench_http_session
+'''
+import time
+from requests import get
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.local_server import SyntheticSite, LocalServer
+
+
+REQUESTS_COUNT = 500
+
+
+def run(server: LocalServer, fetch) -> tuple:
+    server.connections_count = 0
+    urls = [server.root_link + path for path in server.site.pages]
+    start = time.perf_counter()
+    for index in range(REQUESTS_COUNT):
+        fetch(urls[index % len(urls)])
+    elapsed = time.perf_counter() - start
+    return REQUESTS_COUNT / elapsed, server.connections_count
+
+
+if __name__ == '__main__':
+
+    with LocalServer(SyntheticSite(page_count=100)) as server:
+        parser = WebpageParser(root_link=server.root_link,
+                               file_manager=FileManager())
+        results = [('requests.get', *run(server, lambda url: get(url=url))),
+                   ('pooled session', *run(server, lambda url: parser.perform_get_request(url=url)))]
+        parser.close()
+
+    print(f'\n{REQUESTS_COUNT} sequential requests\n')
+    print('mode             requests/sec   connections')
+    for mode, requests_per_second, connections in results:
+        print(f'{mode:<16} {requests_per_second:>12.1f}   {connections:>11}')
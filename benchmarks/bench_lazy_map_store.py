@@ -0,0 +1,112 @@
+'''
+Compare the peak RSS and time of reading pages from a synthetic 1M-page map_dict.jsonl
+loaded eagerly (every page decoded into a dict) and with the lazily loaded LazyMapStore.
+Each measure runs in a new process so the peak RSS of one does not hide the other.
+
+Run from the repository root (the page count is optional):
+    python -m benchmarks.bench_lazy_map_store 1000000
+'''
+import os
+import sys
+import time
+import random
+import tempfile
+import subprocess
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+from app.file_manager import FileManager
+from app.lazy_map_store import LazyMapStore, build_index
+
+
+PAGE_COUNT = 1_000_000
+# pages read after loading, like the tooltips of show_graph
+LOOKUP_COUNT = 10_000
+
+
+def synthetic_page(number: int, page_count: int) -> dict:
+    internal_links = {f'https://example.com/page-{(number * 7 + step) % page_count}': step + 1
+                      for step in range(5)}
+    return {'internal_links': internal_links,
+            'external_links': {'https://www.facebook.com/example/': 1, 'https://twitter.com/example': 1},
+            'dead_links': {}, 'phone_links': {}, 'email_links': {'mailto:info@example.com': 1},
+            'file_links': {}, 'HTTP_STATUS': 200 if number % 50 else 404}
+
+
+def generate_map_dict(file_name: str, page_count: int) -> None:
+    with FileManager().open_jsonl_writer(file_name) as writer:
+        for number in range(page_count):
+            writer.write(f'https://example.com/page-{number}',
+                         synthetic_page(number, page_count))
+
+
+def get_peak_rss() -> int:
+    '''
+    Return the peak RSS (KB) of the process, from the peak working set on Windows.
+    '''
+
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                             ctypes.byref(counters), counters.cb)
+    return counters.PeakWorkingSetSize // 1024
+
+
+def measure(mode: str, file_name: str, page_count: int) -> None:
+    '''Load the map_dict, read LOOKUP_COUNT pages and print the seconds and the peak RSS (KB)'''
+    start = time.perf_counter()
+    if mode == 'baseline':
+        pass
+    elif mode == 'index':
+        build_index(file_name)
+    else:
+        if mode == 'eager':
+            map_dict = FileManager().load_from_jsonl(file_name)
+        elif mode == 'lazy':
+            map_dict = LazyMapStore(file_name)
+        lookups = random.Random(0).sample(range(page_count), LOOKUP_COUNT)
+        for number in lookups:
+            map_dict[f'https://example.com/page-{number}']['HTTP_STATUS']
+    print(time.perf_counter() - start, get_peak_rss())
+
+
+def run_measure(mode: str, file_name: str, page_count: int) -> tuple:
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_lazy_map_store', 'measure', mode, file_name, str(page_count)],
+                            capture_output=True, text=True, check=True).stdout
+    seconds, max_rss = output.split()
+    return float(seconds), int(max_rss)
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) == 5 and sys.argv[1] == 'measure':
+        measure(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        sys.exit()
+
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else PAGE_COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'map_dict')
+        start = time.perf_counter()
+        generate_map_dict(file_name, page_count)
+        print(f'\n{page_count} pages, map_dict.jsonl {os.path.getsize(f"{file_name}.jsonl") / 2 ** 20:.0f} MB '
+              f'(generated in {time.perf_counter() - start:.1f} s), {LOOKUP_COUNT} pages read\n')
+
+        print('mode                     time (s)   peak RSS (MB)')
+        for name, mode in [('interpreter only', 'baseline'), ('eager load', 'eager'), ('build the index', 'index'), ('lazy (index built)', 'lazy')]:
+            seconds, max_rss = run_measure(mode, file_name, page_count)
+            print(f'{name:<22} {seconds:>10.2f} {max_rss / 1024:>15.1f}')
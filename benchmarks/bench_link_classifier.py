@@ -0,0 +1,77 @@
+'''
+Compare the table-driven LinkClassifier with the previous if/elif chain of
+extract_hrefs on a few hundred thousand hrefs taken from the bundled map_dict.json.
+
+Run from the repository root:
+    python -m benchmarks.bench_link_classifier
+'''
+import time
+import random
+from collections import Counter
+from app.file_manager import FileManager
+from app.link_classifier import LinkClassifier
+
+
+HREFS_COUNT = 300_000
+ROOT_LINK = 'https://www.globalapptesting.com'
+
+
+def previous_extract_hrefs(hrefs: list, root_link: str) -> dict:
+    '''The if/elif chain of extract_hrefs before the LinkClassifier'''
+    root_domain = root_link.split('.')[1]
+    internal_links, external_links, dead_links = [], [], []
+    phone_links, email_links, file_links = [], [], []
+    common_file_formats = ('.png', '.jpeg', '.gif', '.pdf',
+                           '.svg', '.mp4', '.doc', '.docx', '.txt', '.ppt', '.pptx')
+    for link_host in hrefs:
+        if not link_host or link_host.startswith('javascript:;'):
+            continue
+        elif link_host.endswith(common_file_formats):
+            file_links.append(link_host)
+        elif link_host.startswith('/'):
+            internal_links.append(root_link + link_host)
+        elif link_host == '#':
+            dead_links.append(link_host)
+        elif 'tel' in link_host:
+            phone_links.append(link_host)
+        elif 'mailto' in link_host:
+            email_links.append(link_host)
+        elif len(link_host.split('.')) > 1 and link_host.startswith('https://www') and root_domain in link_host.split('.')[1]:
+            internal_links.append(link_host)
+        else:
+            external_links.append(link_host)
+    return {'internal_links': Counter(internal_links), 'external_links': Counter(external_links),
+            'dead_links': Counter(dead_links), 'phone_links': Counter(phone_links),
+            'email_links': Counter(email_links), 'file_links': Counter(file_links)}
+
+
+def load_hrefs() -> list:
+    map_dict = FileManager().load_from_json('map_dict')
+    hrefs = [link for page in map_dict.values()
+             for category in ('internal_links', 'external_links', 'dead_links', 'phone_links', 'email_links', 'file_links')
+             for link, count in page[category].items() for _ in range(count)]
+    rand = random.Random(0)
+    return [rand.choice(hrefs) for _ in range(HREFS_COUNT)]
+
+
+def measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    hrefs = load_hrefs()
+    unique_hrefs = len(set(hrefs))
+    results = [('if/elif chain', measure(lambda: previous_extract_hrefs(hrefs, ROOT_LINK))),
+               ('LinkClassifier (cold)', measure(lambda: LinkClassifier(ROOT_LINK).classify(hrefs)))]
+    warm_classifier = LinkClassifier(ROOT_LINK)
+    warm_classifier.classify(hrefs)
+    results.append(('LinkClassifier (warm)', measure(
+        lambda: warm_classifier.classify(hrefs))))
+
+    print(f'\n{HREFS_COUNT} hrefs ({unique_hrefs} unique)\n')
+    print('classifier               seconds    hrefs/sec')
+    for name, elapsed in results:
+        print(f'{name:<22} {elapsed:>9.3f} {HREFS_COUNT / elapsed:>12.0f}')
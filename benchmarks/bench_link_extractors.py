@@ -0,0 +1,36 @@
+'''
+Measure the throughput (MB/s) of each link extractor backend on the
+html page from app/test_data.
+
+Run from the repository root:
+    python -m benchmarks.bench_link_extractors
+'''
+import os
+import time
+from app.link_extractors import LINK_EXTRACTORS, get_link_extractor
+
+
+REPEAT = 20
+PAGE_PATH = os.path.join('app', 'test_data', 'global_test_app.html')
+
+
+if __name__ == '__main__':
+
+    with open(PAGE_PATH, mode='r', encoding='utf8') as fhandle:
+        web_page = fhandle.read()
+    megabytes = len(web_page.encode('utf8')) * REPEAT / (1024 * 1024)
+
+    print(f'\n{PAGE_PATH} parsed {REPEAT} times\n')
+    print('backend         hrefs       MB/s')
+    for name in LINK_EXTRACTORS:
+        try:
+            extractor = get_link_extractor(name)
+        except ImportError:
+            print(f'{name:<15} not installed')
+            continue
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            hrefs = extractor.extract(web_page)
+        elapsed = time.perf_counter() - start
+        print(f'{name:<15} {len(hrefs):>5} {megabytes / elapsed:>10.1f}')
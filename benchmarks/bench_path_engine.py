@@ -0,0 +1,51 @@
+'''
+Time the cycle safe longest path (Tarjan condensation) and the root eccentricity
+on synthetic site graphs of growing size, the time per edge should stay flat.
+
+Run from the repository root:
+    python -m benchmarks.bench_path_engine
+'''
+import time
+import random
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+EDGES_PER_PAGE = 20
+PAGES_COUNTS = (12_500, 25_000, 50_000, 100_000)
+
+
+def synthetic_adj_list_graph(pages_count: int) -> dict:
+    '''Site like graph: a deep chain of pages, random links and a link back home on every page'''
+    rand = random.Random(0)
+    nodes = [f'https://example.org/page/{i}' for i in range(pages_count)]
+    adj_list_graph = {}
+    for i, node in enumerate(nodes):
+        edges = [[node, nodes[0], 1]]
+        if i + 1 < pages_count:
+            edges.append([node, nodes[i + 1], 1])
+        edges.extend([node, rand.choice(nodes), 1]
+                     for _ in range(EDGES_PER_PAGE - len(edges)))
+        adj_list_graph[node] = edges
+    return adj_list_graph
+
+
+def measure(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    print('\n    pages      edges  longest path (s)  eccentricity (s)  ns/edge')
+    for pages_count in PAGES_COUNTS:
+        adj_list_graph = synthetic_adj_list_graph(pages_count)
+        graph = Graph(adj_list_graph=adj_list_graph, file_manager=FileManager())
+        edges_count = graph.get_compact_graph().edge_count
+
+        _, longest_path_time = measure(graph.get_longest_path)
+        _, eccentricity_time = measure(
+            lambda: graph.get_eccentricity('https://example.org/page/0'))
+        ns_per_edge = (longest_path_time + eccentricity_time) / edges_count * 1e9
+        print(f'{pages_count:>9} {edges_count:>10} {longest_path_time:>17.3f} {eccentricity_time:>17.3f} {ns_per_edge:>8.0f}')
@@ -0,0 +1,43 @@
+'''
+Compare the concurrent crawl (parsing in the crawl threads) with the pipeline
+crawl (parsing in worker processes) on a local website with large pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline_crawl
+'''
+import os
+import time
+from app.webpage_parser import WebpageParser
+from app.file_manager import FileManager
+from app.local_server import SyntheticSite, LocalServer
+
+
+PAGE_COUNT = 60
+PAGE_SIZE = 100 * 1024
+CONCURRENCY = 16
+PARSE_WORKERS = [0, 1, 2, 4, os.cpu_count()]
+
+
+def crawl_pages_per_second(server: LocalServer, parse_workers: int) -> float:
+    parser = WebpageParser(root_link=server.root_link,
+                           file_manager=FileManager(), link_extractor='beautifulsoup')
+    start = time.perf_counter()
+    map_dict = parser.build_dict_map(
+        concurrency=CONCURRENCY, parse_workers=parse_workers, batch_size=4)
+    elapsed = time.perf_counter() - start
+    parser.close()
+    return len(map_dict) / elapsed
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, page_size=PAGE_SIZE)
+    with LocalServer(site) as server:
+        results = [(parse_workers, crawl_pages_per_second(server, parse_workers))
+                   for parse_workers in sorted(set(PARSE_WORKERS))]
+
+    print(f'\n{PAGE_COUNT} pages of {PAGE_SIZE // 1024} KB, {CONCURRENCY} fetch threads, beautifulsoup extractor\n')
+    print('parse processes   pages/sec')
+    for parse_workers, pages_per_second in results:
+        label = 'in threads' if not parse_workers else str(parse_workers)
+        print(f'{label:<17} {pages_per_second:>9.1f}')
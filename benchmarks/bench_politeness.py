@@ -0,0 +1,48 @@
+'''
+Crawl a local website that enforces a rate limit (429 with Retry-After above it) with the
+politeness scheduler at several allowed request rates, and report the achieved rate,
+the throttled responses and the crawl time.
+
+Run from the repository root:
+    python -m benchmarks.bench_politeness
+'''
+import time
+from app.file_manager import FileManager
+from app.local_server import LocalServer, SyntheticSite
+from app.politeness import PolitenessScheduler
+from app.webpage_parser import WebpageParser
+
+
+PAGE_COUNT = 150
+SERVER_RATE_LIMIT = 50
+CONCURRENCY = 8
+ALLOWED_RATES = (10, 25, 50, 100, 200)
+
+
+def crawl(site: SyntheticSite, requests_per_second: float = None) -> tuple:
+    '''Return (crawl time, host statistics, throttled responses seen by the server, pages crawled, pages not 200)'''
+    with LocalServer(site, rate_limit=SERVER_RATE_LIMIT, retry_after='0.1') as server:
+        scheduler = PolitenessScheduler(requests_per_second=requests_per_second, max_retries=20) \
+            if requests_per_second else None
+        parser = WebpageParser(server.root_link, FileManager(), scheduler=scheduler)
+        start = time.perf_counter()
+        map_dict = parser.build_dict_map(concurrency=CONCURRENCY)
+        crawl_time = time.perf_counter() - start
+        parser.close()
+
+    statistics = scheduler.get_host_statistics().popitem()[1] if scheduler else None
+    failed_pages = sum(page['HTTP_STATUS'] != 200 for page in map_dict.values())
+    return crawl_time, statistics, server.rate_limited_count, len(map_dict), failed_pages
+
+
+if __name__ == '__main__':
+
+    site = SyntheticSite(page_count=PAGE_COUNT, fan_out=3)
+    print(f'\n{PAGE_COUNT} pages, server limit {SERVER_RATE_LIMIT} requests/sec, {CONCURRENCY} workers\n')
+    print('allowed (req/s)   achieved (req/s)   429 responses   pages   pages not 200   time (s)')
+
+    crawl_time, _, throttled, pages, failed_pages = crawl(site)
+    print(f'{"no scheduler":<17} {"":>16} {throttled:>15} {pages:>7} {failed_pages:>15} {crawl_time:>10.2f}')
+    for requests_per_second in ALLOWED_RATES:
+        crawl_time, statistics, throttled, pages, failed_pages = crawl(site, requests_per_second)
+        print(f'{requests_per_second:<17} {statistics["achieved_rate"]:>16.1f} {throttled:>15} {pages:>7} {failed_pages:>15} {crawl_time:>10.2f}')
@@ -0,0 +1,57 @@
+'''
+Clicks from the home page to every page of the bundled adj_list_graph.json:
+one dijsktra run per target (the loop of main.py) against the cached BFS
+distance table and the bidirectional search.
+
+Run from the repository root:
+    python -m benchmarks.bench_shortest_paths
+'''
+import time
+from app.file_manager import FileManager
+from app.graph import Graph
+
+
+ROOT_LINK = 'https://www.globalapptesting.com'
+
+
+def dijsktra_per_target(graph: Graph, targets: list) -> dict:
+    distances = {}
+    for target in targets:
+        _, node_dependencies = graph.dijsktra(start_node=ROOT_LINK,
+                                              target_node=target)
+        distances[target] = node_dependencies.get(target)
+    return distances
+
+
+def bidirectional_per_target(graph: Graph, targets: list) -> dict:
+    return {target: len(graph.get_shortest_path(ROOT_LINK, target, bidirectional=True)) - 1
+            for target in targets}
+
+
+def measure(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    graph = Graph(adj_list_graph={}, file_manager=FileManager())
+    graph.load_adj_list_graph_from_json('adj_list_graph')
+    targets = list(graph.get_compact_graph().nodes)
+
+    expected, dijsktra_time = measure(
+        lambda: dijsktra_per_target(graph, targets))
+    results = [('dijsktra per target', dijsktra_time),
+               ('bidirectional BFS per target', measure(lambda: bidirectional_per_target(graph, targets))[1])]
+    distances, cold_time = measure(
+        lambda: graph.get_distances(ROOT_LINK, targets))
+    results.append(('BFS table (cold)', cold_time))
+    results.append(('BFS table (cached)', measure(
+        lambda: graph.get_distances(ROOT_LINK, targets))[1]))
+    assert distances == expected
+
+    print(f'\n{len(targets)} targets from {ROOT_LINK}\n')
+    print('method                          seconds   speedup')
+    for name, elapsed in results:
+        print(f'{name:<30} {elapsed:>9.4f} {dijsktra_time / elapsed:>8.1f}x')
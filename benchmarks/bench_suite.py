@@ -0,0 +1,210 @@
+'''
+Run every crawl and graph operation on a synthetic website served by the local server
+and write the timings to a JSON file named after the current commit.
+Compare two result files to find the regressions.
+
+Run from the repository root (every option is optional):
+    python -m benchmarks.bench_suite --pages 2000 --fan-out 5 --depth 6 --page-size 20000 \
+        --latency 0.001 --error-rate 0.05 --repeats 3
+    python -m benchmarks.bench_suite --no-cycles
+    python -m benchmarks.bench_suite --compare benchmark_results/<commit>.json
+
+The results are written to benchmark_results/<commit>.json, with a -dirty suffix
+if the working tree has uncommitted changes, or to --output.
+'''
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from contextlib import redirect_stdout
+from app.file_manager import FileManager
+from app.graph import Graph
+from app.helpers import get_webpage_statistics
+from app.local_server import LocalServer, SyntheticSite
+from app.webpage_parser import WebpageParser
+
+
+RESULTS_DIRECTORY = 'benchmark_results'
+CONCURRENCY = 8
+# a ratio to the baseline above this is reported as a regression
+REGRESSION_RATIO = 1.1
+
+
+def get_commit() -> str:
+    '''
+    Return the short hash of HEAD, with a -dirty suffix if the working tree has changes.
+    '''
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if changes else commit
+
+
+def measure(operation, repeats: int, setup=None) -> dict:
+    '''
+    Run setup (not timed) and operation(setup result) repeats times, return the best and mean times.
+    '''
+
+    times = []
+    for _ in range(repeats):
+        state = setup() if setup is not None else None
+        # the crawl modes print their progress
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            operation(state)
+            times.append(time.perf_counter() - start)
+    return {'best_seconds': round(min(times), 6), 'mean_seconds': round(sum(times) / repeats, 6),
+            'repeats': repeats}
+
+
+def run_suite(options: argparse.Namespace) -> dict:
+    site = SyntheticSite(page_count=options.pages, fan_out=options.fan_out, seed=options.seed,
+                         page_size=options.page_size, depth=options.depth, cycles=not options.no_cycles)
+    results = {}
+    with LocalServer(site, latency=options.latency, error_rate=options.error_rate, seed=options.seed) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        root_link = server.root_link
+
+        def new_parser():
+            return WebpageParser(root_link, FileManager())
+
+        results['build_dict_map'] = measure(
+            lambda parser: parser.build_dict_map(), options.repeats, new_parser)
+        results['build_dict_map_concurrent'] = measure(
+            lambda parser: parser.build_dict_map(concurrency=CONCURRENCY), options.repeats, new_parser)
+
+        parser = new_parser()
+        with redirect_stdout(io.StringIO()):
+            parser.build_dict_map()
+        parser.close()
+
+        def clear_adj_list_graph():
+            # the pages already converted are skipped
+            parser.adj_list_graph = {}
+
+        results['convert_counters_to_graph_edges'] = measure(
+            lambda _: parser.convert_counters_to_graph_edges(), options.repeats, clear_adj_list_graph)
+        adj_list_graph = parser.convert_counters_to_graph_edges()
+
+        # file I/O
+        map_dict_file = os.path.join(directory, 'map_dict')
+        results['write_map_dict_json'] = measure(
+            lambda _: parser.write_map_dict_to_json_file(map_dict_file), options.repeats)
+        results['load_map_dict_json'] = measure(
+            lambda _: new_parser().load_map_dict_from_json(map_dict_file), options.repeats)
+        results['write_map_dict_jsonl'] = measure(
+            lambda _: parser.write_map_dict_to_jsonl_file(map_dict_file), options.repeats)
+        results['load_map_dict_jsonl'] = measure(
+            lambda _: new_parser().load_map_dict_from_jsonl(map_dict_file), options.repeats)
+        for extension in ('json', 'graph', 'graphz'):
+            graph_file = os.path.join(directory, f'adj_list_graph.{extension}')
+            results[f'write_graph_{extension}'] = measure(
+                lambda _: Graph(adj_list_graph, FileManager()).write_graph(graph_file), options.repeats)
+            results[f'load_graph_{extension}'] = measure(
+                lambda _: Graph({}, FileManager()).load_graph(graph_file), options.repeats)
+
+        # graph operations, on a new graph each time so the cached engines are built again
+        def new_graph():
+            return Graph(adj_list_graph, FileManager())
+
+        # the nodes of the graph are canonical urls
+        root_node = parser.url_canonicalizer.canonicalize(root_link)
+        distances = new_graph().get_distances(root_node)
+        farthest_node = max((node for node, distance in distances.items() if distance is not None),
+                            key=distances.get)
+        results['count_incoming_edges'] = measure(
+            lambda graph: graph.count_incoming_edges(), options.repeats, new_graph)
+        results['get_nodes_with_min_max_links'] = measure(
+            lambda graph: graph.get_nodes_with_min_max_links(), options.repeats, new_graph)
+        results['dijsktra'] = measure(
+            lambda graph: graph.dijsktra(root_node, farthest_node), options.repeats, new_graph)
+        results['get_longest_path'] = measure(
+            lambda graph: graph.get_longest_path(), options.repeats, new_graph)
+        results['get_eccentricity'] = measure(
+            lambda graph: graph.get_eccentricity(root_node), options.repeats, new_graph)
+        results['get_webpage_statistics'] = measure(
+            lambda graph: get_webpage_statistics(root_link, parser, graph), options.repeats, new_graph)
+
+        map_dict = parser.get_map_dict()
+        crawl = {'pages': len(map_dict),
+                 'edges': sum(len(edges) for edges in adj_list_graph.values()),
+                 'error_pages': sum(page['HTTP_STATUS'] != 200 for page in map_dict.values()),
+                 'root_eccentricity': new_graph().get_eccentricity(root_node)}
+
+    return {'commit': get_commit(), 'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'config': {'pages': options.pages, 'fan_out': options.fan_out, 'depth': options.depth,
+                       'cycles': not options.no_cycles, 'page_size': options.page_size,
+                       'latency': options.latency, 'error_rate': options.error_rate, 'seed': options.seed},
+            'crawl': crawl, 'results': results}
+
+
+def print_results(report: dict, baseline: dict = None) -> None:
+    print(f'\ncommit {report["commit"]}, {report["crawl"]["pages"]} pages, {report["crawl"]["edges"]} edges, '
+          f'{report["crawl"]["error_pages"]} error pages, root eccentricity {report["crawl"]["root_eccentricity"]}')
+    if baseline is None:
+        print('\noperation                          best (s)    mean (s)')
+        for operation, result in report['results'].items():
+            print(f'{operation:<32} {result["best_seconds"]:>10.4f} {result["mean_seconds"]:>11.4f}')
+        return
+
+    if baseline['config'] != report['config']:
+        print(f'the configuration of {baseline["commit"]} is different: {baseline["config"]}')
+    print(f'\noperation                          best (s)   {baseline["commit"]:>12}      ratio')
+    for operation, result in report['results'].items():
+        if operation not in baseline['results']:
+            print(f'{operation:<32} {result["best_seconds"]:>10.4f} {"-":>14}')
+            continue
+        baseline_seconds = baseline['results'][operation]['best_seconds']
+        ratio = result['best_seconds'] / baseline_seconds if baseline_seconds else float('inf')
+        flag = '  regression' if ratio > REGRESSION_RATIO else ''
+        print(f'{operation:<32} {result["best_seconds"]:>10.4f} {baseline_seconds:>14.4f} {ratio:>10.2f}{flag}')
+
+
+def parse_arguments(arguments: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Crawl and graph operations benchmark suite')
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--fan-out', type=int, default=5)
+    parser.add_argument('--depth', type=int, default=None,
+                        help='number of levels under the home page, a chain with shortcuts if not set')
+    parser.add_argument('--no-cycles', action='store_true',
+                        help='no link to the home page or to the previous pages')
+    parser.add_argument('--page-size', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds to sleep before each response')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of the pages answered with 500')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='results file, benchmark_results/<commit>.json by default')
+    parser.add_argument('--compare', help='results file of another commit')
+    return parser.parse_args(arguments)
+
+
+if __name__ == '__main__':
+
+    options = parse_arguments(sys.argv[1:])
+    baseline = None
+    if options.compare:
+        with open(options.compare, mode='r', encoding='utf8') as fhandle:
+            baseline = json.load(fhandle)
+
+    report = run_suite(options)
+    output = options.output or os.path.join(RESULTS_DIRECTORY, f'{report["commit"]}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, mode='w', encoding='utf8') as fhandle:
+        json.dump(report, fhandle, indent=4)
+
+    print_results(report, baseline)
+    print(f'\nresults written to {output}')
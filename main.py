@@ -31,8 +31,8 @@ if __name__ == '__main__':
 
     start_node = 'https://www.globalapptesting.com'
     target_node = 'https://www.globalapptesting.com/customers/facebook'
-    parent, node_dependencies = webpage_graph.dijsktra(start_node=start_node,
-                                                       target_node=target_node)
+    distances = webpage_graph.get_distances(start_node=start_node,
+                                            target_nodes=[target_node])
 
     print('Shortest path between:', start_node, ' to ', target_node,
-          ' are ',  node_dependencies[target_node], ' pages.')
+          ' are ',  distances[target_node], ' pages.')